@@ -9,12 +9,10 @@
 import sys
 import qdarkstyle
 import os
-import csv
 import time
+import dataclasses
+import copy
 import traceback
-import concurrent.futures
-import multiprocessing
-import scipy
 from PyQt5 import QtWidgets
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
@@ -25,16 +23,21 @@ import matplotlib
 matplotlib.use('TkAgg')
 from matplotlib import pyplot as plt
 from SimulationParameters import SimulationParameters
-from Fish import Fish
-from TestResults import TestResults
-from scipy.stats import beta, skew
+from SimulationKernel import betaLookupTable, newMasterSeed, CAPTURE_EQUAL, CAPTURE_VARY, CAPTURE_RANDOM, \
+    SUBREACH_VARIED, POPULATION_OPEN, PRECISION_MEDIAN_CI, REACH_SIZE, BETA_DISTRIBUTION
+from SimulationConfig import SimulationConfig
+from SimulationEngine import runTrials, runTrialsParallel, measurePrecision, estimateStatistics, SUMMARY_STATISTICS
+from SimulationResultStore import SimulationResultStore, emptyFishPopulation
+from ResultExporter import ExportJob
+from FishHistograms import columnStatistics
+from LiveHistogram import LiveHistogram
+from FishPopulation import RECAUGHT_LABELS
+from ResultTableModels import TrialTableModel, FishTableModel, HIGHLIGHT_NONE, HIGHLIGHT_GREEN, HIGHLIGHT_RED
+from SimulationArchive import writeArchive, readArchive, ARCHIVE_EXTENSION
+from ParameterSweep import runSweep, sweepValues, sweepConfigs, writeSweepTable, SWEEP_PARAMETERS
 
 # Global Variables
-REACH_SIZE = 100
-BETA_DISTRIBUTION = 2.70
 simulationSaves = []
-global simulationResult
-global testResultArray
 
 
 #################################################################################
@@ -56,13 +59,14 @@ class WorkerSignals(QObject):
         `object` data returned from processing, anything
 
     progress
-        `int` indicating % progress
+        `int` indicating % progress, or with progress[int, object] the % and an
+        `object` with the details (e.g. ExportProgress)
 
     '''
     finished = pyqtSignal()
     error = pyqtSignal(tuple)
     result = pyqtSignal(object)
-    progress = pyqtSignal(int)
+    progress = pyqtSignal([int], [int, object])
 
 
 #################################################################################
@@ -131,12 +135,31 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Build the user interface
         self.setupUi(self)
 
+        # Models of the results tables, they read the result arrays as rows are shown
+        self.trialTableModel = TrialTableModel(self)
+        self.tableRawTestData.setModel(self.trialTableModel)
+        self.fishTableModel = FishTableModel(self)
+        self.tableRawFishData.setModel(self.fishTableModel)
+
+        # Histogram of the estimates drawn while a simulation runs
+        self.liveHistogram = LiveHistogram(self.liveHistogramWidget)
+
         # Insert buttons to their respective groups
         self.Presets()
         self.GroupButtons()
         self.Connections()
         self.show()
 
+        # Table of the last parameter sweep
+        self.sweepRows = []
+
+        # Statistics of the estimates of the running simulation, for the status bar
+        self.runningStatistics = None
+
+        # Background export of results: running, and asked to stop
+        self.exportRunning = False
+        self.stopExport = False
+
         # Allow for threading
         self.threadpool = QThreadPool()
         print("Multi-threading with maximum %d threads" % self.threadpool.maxThreadCount())
@@ -206,6 +229,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.saveTrials.addButton(self.saveSpecificTrialCheckBox, 1)
         self.saveTrials.addButton(self.saveAllTrialsSeparateCheckBox,2)
         self.saveTrials.addButton(self.saveAllTrialsCheckBox, 3)
+        self.saveTrials.addButton(self.saveAllTrialsIndexedCheckBox, 4)
 
     #################################################################################
     # Connections for the button click
@@ -240,6 +264,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Refresh Results Button
         self.tableRawTestData.clicked.connect(self.DisplayFishData)
         self.tableRawFishData.doubleClicked.connect(self.DisplayAnalysisForColumn)
+        self.fishFilterInput.currentIndexChanged.connect(self.fishTableModel.SetFilter)
         self.refreshResultsButton.clicked.connect(self.RefreshResults)
         self.clearDataButton.clicked.connect(self.ClearSavedData)
 
@@ -255,10 +280,17 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.actionExit.triggered.connect(self.ActionExit)
         self.actionUser_Manual.triggered.connect(self.UserManual)
         self.actionNight_Mode.triggered.connect(self.NightMode)
+        self.actionSave_Archive.triggered.connect(self.SaveArchive)
+        self.actionOpen_Archive.triggered.connect(self.OpenArchive)
 
         # Stop Simulation
         self.stopSimulationButton.clicked.connect(self.StopSimulation)
 
+        # Parameter Sweep
+        self.runSweepButton.clicked.connect(self.RunSweep)
+        self.stopSweepButton.clicked.connect(self.StopSimulation)
+        self.saveSweepButton.clicked.connect(self.SaveSweep)
+
     #################################################################################
     # Stop Simulation
     #################################################################################
@@ -292,6 +324,53 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     def ActionExit(self):
         self.close()
 
+    #################################################################################
+    # Save the loaded simulation as an archive
+    #################################################################################
+    def SaveArchive(self):
+        if not simulationSaves or not self.loadSimulationNumberInput.currentText().isdigit():
+            QMessageBox.about(self, "Status Message", "Run or open a simulation to save it.")
+            return
+        path = QFileDialog.getSaveFileName(self, 'Save Simulation Archive', os.getenv('HOME'),
+                                           "AWRI Archive (*" + ARCHIVE_EXTENSION + ")")[0]
+        if path == '':
+            return
+        if not path.endswith(ARCHIVE_EXTENSION):
+            path += ARCHIVE_EXTENSION
+        try:
+            writeArchive(path, simulationSaves[int(self.loadSimulationNumberInput.currentText()) - 1])
+            print(path + " archive saved.")
+        except OSError as e:
+            QMessageBox.critical(self, "Error", "Could not save the archive: " + str(e))
+
+    #################################################################################
+    # Open an archive as a new saved simulation, its arrays stay on disk (memory-mapped)
+    #################################################################################
+    def OpenArchive(self):
+        path = QFileDialog.getExistingDirectory(self, 'Open Simulation Archive', os.getenv('HOME'))
+        if path == '':
+            return
+        try:
+            simulationSaves.append(readArchive(path))
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", "Could not open the archive: " + str(e))
+            return
+
+        # Show it in the results tab, as after a simulation:
+        self.loadSimulationNumberInput.addItem(str(len(simulationSaves)))
+        self.loadSimulationNumberInput.setCurrentText(str(len(simulationSaves)))
+        self.saveResultsButton.setEnabled(True)
+        self.refreshResultsButton.setEnabled(True)
+        self.clearDataButton.setEnabled(True)
+        self.viewImageButton.setEnabled(True)
+        self.populationGraphCheckBox.setEnabled(True)
+        self.saveAllTrialsCheckBox.setEnabled(True)
+        self.saveSpecificTrialCheckBox.setEnabled(True)
+        self.saveAllTrialsSeparateCheckBox.setEnabled(True)
+        self.saveAllTrialsIndexedCheckBox.setEnabled(True)
+        self.tabBox.setCurrentIndex(2)
+        self.RefreshResults()
+
     #################################################################################
     # Clear Saved Data
     #################################################################################
@@ -301,8 +380,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.refreshResultsButton.setEnabled(False)
         self.viewImageButton.setEnabled(False)
         self.loadSimulationNumberInput.clear()
-        self.tableRawTestData.setRowCount(0)
-        self.tableRawFishData.setRowCount(0)
+        self.trialTableModel.Clear()
+        self.fishTableModel.Clear()
+        self.fishTableModel.ClearCache()
         self.simulationReviewer.clear()
 
     #################################################################################
@@ -340,10 +420,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     def betaDistribution(self):
         correction = self.migrationRateBox.value() - 0.5
         # https://www.geeksforgeeks.org/scipy-stats-beta-python/
-        betaX = np.linspace(0, 1, 100)
-        # https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.beta.html
-        # beta.pdf(x,a,b) x = points; a = variable a and b = variable b
-        y1 = beta.pdf(betaX, BETA_DISTRIBUTION, BETA_DISTRIBUTION)
+        betaX, y1 = betaLookupTable(100)
         plt.plot(betaX + correction, y1 + REACH_SIZE * self.migrationDistanceBox.value() - (BETA_DISTRIBUTION / 2), "*")
         plt.ylabel('Movement Distance (% of subreach)', fontsize=15)
         plt.xlabel('x', fontsize=15)
@@ -380,56 +457,61 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     #################################################################################
     def DisplayPopulationAnalysis(self):
         # Choose column to graph:
-        index = self.tableRawFishData.currentColumn()
+        index = self.tableRawFishData.currentIndex().column()
 
         # Get input number
         inputNumber = int(self.loadSimulationNumberInput.currentText()) - 1
-        # View Trial Results:
-        testResults = simulationSaves[inputNumber].GetTestData()
-        simulationResults = []
-        # Get row and column highlighted:
-        for idx in range(self.tableRawTestData.rowCount()):
-            # Get fish data for that specific test:
-            fishData = testResults[idx].GetFishData()
-            # Show fish data:
-            if index == 0:
-                # CAPTURE PROB Q1
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetCaptureProbability())
-            elif index == 1:
-                # Sub reach S1
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetSubReachPos())
-            elif index == 2:
-                # Tagged
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetFishTag())
-            elif index == 3:
-                # Tag Lost
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetTagLoss())
-            elif index == 4:
-                # Mortality
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetMortality())
-            elif index == 5:
-                # Enter stay exit
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetMigrationDistance())
-            elif index == 6:
-                # CAPTURE PROB Q2
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetCaptureProbabilityTwo())
-            elif index == 7:
-                # FINAL Subreach S2
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetSubReachPosTwo())
-
-        arrayResult = np.array(simulationResults)
-
-        n, bins, patches = plt.hist(x=arrayResult, bins='auto', color='#0504aa', alpha=0.7, rwidth=0.85)
+        # The chosen column's histogram over all trials, counted the first time it is shown:
+        simulation = simulationSaves[inputNumber]
+        fishHistograms = simulation.GetTestData().GetFishHistograms(simulation.GetConfig())
+        self.plotFishHistogram(index, fishHistograms.GetColumn(index) if fishHistograms is not None else None)
+
+    #################################################################################
+    # Analyze spread for a column chosen in raw fish data table
+    #################################################################################
+    def DisplayAnalysisForColumn(self):
+
+        if self.populationGraphCheckBox.isChecked():
+            plt.close()
+            self.DisplayPopulationAnalysis()
+        else:
+            plt.close()
+            index = self.tableRawFishData.currentIndex().column()
+
+            # Get input number
+            inputNumber = int(self.loadSimulationNumberInput.currentText()) - 1
+
+            # View Trial Results:
+            resultStore = simulationSaves[inputNumber].GetTestData()
+
+            # Get row and column highlighted:
+            for idx in self.tableRawTestData.selectionModel().selectedIndexes():
+                rowNum = self.trialTableModel.GetStoreRow(idx.row())
+
+            # Histogram of the chosen column of the fish data for that specific test, in the same bins:
+            self.plotFishHistogram(index, columnStatistics(resultStore.GetFishData(rowNum), index,
+                                                           simulationSaves[inputNumber].GetConfig()))
+
+    #################################################################################
+    # Plot the binned counts of a fish table column (StreamingStatistics)
+    #################################################################################
+    def plotFishHistogram(self, index, statistics):
+        if statistics is None or statistics.GetCount() == 0:
+            QMessageBox.about(self, "Status Message", "No fish data were kept for this simulation.")
+            return
+
+        # Only the bins from the lowest to the highest value:
+        edges = statistics.GetBinEdges()
+        counts = statistics.GetHistogram()
+        filled = np.nonzero(counts)[0]
+        if len(filled):
+            edges = edges[filled[0]:filled[-1] + 2]
+            counts = counts[filled[0]:filled[-1] + 1]
+
+        n, bins, patches = plt.hist(x=edges[:-1], bins=edges, weights=counts, color='#0504aa', alpha=0.7, rwidth=0.85)
         plt.grid(axis='y', alpha=0.75)
-        plt.xlabel('Value')
+        plt.xlabel('Value (min ' + str('{number:.{digits}f}'.format(number=statistics.GetMin(), digits=2))
+                   + ', max ' + str('{number:.{digits}f}'.format(number=statistics.GetMax(), digits=2)) + ')')
         plt.ylabel('Frequency')
 
         if index == 0:
@@ -456,120 +538,28 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         elif index == 7:
             # FINAL Subreach S2
             plt.title('Subreach Position 2 Spread')
+        elif index == 8:
+            # Recaught, one bin per status
+            plt.title('Recaught Status')
+            plt.xticks(range(len(RECAUGHT_LABELS)), RECAUGHT_LABELS)
 
         plt.text(23, 45, r'$\mu=15, b=3$')
         maxFreq = n.max()
         # Set a clean upper y-axis limit.
         plt.ylim(ymax=np.ceil(maxFreq / 10) * 10 if maxFreq % 10 else maxFreq + 10)
-        # plt.bar(np.arange(len(arrayResult)), arrayResult)
         plt.grid(True)
         plt.show()
 
-    #################################################################################
-    # Analyze spread for a column chosen in raw fish data table
-    #################################################################################
-    def DisplayAnalysisForColumn(self):
-
-        if self.populationGraphCheckBox.isChecked():
-            plt.close()
-            self.DisplayPopulationAnalysis()
-        else:
-            plt.close()
-            index = self.tableRawFishData.currentColumn()
-
-            # Get input number
-            inputNumber = int(self.loadSimulationNumberInput.currentText()) - 1
-
-            # View Trial Results:
-            testResults = simulationSaves[inputNumber].GetTestData()
-
-            # Get row and column highlighted:
-            for idx in self.tableRawTestData.selectionModel().selectedIndexes():
-                rowNum = idx.row()
-
-            # Get fish data for that specific test:
-            fishData = testResults[rowNum].GetFishData()
-            simulationResults = []
-            # Show fish data:
-            if index == 0:
-                # CAPTURE PROB Q1
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetCaptureProbability())
-            elif index == 1:
-                # subreach S1
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetSubReachPos())
-            elif index == 2:
-                # Tagged
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetFishTag())
-            elif index == 3:
-                # Tag Lost
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetTagLoss())
-            elif index == 4:
-                # Mortality
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetMortality())
-            elif index == 5:
-                # Enter stay exit
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetMigrationDistance())
-            elif index == 6:
-                # CAPTURE PROB Q2
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetCaptureProbabilityTwo())
-            elif index == 7:
-                # FINAL Subreach S2
-                for itr in range(0, len(fishData)):
-                    simulationResults.append(fishData[itr].GetSubReachPosTwo())
-
-            arrayResult = np.array(simulationResults)
-
-            n, bins, patches = plt.hist(x=arrayResult, bins='auto', color='#0504aa', alpha=0.7, rwidth=0.85)
-            plt.grid(axis='y', alpha=0.75)
-            plt.xlabel('Value')
-            plt.ylabel('Frequency')
-
-            if index == 0:
-                # CAPTURE PROB Q1
-                plt.title('Capture Probability Q1 (1st Pass)')
-            elif index == 1:
-                # subreach S1
-                plt.title('Subreach Position S1 (1st Pass)')
-            elif index == 2:
-                # Tagged
-                plt.title('Fishes Tagged')
-            elif index == 3:
-                # Tag Loss
-                plt.title('Tag Loss Spread')
-            elif index == 4:
-                # Mortality
-                plt.title('Mortality Spread')
-            elif index == 5:
-                # Enter stay exit
-                plt.title('Migration Distance Spread')
-            elif index == 6:
-                # CAPTURE PROB Q2
-                plt.title('Capture Probability Q2 (2nd Pass)')
-            elif index == 7:
-                # FINAL Subreach S2
-                plt.title('Subreach Position 2 Spread')
-
-            plt.text(23, 45, r'$\mu=15, b=3$')
-            maxFreq = n.max()
-            # Set a clean upper y-axis limit.
-            plt.ylim(ymax=np.ceil(maxFreq / 10) * 10 if maxFreq % 10 else maxFreq + 10)
-            # plt.bar(np.arange(len(arrayResult)), arrayResult)
-            plt.grid(True)
-            plt.show()
-
     #################################################################################
     # Checks File Path
     #################################################################################
     def CheckFile(self, path, i):
         path = os.path.expanduser(path)
         root, ext = os.path.splitext(os.path.expanduser(path))
+        # Keep compressed files' double extension (.csv.gz) together
+        if ext.lower() == '.gz':
+            root, innerExt = os.path.splitext(root)
+            ext = innerExt + ext
         dir = os.path.dirname(root)
         fname = os.path.basename(root)
         candidate = fname + ext
@@ -583,229 +573,90 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     # Save Results
     #################################################################################
     def SaveResults(self):
+        # While an export runs the save button cancels it:
+        if self.exportRunning:
+            self.stopExport = True
+            print("Cancelling export...")
+            return
         try:
-            path = QFileDialog.getSaveFileName(self, 'Save File', os.getenv('HOME'), "CSV Files(*.csv)")
+            path = QFileDialog.getSaveFileName(self, 'Save File', os.getenv('HOME'),
+                                               "CSV Files(*.csv);;Compressed CSV Files(*.csv.gz)")
+            if path[0] == '':
+                return
+
+            # View Trial Results:
+            resultStore = simulationSaves[int(self.loadSimulationNumberInput.currentText()) - 1].GetTestData()
+            job = ExportJob()
 
-            # If for one trial:
+            # If for one trial, the trial shown in the fish table:
             if self.saveSpecificTrialCheckBox.isChecked():
                 # QMessageBox.about(self, "Status Message", "You must select a specific trial to export.")
-                if path[0] != '':
-                    with open(path[0], 'w', newline='') as csv_file:
-                        print('Saving file...')
-                        writer = csv.writer(csv_file, dialect='excel', delimiter=',')
-                        headers = []
-                        for column in range(self.tableRawFishData.columnCount()):
-                            header = self.tableRawFishData.horizontalHeaderItem(column)
-                            if header is not None:
-                                headers.append(header.text())
-                            else:
-                                headers.append("Column " + str(column))
-                        writer.writerow(headers)
-                        for row in range(self.tableRawFishData.rowCount()):
-                            rowdata = []
-                            for column in range(self.tableRawFishData.columnCount()):
-                                item = self.tableRawFishData.item(row, column)
-                                if item is not None:
-                                    rowdata.append(item.text())
-                                else:
-                                    rowdata.append('')
-                            writer.writerow(rowdata)
-                print('File generated.')
-
-                # Get all test data
-                newPath = self.CheckFile(path[0], "master")
-                # Now we write the raw data
-                if newPath != '':
-                    with open(newPath, 'w', newline='') as csv_file:
-                        writer = csv.writer(csv_file, dialect='excel', delimiter=',')
-                        headers = []
-                        for column in range(self.tableRawTestData.columnCount()):
-                            header = self.tableRawTestData.horizontalHeaderItem(column)
-                            if header is not None:
-                                headers.append(header.text())
-                            else:
-                                headers.append("Column " + str(column))
-                        writer.writerow(headers)
-                        for row in range(self.tableRawTestData.rowCount()):
-                            rowdata = []
-                            for column in range(self.tableRawTestData.columnCount()):
-                                item = self.tableRawTestData.item(row, column)
-                                if item is not None:
-                                    rowdata.append(item.text())
-                                else:
-                                    rowdata.append('')
-                            writer.writerow(rowdata)
-
-                        summary = self.simulationReviewer.toPlainText()
-                        rowdata.clear()
-                        rowdata.append("\n\n")
-                        rowdata.append(summary)
-                        writer.writerow(rowdata)
-
-                print(str(newPath) + " master file generated.")
+                fishData = self.fishTableModel.GetFishData()
+                job.AddFishData(path[0], fishData if fishData is not None else emptyFishPopulation())
+
+            # If for all trials, save in one long-format file with a trial column and an index of the trials
+            # (the index is plain CSV, also for compressed files):
+            elif self.saveAllTrialsIndexedCheckBox.isChecked():
+                indexPath = self.CheckFile(path[0], "index")
+                job.AddLongFormat(path[0], indexPath[:-3] if indexPath.endswith('.gz') else indexPath, resultStore)
 
             # If for all trials, save in separate files:
             elif self.saveAllTrialsSeparateCheckBox.isChecked():
-                # View Trial Results:
-                testResults = simulationSaves[int(self.loadSimulationNumberInput.currentText()) - 1].GetTestData()
-                newPath = os.path.splitext(path[0])[0]
-                for i in range(0, self.tableRawTestData.rowCount()):
-                    # Get fish data for that specific test:
-                    fishData = testResults[i].GetFishData()
+                print('By default: Existing files will not overwritten!')
+                for i in range(0, resultStore.GetNumTrials()):
                     # increment filename as needed
-                    newPath = self.CheckFile(path[0], i)
-                    # Show fish data:
-                    self.tableRawFishData.setRowCount(0)
-                    for itr in range(0, len(fishData)):
-                        numRows = self.tableRawFishData.rowCount()
-                        self.tableRawFishData.insertRow(numRows)
-                        self.tableRawFishData.setItem(numRows, 0, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetCaptureProbability(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 1, QTableWidgetItem(str(fishData[itr].GetSubReachPos())))
-                        self.tableRawFishData.setItem(numRows, 2, QTableWidgetItem(str(fishData[itr].GetFishTag())))
-                        self.tableRawFishData.setItem(numRows, 3, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetTagLoss(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 4, QTableWidgetItem(str(fishData[itr].GetMortality())))
-                        self.tableRawFishData.setItem(numRows, 5, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetMigrationDistance(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 6, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetCaptureProbabilityTwo(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 7, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetSubReachPosTwo(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 8, QTableWidgetItem(str(fishData[itr].GetRecaughtStat())))
-
-                    # Now we write the raw data
-                    if newPath != '':
-                        with open(newPath, 'w', newline='') as csv_file:
-                            print('By default: Existing files will not overwritten! Saving file...')
-                            writer = csv.writer(csv_file, dialect='excel', delimiter=',')
-                            headers = []
-                            for column in range(self.tableRawFishData.columnCount()):
-                                header = self.tableRawFishData.horizontalHeaderItem(column)
-                                if header is not None:
-                                    headers.append(header.text())
-                                else:
-                                    headers.append("Column " + str(column))
-                            writer.writerow(headers)
-                            for row in range(self.tableRawFishData.rowCount()):
-                                rowdata = []
-                                for column in range(self.tableRawFishData.columnCount()):
-                                    item = self.tableRawFishData.item(row, column)
-                                    if item is not None:
-                                        rowdata.append(item.text())
-                                    else:
-                                        rowdata.append('')
-                                writer.writerow(rowdata)
-
-                    print(str(newPath) + " generated.")
-
-                    # Get all test data
-                    newPath = self.CheckFile(path[0], "master")
-                    # Now we write the raw data
-                    if newPath != '':
-                        with open(newPath, 'w', newline='') as csv_file:
-                            writer = csv.writer(csv_file, dialect='excel', delimiter=',')
-                            headers = []
-                            for column in range(self.tableRawTestData.columnCount()):
-                                header = self.tableRawTestData.horizontalHeaderItem(column)
-                                if header is not None:
-                                    headers.append(header.text())
-                                else:
-                                    headers.append("Column " + str(column))
-                            writer.writerow(headers)
-                            for row in range(self.tableRawTestData.rowCount()):
-                                rowdata = []
-                                for column in range(self.tableRawTestData.columnCount()):
-                                    item = self.tableRawTestData.item(row, column)
-                                    if item is not None:
-                                        rowdata.append(item.text())
-                                    else:
-                                        rowdata.append('')
-                                writer.writerow(rowdata)
-
-                            summary = self.simulationReviewer.toPlainText()
-                            rowdata.clear()
-                            rowdata.append("\n\n")
-                            rowdata.append(summary)
-                            writer.writerow(rowdata)
-
-                    print(str(newPath) + " master file generated.")
+                    job.AddTrialFishData(self.CheckFile(path[0], i), resultStore, i)
             else:
-                # Save in one file, View Trial Results:
-                self.tableRawFishData.setRowCount(0)
-                testResults = simulationSaves[int(self.loadSimulationNumberInput.currentText()) - 1].GetTestData()
-                newPath = path[0]
-                for i in range(0, self.tableRawTestData.rowCount()):
-                    # Get fish data for that specific test:
-                    fishData = testResults[i].GetFishData()
-                    # increment filename as needed
-                    # Show fish data:
-                    for itr in range(0, len(fishData)):
-                        numRows = self.tableRawFishData.rowCount()
-                        self.tableRawFishData.insertRow(numRows)
-                        self.tableRawFishData.setItem(numRows, 0, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetCaptureProbability(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 1, QTableWidgetItem(str(fishData[itr].GetSubReachPos())))
-                        self.tableRawFishData.setItem(numRows, 2, QTableWidgetItem(str(fishData[itr].GetFishTag())))
-                        self.tableRawFishData.setItem(numRows, 3, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetTagLoss(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 4, QTableWidgetItem(str(fishData[itr].GetMortality())))
-                        self.tableRawFishData.setItem(numRows, 5, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetMigrationDistance(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 6, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetCaptureProbabilityTwo(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 7, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetSubReachPosTwo(), digits=2))))
-                        self.tableRawFishData.setItem(numRows, 8, QTableWidgetItem(str(fishData[itr].GetRecaughtStat())))
-
-                # Now we write the raw data
-                if newPath != '':
-                    with open(newPath, 'w', newline='') as csv_file:
-                        print('By default: Existing files will not overwritten! Saving file...')
-                        writer = csv.writer(csv_file, dialect='excel', delimiter=',')
-                        headers = []
-                        for column in range(self.tableRawFishData.columnCount()):
-                            header = self.tableRawFishData.horizontalHeaderItem(column)
-                            if header is not None:
-                                headers.append(header.text())
-                            else:
-                                headers.append("Column " + str(column))
-                        writer.writerow(headers)
-                        for row in range(self.tableRawFishData.rowCount()):
-                            rowdata = []
-                            for column in range(self.tableRawFishData.columnCount()):
-                                item = self.tableRawFishData.item(row, column)
-                                if item is not None:
-                                    rowdata.append(item.text())
-                                else:
-                                    rowdata.append('')
-                            writer.writerow(rowdata)
-
-                print(str(newPath) + " generated.")
-
-                # Get all test data for MASTER
-                newPath = self.CheckFile(path[0], "master")
-                # Now we write the raw data
-                if newPath != '':
-                    with open(newPath, 'w', newline='') as csv_file:
-                        writer = csv.writer(csv_file, dialect='excel', delimiter=',')
-                        headers = []
-                        for column in range(self.tableRawTestData.columnCount()):
-                            header = self.tableRawTestData.horizontalHeaderItem(column)
-                            if header is not None:
-                                headers.append(header.text())
-                            else:
-                                headers.append("Column " + str(column))
-                        writer.writerow(headers)
-                        for row in range(self.tableRawTestData.rowCount()):
-                            rowdata = []
-                            for column in range(self.tableRawTestData.columnCount()):
-                                item = self.tableRawTestData.item(row, column)
-                                if item is not None:
-                                    rowdata.append(item.text())
-                                else:
-                                    rowdata.append('')
-                            writer.writerow(rowdata)
-
-                        summary = self.simulationReviewer.toPlainText()
-                        rowdata.clear()
-                        rowdata.append("\n\n")
-                        rowdata.append(summary)
-                        writer.writerow(rowdata)
-
-                print(str(newPath) + " master file generated.")
+                # Save in one file:
+                job.AddAllFish(path[0], resultStore)
+
+            # All test data for MASTER, written once after the fish:
+            job.AddTrials(self.CheckFile(path[0], "master"), resultStore, self.simulationReviewer.toPlainText())
         except Exception as e:
             print('User cancelled.' + str(e))
+            return
+
+        # Export in the background, results can still be browsed:
+        print('Saving files...')
+        self.exportRunning = True
+        self.stopExport = False
+        self.saveResultsButton.setText("Cancel Export")
+        worker = Worker(self.exportExecute, job)
+        worker.signals.progress[int, object].connect(self.exportProgress)
+        worker.signals.result.connect(self.exportComplete)
+        worker.signals.finished.connect(self.exportFinished)
+        self.threadpool.start(worker)
+
+    #################################################################################
+    # Export Worker: Function to execute
+    #################################################################################
+    def exportExecute(self, job, progress_callback):
+        return job.Run(
+            progressCallback=lambda progress: progress_callback[int, object].emit(progress.GetPercent(),
+                                                                                dataclasses.replace(progress)),
+            shouldStop=lambda: self.stopExport)
+
+    #################################################################################
+    # Export Worker: Progress Update, files and bytes written and time left
+    #################################################################################
+    def exportProgress(self, percent, progress):
+        self.statusbar.showMessage(progress.GetText() + " (" + str(percent) + "%)")
+
+    #################################################################################
+    # Export Worker: Export Completed or Cancelled
+    #################################################################################
+    def exportComplete(self, progress):
+        if progress.cancelled:
+            message = "Export cancelled. " + progress.GetText() + "."
+        else:
+            message = "Export complete. " + progress.GetText() + " in " \
+                      + str('{number:.{digits}f}'.format(number=progress.seconds, digits=1)) + " s."
+        print(message)
+        self.statusbar.showMessage(message)
+
+    def exportFinished(self):
+        self.exportRunning = False
+        self.saveResultsButton.setText("Save Results")
 
     #################################################################################
     # Open or Closed Population
@@ -876,24 +727,30 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         inputNumber = int(self.loadSimulationNumberInput.currentText()) - 1
         template = simulationSaves[inputNumber]
         localPopulationSize = template.GetActualPopulation()
-        testDataView = template.GetTestData()
-        simulationResults = []
-
-        for i in range(len(testDataView)):
-            simulationResults.append(testDataView[i].GetEstimatedPopulation())
-
-        bins = np.linspace(min(simulationResults), max(simulationResults))
-        hist, _ = np.histogram(simulationResults, bins)
+        statistics = template.GetStatistics()
+        if statistics is None or statistics.GetCount() == 0:
+            QMessageBox.about(self, "Status Message", "This simulation has no estimates to plot.")
+            return
+
+        # Bars from the histogram of the streaming statistics, from the lowest to the highest estimate
+        binEdges = statistics.GetBinEdges()
+        bins = np.linspace(max(statistics.GetMin(), binEdges[0]), min(statistics.GetMax(), binEdges[-1]))
+        if bins[-1] <= bins[0]:
+            bins = np.array([bins[0] - 0.5, bins[0] + 0.5])
+        hist = statistics.GetCounts(bins)
         plt.figure(figsize=[10, 8])
         # plt.bar(bin_edges[:-1], hist, width=0.5, color='#0504aa', alpha=0.7)
-        plt.bar(bins[:-1], hist, label=str(template.GetNumTrials()) + ' trials', width=1)
+        plt.hist(x=bins[:-1], bins=bins, weights=hist, label=str(template.GetNumTrials()) + ' trials')
         # plt.plot(bins[:-1], hist, 'r-', lw=5)
         plt.axvline(localPopulationSize, color='g', linestyle="dashed", lw=2, label=str('True Population Size'))
         plt.axvline(template.GetOverallEstimatedPopulation(), color='r', lw=2, label=str('Simulation Mean'))
         plt.xlim(min(bins), max(bins))
         plt.grid(axis='y', alpha=0.75)
-        plt.xlabel('Population Estimate\n Mean Population Estimation = ' + str('{number:.{digits}f}'.format(number=template.GetOverallEstimatedPopulation(), digits=2)),
-                   fontsize=15)
+        outside = ''
+        if statistics.GetUnderflow() or statistics.GetOverflow():
+            outside = '\n Estimates outside the plot: ' + str(statistics.GetUnderflow() + statistics.GetOverflow())
+        plt.xlabel('Population Estimate\n Mean Population Estimation = ' + str('{number:.{digits}f}'.format(number=template.GetOverallEstimatedPopulation(), digits=2))
+                   + outside, fontsize=15)
         plt.xticks(fontsize=15)
         plt.yticks(fontsize=15)
         plt.ylabel('Frequency', fontsize=15)
@@ -909,8 +766,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.tableRawTestData.setSortingEnabled(False)
 
         # Clear tables:
-        self.tableRawTestData.setRowCount(0)
-        self.tableRawFishData.setRowCount(0)
+        self.trialTableModel.Clear()
+        self.fishTableModel.Clear()
 
         # Error checking for right input:
         if not self.loadSimulationNumberInput.currentText().isdigit():
@@ -933,17 +790,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.simulationReviewer.append('Number of Trials: ' + str(template.GetNumTrials()))
         self.simulationReviewer.append(template.GetParameters())
 
-        # View Trial Results:
-        testResults = simulationSaves[inputNumber].GetTestData()
-
-        # Create a empty row at bottom of table
-        for trials in range(0, len(testResults)):
-            numRows = self.tableRawTestData.rowCount()
-            self.tableRawTestData.insertRow(numRows)
-            self.tableRawTestData.setItem(numRows, 0, QTableWidgetItem(str('{number:.{digits}f}'.format(number=testResults[trials].GetEstimatedPopulation(), digits=0))))
-            self.tableRawTestData.setItem(numRows, 1, QTableWidgetItem(str(testResults[trials].GetFirstPassCaught())))
-            self.tableRawTestData.setItem(numRows, 2, QTableWidgetItem(str(testResults[trials].GetSecondPassCaught())))
-            self.tableRawTestData.setItem(numRows, 3, QTableWidgetItem(str(testResults[trials].GetSecondPassRecaught())))
+        # View Trial Results, the model reads the store's columns as rows are shown:
+        self.trialTableModel.SetResultStore(simulationSaves[inputNumber].GetTestData())
 
         self.tableRawTestData.setSortingEnabled(True)
 
@@ -952,101 +800,66 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     #################################################################################
     def DisplayFishData(self):
 
-        # Clear table
-        self.tableRawFishData.setRowCount(0)
         self.tableRawFishData.setSortingEnabled(False)
 
         # Get input number
         inputNumber = int(self.loadSimulationNumberInput.currentText()) - 1
 
         # View Trial Results:
-        testResults = simulationSaves[inputNumber].GetTestData()
+        resultStore = simulationSaves[inputNumber].GetTestData()
 
         # Get row and column highlighted:
         for idx in self.tableRawTestData.selectionModel().selectedIndexes():
-            rowNum = idx.row()
-
-            self.tableRawTestData.rowCount()
+            rowNum = self.trialTableModel.GetStoreRow(idx.row())
 
         # Get fish data for that specific test:
-        fishData = testResults[rowNum].GetFishData()
+        fishData = resultStore.GetFishData(rowNum)
+
+        # Subreach window of the filters, when the subreach is bounded:
+        window = None
+        if simulationSaves[inputNumber].GetBoundApplicable() == 1:
+            window = (simulationSaves[inputNumber].GetParamLowBound(), simulationSaves[inputNumber].GetParamHighBound())
 
-        # Show fish data in debug mode:
+        # Show fish data, in debug mode with the cells highlighted. Sort orders and filters are cached per trial:
+        highlights = None
         if self.actionDebug_Mode.isChecked():
-            for itr in range(0, len(fishData)):
-                numRows = self.tableRawFishData.rowCount()
-                self.tableRawFishData.insertRow(numRows)
-
-                # Capture Parameters:
-                fishDataCapOne = fishData[itr].GetCaptureProbability()
-                fishDataCapTwo = fishData[itr].GetCaptureProbabilityTwo()
-                self.tableRawFishData.setItem(numRows, 0, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishDataCapOne, digits=2))))
-                self.tableRawFishData.setItem(numRows, 6, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishDataCapTwo, digits=2))))
-                if simulationSaves[inputNumber].GetParamCaptureCategory() == 1:
-                    if fishDataCapOne <= simulationSaves[inputNumber].GetParamCaptureOne():
-                        self.tableRawFishData.item(numRows, 0).setBackground(QColor(55, 174, 114))
-                    if fishDataCapTwo <= simulationSaves[inputNumber].GetParamCaptureTwo():
-                        self.tableRawFishData.item(numRows, 6).setBackground(QColor(55, 174, 114))
-                elif simulationSaves[inputNumber].GetParamCaptureCategory() == 2:
-                    if fishDataCapOne <= fishData[itr].GetParameterCaptureOne()[0]:
-                        self.tableRawFishData.item(numRows, 0).setBackground(QColor(55, 174, 114))
-                    if fishDataCapTwo <= fishData[itr].GetParameterCaptureTwo()[0]:
-                        self.tableRawFishData.item(numRows, 6).setBackground(QColor(55, 174, 114))
-
-                # Subreach One:
-                subReachPosOne = fishData[itr].GetSubReachPos()
-                self.tableRawFishData.setItem(numRows, 1, QTableWidgetItem(str(subReachPosOne)))
-                if simulationSaves[inputNumber].GetBoundApplicable() == 1:
-                    if simulationSaves[inputNumber].GetParamLowBound() <= subReachPosOne <= simulationSaves[inputNumber].GetParamHighBound():
-                        self.tableRawFishData.item(numRows, 1).setBackground(QColor(55, 174, 114))
-
-                # Tag loss:
-                tagStatus = fishData[itr].GetFishTag()
-                self.tableRawFishData.setItem(numRows, 2, QTableWidgetItem(str(tagStatus)))
-                self.tableRawFishData.setItem(numRows, 3, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetTagLoss(), digits=2))))
-                if tagStatus == 0:
-                    self.tableRawFishData.item(numRows, 2).setBackground(QColor(223, 36, 36))
-                elif tagStatus == 1:
-                    self.tableRawFishData.item(numRows, 2).setBackground(QColor(55, 174, 114))
-
-                # Mortality:
-                mortalityStatus = fishData[itr].GetMortality()
-                self.tableRawFishData.setItem(numRows, 4, QTableWidgetItem(str(mortalityStatus)))
-                if mortalityStatus == 0:
-                    self.tableRawFishData.item(numRows, 4).setBackground(QColor(223, 36, 36))
-                elif mortalityStatus == 1:
-                    self.tableRawFishData.item(numRows, 4).setBackground(QColor(55, 174, 114))
-
-                # Migration distance:
-                self.tableRawFishData.setItem(numRows, 5, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetMigrationDistance(), digits=2))))
-
-                # Subreach two:
-                subReachPosTwo = fishData[itr].GetSubReachPosTwo()
-                self.tableRawFishData.setItem(numRows, 7, QTableWidgetItem(str('{number:.{digits}f}'.format(number=subReachPosTwo, digits=2))))
-                if simulationSaves[inputNumber].GetBoundApplicable() == 1:
-                    if simulationSaves[inputNumber].GetParamLowBound() <= subReachPosTwo <= simulationSaves[inputNumber].GetParamHighBound():
-                        self.tableRawFishData.item(numRows, 7).setBackground(QColor(55, 174, 114))
-
-                # Status:
-                self.tableRawFishData.setItem(numRows, 8, QTableWidgetItem(str(fishData[itr].GetRecaughtStat())))
-        else:
-            # Show fish data:
-            for itr in range(0, len(fishData)):
-                numRows = self.tableRawFishData.rowCount()
-
-                self.tableRawFishData.insertRow(numRows)
-                self.tableRawFishData.setItem(numRows, 0, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetCaptureProbability(), digits=2))))
-                self.tableRawFishData.setItem(numRows, 1, QTableWidgetItem(str(fishData[itr].GetSubReachPos())))
-                self.tableRawFishData.setItem(numRows, 2, QTableWidgetItem(str(fishData[itr].GetFishTag())))
-                self.tableRawFishData.setItem(numRows, 3, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetTagLoss(), digits=2))))
-                self.tableRawFishData.setItem(numRows, 4, QTableWidgetItem(str(fishData[itr].GetMortality())))
-                self.tableRawFishData.setItem(numRows, 5, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetMigrationDistance(), digits=2))))
-                self.tableRawFishData.setItem(numRows, 6, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetCaptureProbabilityTwo(), digits=2))))
-                self.tableRawFishData.setItem(numRows, 7, QTableWidgetItem(str('{number:.{digits}f}'.format(number=fishData[itr].GetSubReachPosTwo(), digits=2))))
-                self.tableRawFishData.setItem(numRows, 8, QTableWidgetItem(str(fishData[itr].GetRecaughtStat())))
+            highlights = self.fishHighlights(simulationSaves[inputNumber], fishData)
+        self.fishTableModel.SetFishData(fishData, highlights, (id(simulationSaves[inputNumber]), rowNum), window)
 
         self.tableRawFishData.setSortingEnabled(True)
 
+    #################################################################################
+    # Debug mode highlights of the fish table: one array of codes per column
+    #################################################################################
+    def fishHighlights(self, simulation, fishData):
+        def highlight(green, red=None):
+            codes = np.where(green, HIGHLIGHT_GREEN, HIGHLIGHT_NONE).astype(np.int8)
+            if red is not None:
+                codes[red] = HIGHLIGHT_RED
+            return codes
+
+        highlights = {}
+        # Capture Parameters:
+        if simulation.GetParamCaptureCategory() == 1:
+            highlights[0] = highlight(fishData.captureProbQ <= simulation.GetParamCaptureOne())
+            highlights[6] = highlight(fishData.captureProbQTwo <= simulation.GetParamCaptureTwo())
+        elif simulation.GetParamCaptureCategory() == 2 and fishData.parameterCaptureOne is not None:
+            highlights[0] = highlight(fishData.captureProbQ <= fishData.parameterCaptureOne)
+            highlights[6] = highlight(fishData.captureProbQTwo <= fishData.parameterCaptureTwo)
+
+        # Subreach one and two:
+        if simulation.GetBoundApplicable() == 1:
+            lowBound = simulation.GetParamLowBound()
+            highBound = simulation.GetParamHighBound()
+            highlights[1] = highlight((lowBound <= fishData.subReachPos) & (fishData.subReachPos <= highBound))
+            highlights[7] = highlight((lowBound <= fishData.subReachPosTwo) & (fishData.subReachPosTwo <= highBound))
+
+        # Tag loss and mortality:
+        tagStatus = fishData.GetTagStatus()
+        highlights[2] = highlight(tagStatus == 1, tagStatus == 0)
+        highlights[4] = highlight(fishData.mortality, ~fishData.mortality)
+        return highlights
+
     #################################################################################
     # Lincoln Peterson Calculation
     #################################################################################
@@ -1091,83 +904,38 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.LincolnPetersonChapmanFormula()
 
     #################################################################################
-    # Get Fish population parameter as to whether it is an open or closed population.
+    # Simulation config: every parameter of the run, read from the widgets once
     #################################################################################
-    def getPopulationParameter(self):
-        global populationSize
-        global populationType
-        global migrationString
-
-        if self.checkBoxClosedPopulation.isChecked():
-            populationSize = self.totalPopulationInput.value()
-            populationType = "Closed Population"
-            migrationString = "Migration Distance/Rate: None"
-        elif self.checkBoxOpenPopulation.isChecked():
-            populationSize = self.totalPopulationInput.value()
-            populationType = "Open Population"
+    def getSimulationConfig(self):
+        # Open population: keep the migration boxes in step with the sliders
+        if self.checkBoxOpenPopulation.isChecked():
             self.MigrationSlider()
             self.MigrationDistanceSlider()
-            migrationString = migrationBiasStatus + migrationDistStatus
-
-    #################################################################################
-    # Get Capture Probability for the fishes and/or the sample
-    #################################################################################
-    def getCaptureProbabilityParameter(self):
-        global captureProbabilityFish
-        global captureProbabilityType
-        global captureProbabilityString
-        # Equal probability for all fishes and each sample:
-        if self.checkBoxCaptureEqual.isChecked():
-            captureProbabilityFish = self.captureProbabilityInput.value()
-            captureProbabilityString = 'Capture Probability q = ' + str(captureProbabilityFish)
-            captureProbabilityType = "Equal capture probability for all samples"
-        if self.checkBoxCaptureVary.isChecked():
-            captureProbabilityFish = self.captureProbabilityInput.value()
-            captureProbabilityFishTwo = self.captureProbabilityInputVaryTwo.value()
-            captureProbabilityString = 'Capture probability for first pass: q = ' + str(captureProbabilityFish) \
-                                       + 'Capture probability for second pass: q = ' + str(captureProbabilityFishTwo)
-            captureProbabilityType = "Capture probability varying per sample."
-        if self.checkBoxCaptureRandomPerFish.isChecked():
-            captureProbabilityString = 'Capture Probability: Completely random'
-            captureProbabilityType = "Capture Probability: Completely random per fish"
-
-    #################################################################################
-    # Get Fish population parameter as to whether it is an open or closed population.
-    #################################################################################
-    def getTagLossParameter(self):
-        global tagLossVar
-        global tagLossType
-        # Equal probability for all fishes and each sample:
-        if not self.checkBoxTagLoss.isChecked():
-            # do nothing
-            tagLossVar = self.tagLossProbabilityInput.value()
-            tagLossType = "No Tag Loss"
-        else:
-            tagLossVar = self.tagLossProbabilityInput.value()
-            tagLossType = "Possible tag loss at " + str(tagLossVar * 100) + "%"
-
-    #################################################################################
-    # Get SubReach Parameter and see if it is normal sized or extended.
-    #################################################################################
-    def getSubReachSizeParameter(self):
-        global subReachSize
-        global subReachType
-
-        # SubReach Type
-        if self.checkBoxNoSubreach.isChecked():
-            # All fishes are fair game to get caught
-            subReachType = "No Subreach Parameter"
-        elif self.checkBoxVariedSubreach.isChecked():
-            # Need to set boundaries so it doesn't crash for the print out below:
-            self.SetSubReachBoundary()
-            subReachType = "Varied Subreach Size: " + str(self.subReachMovementOption.value()) + "% of subreach. " + " L-bound:" + str(lowerBoundStudyReach) + ". H-bound: " + str(upperBoundStudyReach)
 
-    #################################################################################
-    # Get SubReach Parameter and see if it is normal sized or extended.
-    #################################################################################
-    def getNumTrials(self):
-        global numTrials
-        numTrials = self.numTrialsInput.value()
+        # A new master seed when the seed is "Random"
+        seed = self.seedInput.value()
+        if seed == 0:
+            seed = newMasterSeed()
+
+        return SimulationConfig(
+            populationType=self.populationOption.checkedId(),
+            populationSize=self.totalPopulationInput.value(),
+            captureMode=self.captureProbabilityOption.checkedId(),
+            captureProbOne=self.captureProbabilityInput.value(),
+            captureProbTwo=self.captureProbabilityInputVaryTwo.value(),
+            tagLoss=self.checkBoxTagLoss.isChecked(),
+            tagLossRate=self.tagLossProbabilityInput.value(),
+            subReachMode=self.subReachSizeOption.checkedId(),
+            subReachFraction=self.subReachMovementOptionBox.value(),
+            mortalityRate=self.openPopulationMoralityInput.value(),
+            migrationDistance=self.migrationDistanceBox.value(),
+            migrationRate=self.migrationRateBox.value(),
+            numTrials=self.numTrialsInput.value(),
+            seed=seed,
+            engine=self.simulationEngineInput.currentIndex(),
+            precisionMode=self.precisionModeInput.currentIndex(),
+            precisionTarget=self.precisionTargetInput.value(),
+            fishRetention=self.fishRetentionInput.currentIndex())
 
     #################################################################################
     # Function  for graphing given an array value
@@ -1181,129 +949,115 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         plt.grid(True)
         plt.show(block=False)
 
-    #################################################################################
-    # Subreach Boundaries
-    #################################################################################
-    def SetSubReachBoundary(self):
-        global lowerBoundStudyReach
-        global upperBoundStudyReach
-
-        size = (REACH_SIZE * self.subReachMovementOptionBox.value())
-        lowerBoundStudyReach = (REACH_SIZE / 2) - (size / 2)
-        upperBoundStudyReach = (REACH_SIZE / 2) + (size / 2)
-
     #################################################################################
     # Multi-thread Worker: Progress Update, catches what is emitted
     #################################################################################
-    def threadProgress(self, n):
+    def threadProgress(self, n, progress):
         # emitted goes here...
         # Need to declare globally first, then do
         # global x, then set it:
         # https://www.youtube.com/watch?v=fKl2JW_qrso&t=2078s
         x = "%d%% done" % n
         print(x)
+        self.progressBar.setValue(n)
+        self.showRunningStatistics(self.runningStatistics, progress)
+        self.liveHistogram.Update(self.runningStatistics)
 
     #################################################################################
-    # Multi-processing .....
+    # Multi-thread Worker: Function to execute, every population type runs here
     #################################################################################
-    def threadExecuteTwo(self, a, b, progress_callback):
-        global simulationResult
-        simulationResult = []
-        lock1 = multiprocessing.Lock()
-        lock2 = multiprocessing.Lock()
-        i = 0
-        numberProcess = multiprocessing.cpu_count()
+    def threadExecute(self, config, progress_callback):
         start_time = time.time()
-        while i < numTrials:
-            processes = []
-            m = 0
-            for k in range(0, 10):
-                if i < numTrials:
-                    process = multiprocessing.Process(target=self.simulateMultiProcStyle(simulationResult, i, lock1, lock2))
-                    processes.append(process)
-                    process.start()
-                    i +=1
-                    m +=1
-            for k in range(0, m):
-                processes[k].join()
-        print("--- %s seconds ---" % (time.time() - start_time))
-        return "Done"
-
-    #################################################################################
-    # Multi-thread Worker: Function to execute
-    #################################################################################
-    def threadExecute(self, a, b, progress_callback):
-
-        # progress_callback.emit(n*100/4)
-        # Start multiprocessing:
-        global simulationResult
-        simulationResult = []
-        start_time = time.time()
-        counter = 0
+        resultStore = SimulationResultStore.Concatenate([])
+        statistics = estimateStatistics(config)
+        self.runningStatistics = statistics
+        progressCallback = lambda progress, runningStatistics: self.threadRunningStatistics(
+            progress_callback, progress, runningStatistics)
         try:
-            with concurrent.futures.ProcessPoolExecutor() as executor:
-                results = [executor.submit(self.simulateMultiProcStyleNoLock(simulationResult, i), i) for i in range(numTrials)]
+            if config.populationType == POPULATION_OPEN:
+                # Start multiprocessing, trial chunks run on every core and come back to this thread:
+                resultStore, statistics = runTrialsParallel(
+                    config, progressCallback=progressCallback, shouldStop=lambda: stopSimulation,
+                    keepEstimates=False)[1:]
+            else:
+                # Trials run in batches on the config's engine, in this thread:
+                resultStore, statistics = runTrials(
+                    config, progressCallback=progressCallback, shouldStop=lambda: stopSimulation,
+                    keepEstimates=False)[1:]
         except Exception as e:
             print("Encountered an error, try running again:" + str(e))
 
         print("--- %s seconds ---" % (time.time() - start_time))
 
-        # Goes to threadResult function`
-        return "Done."
+        # Goes to threadComplete function
+        return self.simulationParameters(config, resultStore, statistics)
 
     #################################################################################
-    # Multi-thread Worker: Results of thread Execute
+    # Multi-thread Worker: keep the running statistics for threadProgress, send the progress
     #################################################################################
-    def threadResult(self, s):
-        print(s)
+    def threadRunningStatistics(self, progress_callback, progress, statistics):
+        # A copy, the run keeps adding to statistics while the GUI thread draws it
+        self.runningStatistics = copy.deepcopy(statistics)
+        progress_callback[int, object].emit(progress.GetPercent(), progress)
 
     #################################################################################
-    # Multi-thread Worker: Thread Completed
+    # Multi-thread Worker: summary of the run, SimulationParameters of its results
     #################################################################################
-    def threadComplete(self):
-
-        print("Thread Complete.")
-        # Create an np array for the results:
-        arrayResult = np.array(simulationResult)
+    def simulationParameters(self, config, resultStore, statistics):
+        thisSimulation = SimulationParameters(statistics.GetCount(), statistics.GetMean(), config.populationSize, resultStore)
+        thisSimulation.SetStatistics(statistics)
+        thisSimulation.SetConfig(config)
+        thisSimulation.SetSeed(config.seed)
+        thisSimulation.SetPrecision(measurePrecision(config, statistics))
+        thisSimulation.SetPartial(self.partialResult(config, statistics))
+        thisSimulation.SetParameterString(config.GetParameterString() + "\n" + self.trialsString(config, statistics)
+                                          + "\n" + self.additionalStatsString(statistics))
+        # Quartiles and median from the streaming statistics of the run:
+        thisSimulation.SetMedian(statistics.GetMedian())
+        thisSimulation.SetFirstQuart(statistics.GetQuantile(.25))
+        thisSimulation.SetSecondQuart(statistics.GetQuantile(.50))
+        thisSimulation.SetThirdQuart(statistics.GetQuantile(0.75))
+        thisSimulation.SetFourthQuart(statistics.GetQuantile(1))
+        # Co-efficient of skewness:
+        # https://www.geeksforgeeks.org/scipy-stats-skew-python/
+        thisSimulation.SetSkew(statistics.GetSkew())
 
-        # Get Quartiles:
-        firstQuart = np.quantile(arrayResult, .25)
-        secondQuart = np.quantile(arrayResult, .50)
-        thirdQuart = np.quantile(arrayResult, 0.75)
-        fourthQuart = np.quantile(arrayResult, 1)
+        # For testing - capture probability
+        self.setTestingParameters(thisSimulation, config)
+        return thisSimulation
 
-        # Get median:
-        median = np.median(arrayResult)
+    #################################################################################
+    # Median, quartiles and skewness of the estimates, as shown with the results
+    #################################################################################
+    def additionalStatsString(self, statistics):
+        return "\nMedian: " + str('{number:.{digits}f}'.format(number=statistics.GetMedian(), digits=2)) + "\nQuartiles [Q1, Q2, Q3, Q4]: " \
+               + str('{number:.{digits}f}'.format(number=statistics.GetQuantile(.25), digits=2)) + " , " \
+               + str('{number:.{digits}f}'.format(number=statistics.GetQuantile(.50), digits=2)) + " , " \
+               + str('{number:.{digits}f}'.format(number=statistics.GetQuantile(0.75), digits=2)) + " , " \
+               + str('{number:.{digits}f}'.format(number=statistics.GetQuantile(1), digits=2)) + "\nCoefficient of Skewness: " \
+               + str('{number:.{digits}f}'.format(number=statistics.GetSkew(), digits=2))
 
-        skewNess = scipy.stats.skew(simulationResult)
+    #################################################################################
+    # Multi-thread Worker: Thread Completed, thisSimulation is the SimulationParameters of the run
+    #################################################################################
+    def threadComplete(self, thisSimulation):
 
-        additionalStats = "\nMedian: " + str('{number:.{digits}f}'.format(number=median, digits=2)) + "\nQuartiles [Q1, Q2, Q3, Q4]: " \
-                          + str('{number:.{digits}f}'.format(number= firstQuart, digits=2)) + " , " \
-                          + str('{number:.{digits}f}'.format(number= secondQuart, digits=2)) + " , " \
-                          + str('{number:.{digits}f}'.format(number= thirdQuart, digits=2)) + " , " \
-                          + str('{number:.{digits}f}'.format(number= fourthQuart, digits=2)) + "\nCoefficient of Skewness: " \
-                          + str('{number:.{digits}f}'.format(number= skewNess, digits=2))
+        print("Thread Complete.")
+        config = thisSimulation.GetConfig()
+        statistics = thisSimulation.GetStatistics()
+        self.liveHistogram.Update(statistics, force=True)
 
         # Print out results
-        self.simulationParameterPrint.append('Mean Population estimation: ' + str('{number:.{digits}f}'.format(number=arrayResult.mean(), digits=2)))
+        self.simulationParameterPrint.append('Mean Population estimation: ' + str('{number:.{digits}f}'.format(number=statistics.GetMean(), digits=2)))
         # Print out Parameters
-        self.simulationParameterPrint.append("Actual Population Size: " + str(populationSize) + "\nType: " + populationType)
-        self.simulationParameterPrint.append(captureProbabilityString + "\nType: " + captureProbabilityType)
-        self.simulationParameterPrint.append(tagLossType + "\nSubreach Type: " + subReachType)
-        self.simulationParameterPrint.append("Number of Trials: " + str(numTrials))
-        self.simulationParameterPrint.append(migrationString)
-        self.simulationParameterPrint.append(additionalStats)
+        self.simulationParameterPrint.append("Actual Population Size: " + str(config.populationSize) + "\nType: " + config.GetPopulationTypeText())
+        self.simulationParameterPrint.append(config.GetCaptureProbabilityText() + "\nType: " + config.GetCaptureProbabilityTypeText())
+        self.simulationParameterPrint.append(config.GetTagLossText() + "\nSubreach Type: " + config.GetSubReachText())
+        self.simulationParameterPrint.append(self.trialsString(config, statistics) + "\nSeed: " + str(config.seed))
+        self.simulationParameterPrint.append(config.GetMigrationText())
+        self.simulationParameterPrint.append(self.additionalStatsString(statistics))
 
         # Add the overall summary for this result to the saved array for all simulations
-        thisSimulation = SimulationParameters(numTrials, arrayResult.mean(), populationSize, testResultsArray)
-        thisSimulation.SetParameterString(populationType + "\n" + captureProbabilityString + "\n" + captureProbabilityType + "\n" + tagLossType + "\n" \
-                                          + subReachType + "\n" + migrationString + "\n" + additionalStats)
-        thisSimulation.SetMedian(median)
-        thisSimulation.SetFirstQuart(firstQuart)
-        thisSimulation.SetSecondQuart(secondQuart)
-        thisSimulation.SetThirdQuart(thirdQuart)
-        thisSimulation.SetFirstQuart(fourthQuart)
-        thisSimulation.SetSkew(skewNess)
         simulationSaves.append(thisSimulation)
 
         # Add this to the data log:
@@ -1312,23 +1066,6 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.runSimulationButton.setEnabled(True)
         self.progressBar.setVisible(False)
 
-        # For testing - capture probability
-        if self.checkBoxCaptureEqual.isChecked():
-            thisSimulation.SetParamCaptureCategory(1)
-            thisSimulation.SetParamCaptureOne(self.captureProbabilityInput.value())
-            thisSimulation.SetParamCaptureTwo(self.captureProbabilityInput.value())
-        elif self.checkBoxCaptureVary.isChecked():
-            thisSimulation.SetParamCaptureCategory(1)
-            thisSimulation.SetParamCaptureOne(self.captureProbabilityInput.value())
-            thisSimulation.SetParamCaptureTwo(self.captureProbabilityInputVaryTwo.value())
-        elif self.checkBoxCaptureRandomPerFish.isChecked():
-            thisSimulation.SetParamCaptureCategory(2)
-
-        if self.checkBoxVariedSubreach.isChecked():
-            thisSimulation.SetBoundApplicable(1)
-            thisSimulation.SetParamLowBound(lowerBoundStudyReach)
-            thisSimulation.SetParamHighBound(upperBoundStudyReach)
-
         # Thread Complete:
         QMessageBox.about(self, "Status Message", "Simulation Complete. Press OK to display results.")
         # Load the data
@@ -1339,26 +1076,20 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.saveAllTrialsCheckBox.setEnabled(True)
         self.saveSpecificTrialCheckBox.setEnabled(True)
         self.saveAllTrialsSeparateCheckBox.setEnabled(True)
+        self.saveAllTrialsIndexedCheckBox.setEnabled(True)
         self.stopSimulationButton.setEnabled(False)
 
     #################################################################################
     # Multi-thread Worker: Set Connections, then run
     #################################################################################
-    def threadSetAndExecute(self, a):
-        worker = Worker(self.threadExecute, a, "placeholderArgument2")
-        worker.signals.result.connect(self.threadResult)
-        worker.signals.finished.connect(self.threadComplete)
-        worker.signals.progress.connect(self.threadProgress)
+    def threadSetAndExecute(self, config):
+        worker = Worker(self.threadExecute, config)
+        worker.signals.result.connect(self.threadComplete)
+        worker.signals.progress[int, object].connect(self.threadProgress)
 
         # Execute thread
         self.threadpool.start(worker)
 
-    #################################################################################
-    # Simulation MULTIPROCESS / MULTI-THREADING STYLE
-    #################################################################################
-    def simulateMulti(self, a):
-        self.threadSetAndExecute(a)
-
     #################################################################################
     # SIMULATION - TAB TWO
     #################################################################################
@@ -1366,16 +1097,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         # QMessageBox.information(self, "A Good Msage", "Success. Results shown in the results box.")
 
-        # Get Population and whether it is a closed population or open population
-        self.getPopulationParameter()
-        # Get Capture Probability for the Samples
-        self.getCaptureProbabilityParameter()
-        # Get Tag Loss True/False
-        self.getTagLossParameter()
-        # Get SubReach Size
-        self.getSubReachSizeParameter()
-        # Get Number of Trials
-        self.getNumTrials()
+        # Population, capture probability, tag loss, subreach, migration, number of trials and seed:
+        config = self.getSimulationConfig()
         # Enable Save Button
         self.saveResultsButton.setEnabled(True)
         self.refreshResultsButton.setEnabled(True)
@@ -1386,740 +1109,164 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Simulate and plot
         self.progressBar.setVisible(True)
         self.progressBar.setEnabled(True)
-        self.simulateAndPlot()
+        self.simulateAndPlot(config)
 
     #################################################################################
     # Simulation and then plot histogram
     #################################################################################
-    def simulateAndPlot(self):
+    def simulateAndPlot(self, config):
         global stopSimulation
         stopSimulation = False
         self.runSimulationButton.setEnabled(False)
         self.stopSimulationButton.setEnabled(True)
         self.simulationParameterPrint.clear()
+        self.liveHistogram.Start(config.populationSize)
         plt.close()
 
-        if self.checkBoxOpenPopulation.isChecked() and not self.checkBoxClosedPopulation.isChecked():
-            plt.close()
-            self.simulateMulti(1)
+        # Every population type runs on a Worker, the results come back to threadComplete
+        self.threadSetAndExecute(config)
+
+    #################################################################################
+    # Trials used and the precision reached by the estimates
+    #################################################################################
+    def trialsString(self, config, statistics):
+        precision = measurePrecision(config, statistics)
+        if config.precisionMode == PRECISION_MEDIAN_CI:
+            precisionString = "95% CI half-width of the median: " + str('{number:.{digits}f}'.format(number=precision, digits=2))
         else:
-            # Declare array for results:
-            simulationResults = []
-            start_time = time.time()
-            arrayResult, additionalResults = self.simulate(simulationResults)
-            print("--- %s seconds ---" % (time.time() - start_time))
-
-            # Print out results
-            meanResult = arrayResult.mean()
-            self.simulationParameterPrint.append('Mean Population Estimation: ' + str('{number:.{digits}f}'.format(number= meanResult, digits=0)))
-            # Print out Parameters
-            self.simulationParameterPrint.append("Actual Population Size: " + str(populationSize) + "\nType: " + populationType)
-            self.simulationParameterPrint.append(captureProbabilityString + "\nType: "
-                                                 + captureProbabilityType)
-            self.simulationParameterPrint.append(tagLossType + "\nSubreach Type: " + subReachType)
-            self.simulationParameterPrint.append("Number of Trials: " + str(numTrials))
-            self.simulationParameterPrint.append(migrationString)
-            self.simulationParameterPrint.append(additionalResults)
-            QMessageBox.about(self, "Status Message", "Simulation Complete. Press OK to display results.")
-            # Load the data
-            self.loadSimulationNumberInput.setCurrentText(str(self.loadSimulationNumberInput.count()))
-            self.tabBox.setCurrentIndex(2)
-            self.RefreshResults()
-            # Save data
-            self.saveAllTrialsCheckBox.setEnabled(True)
-            self.saveSpecificTrialCheckBox.setEnabled(True)
-            self.saveAllTrialsSeparateCheckBox.setEnabled(True)
-            self.stopSimulationButton.setEnabled(False)
-
-    #################################################################################
-    # Simulate Fishes - CLOSED POPULATION
-    #################################################################################
-    def simulate(self, simulationResults):
-        global stopSimulation
-        # Be able to save data for each simulation:
-        for i in range(0, numTrials):
-
-            # Need to stop simulation?
-            app.processEvents()
-            if stopSimulation is True:
-                break
-
-            # Generate random numbers for capture probability:
-            if self.checkBoxClosedPopulation.isChecked():
-                qCatchValue = np.random.rand(populationSize)
-            elif self.checkBoxOpenPopulation.isChecked():
-                qCatchValue = np.random.rand(populationSize * 3)
-            tagLossIndex = []
-            fishLocation = []
-
-            # For Open Population, do three areas:
-            if self.checkBoxOpenPopulation.isChecked():
-                # Range size - 100 to 200, [-inf, 0) is out of bounds, [0, 100] is the study reach default, [101, to inf) is out of bounds
-                # First 1/3 of area: D (downstream),  Second 1/3 of area: C (central), Third 1/3 of area: U (upstream)
-                fishLocation.extend(np.random.randint(-REACH_SIZE, 1, populationSize))
-                fishLocation.extend(np.random.randint(1, REACH_SIZE + 1, populationSize))
-                fishLocation.extend(np.random.randint(REACH_SIZE + 1, REACH_SIZE * 2, populationSize))
-            # Else we do one whole study reach:
-            else:
-                # Range size: 0 to 100
-                fishLocation = [np.random.randint(0, REACH_SIZE + 1) for p in range(0, populationSize)]
-                # Set initial location of fish:
-
-            # Get lower and upper bounds
-            self.SetSubReachBoundary()
-
-            # ####################### Create fish structure, generate characteristics for each fish ############### #
-            for m in range(len(qCatchValue)):
-                if m == 0:
-                    fish = Fish(qCatchValue[m], -1, -1, -1, 1, -1)
-                    fishPopulation = [fish]
-                    # print(str(fishPopulation[i].captureProbQ))
-                else:
-                    fish = Fish(qCatchValue[m], -1, -1, -1, 1, -1)
-                    fishPopulation.insert(m, fish)
-                    # print(str(fishPopulation[i].captureProbQ))
-
-                # Set location of the fish:
-                fishPopulation[m].SetSubReachPos(fishLocation[m])
-
-            # ################################START THE FIRST PASS ################################################# #
-            firstPassMarkedFishes = 0
-            # First set of fish population marked.
-            for j in range(len(qCatchValue)):
-                # ############################# If sub reach is not a factor: ############################# #
-                if self.checkBoxNoSubreach.isChecked():
-                    # Do the first scenario if there is equal or varying probability between samples:
-                    if self.checkBoxCaptureVary.isChecked() or self.checkBoxCaptureEqual.isChecked():
-                        if fishPopulation[j].captureProbQ <= self.captureProbabilityInput.value():
-                            # Tag the fish
-                            fishPopulation[j].SetFishTag(1)
-                            tagLossIndex.append(j)
-                            # Increment Counter:
-                            firstPassMarkedFishes += 1
-                            fishPopulation[j].SetRecaughtStat('FIRST PASS')
-                    # Do this scenario if each fish has a random probability of getting captured:
-                    elif self.checkBoxCaptureRandomPerFish.isChecked():
-                        fishPopulation[j].SetParameterCaptureOne(np.random.rand(1))
-                        if fishPopulation[j].captureProbQ <= fishPopulation[j].GetParameterCaptureOne():
-                            # Tag the fish
-                            fishPopulation[j].SetFishTag(1)
-                            tagLossIndex.append(j)
-                            # Increment Counter:
-                            firstPassMarkedFishes += 1
-                            fishPopulation[j].SetRecaughtStat('FIRST PASS')
-                    # End this scenario
-                # ############################# End the no sub reach parameter ############################# #
-                # If sub reach is a factor, catch only those in study
-                elif self.checkBoxVariedSubreach.isChecked():
-                    # Do the first scenario if there is equal or varying probability between samples:
-                    if self.checkBoxCaptureVary.isChecked() or self.checkBoxCaptureEqual.isChecked():
-                        # Capture only if the fish is in the range:
-                        if (lowerBoundStudyReach <= fishPopulation[j].GetSubReachPos() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                            if fishPopulation[j].captureProbQ <= self.captureProbabilityInput.value():
-                                # Tag the fish
-                                fishPopulation[j].SetFishTag(1)
-                                tagLossIndex.append(j)
-                                # Increment Counter:
-                                firstPassMarkedFishes += 1
-                                fishPopulation[j].SetRecaughtStat('FIRST PASS')
-                    # Do this scenario if each fish has a random probability of getting captured:
-                    elif self.checkBoxCaptureRandomPerFish.isChecked():
-                        fishPopulation[j].SetParameterCaptureOne(np.random.rand(1))
-                        if (lowerBoundStudyReach <= fishPopulation[j].GetSubReachPos() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                            if fishPopulation[j].captureProbQ <= fishPopulation[j].GetParameterCaptureOne():
-                                # Tag the fish
-                                fishPopulation[j].SetFishTag(1)
-                                tagLossIndex.append(j)
-                                # Increment Counter:
-                                firstPassMarkedFishes += 1
-                                fishPopulation[j].SetRecaughtStat('FIRST PASS')
-                    # End this scenario
-                # End the normal sub reach parameter
-            # ############################################## BREAK ################################################# #
-            # Tag loss scenario:
-            tagLossCounter = 0
-            # See if the fish loses its tag after being tagged.
-            if self.checkBoxTagLoss.isChecked():
-                tagLossValue = np.random.rand(len(tagLossIndex))
-                for v in range(len(tagLossIndex)):
-                    fishPopulation[tagLossIndex[v]].SetTagLoss(tagLossValue[v])
-                    if fishPopulation[tagLossIndex[v]].tagLoss <= tagLossVar:
-                        fishPopulation[tagLossIndex[v]].SetFishTag(0)
-                        tagLossCounter += 1
-
-            # ########################################### END BREAK ################################################# #
-            # self.simulationParameterPrint.append('Fishes caught during first pass: ' + str(firstPassMarkedFishes))
-            # ################################ START SECOND PASS ################################################# #
-            # Create new catch values
-            # Generate random numbers for capture probability:
-            if self.checkBoxClosedPopulation.isChecked():
-                qCatchValueTwo = np.random.rand(populationSize)
-                fishDeath = np.random.rand(populationSize)
-            elif self.checkBoxOpenPopulation.isChecked():
-                qCatchValueTwo = np.random.rand(populationSize * 3)
-                fishDeath = np.random.rand(populationSize * 3)
-
-            # Declare variables
-            secondPassFishes = 0
-            recapturedTaggedFish = 0
-            pointHolder = []
-
-            # #################################### START SECOND CAPTURE ################################################# #
-            for k in range(len(qCatchValueTwo)):
-                fishPopulation[k].SetCaptureProbabilityTwo(qCatchValueTwo[k])
-                fishPopulation[k].SetSubReachPosTwo(fishLocation[k])
-                # CLOSED POPULATION:
-                if self.checkBoxClosedPopulation.isChecked():
-                    # First scenario: no sub reach parameter:
-                    if self.checkBoxNoSubreach.isChecked():
-                        # Do this first scenario if there is equal probability between the two samples:
-                        if self.checkBoxCaptureEqual.isChecked():
-                            if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInput.value():
-                                # Can't capture a dead fish:
-                                if not fishPopulation[k].GetMortality() == 0:
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this second scenario if sample two has different capture variability from first capture sample:
-                        elif self.checkBoxCaptureVary.isChecked():
-                            if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInputVaryTwo.value():
-                                # Can't capture a dead fish:
-                                if not fishPopulation[k].GetMortality() == 0:
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this third scenario if fish has random capture probability as well:
-                        elif self.checkBoxCaptureRandomPerFish.isChecked():
-                            fishPopulation[k].SetParameterCaptureTwo(np.random.rand(1))
-                            if fishPopulation[k].captureProbQTwo <= fishPopulation[k].GetParameterCaptureTwo():
-                                # Can't capture a dead fish:
-                                if not fishPopulation[k].GetMortality() == 0:
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                    # Second scenario: varied sub reach parameter:
-                    elif self.checkBoxVariedSubreach.isChecked():
-                        # Do this first scenario if there is equal probability between the two samples:
-                        if self.checkBoxCaptureEqual.isChecked():
-                            # Check if it's in the sub reach in the first place, we use initial position as there is no
-                            # immigration or emigration
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach)  and self.subReachMovementOptionBox.value() > 0:
-                                # Can we capture it?
-                                if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInput.value():
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this second scenario if sample two has different capture variability from first capture sample:
-                        elif self.checkBoxCaptureVary.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach)  and self.subReachMovementOptionBox.value() > 0:
-                                # Can we capture it?
-                                if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInputVaryTwo.value():
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this third scenario if fish has random capture probability as well:
-                        elif self.checkBoxCaptureRandomPerFish.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            fishPopulation[k].SetParameterCaptureTwo(np.random.rand(1))
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach)  and self.subReachMovementOptionBox.value() > 0:
-                                # Can we capture it?
-                                if fishPopulation[k].captureProbQTwo <= fishPopulation[k].GetParameterCaptureTwo():
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-
-                # OPEN POPULATION SCENARIO
-                elif self.checkBoxOpenPopulation.isChecked():
-                    # Mortality an option?
-                    if fishDeath[k] <= self.openPopulationMoralityInput.value():
-                        # Kill the fish:
-                        fishPopulation[k].SetMortality(0)
-                    # MOVEMENT:
-                    migrationDistance = self.migrationDistanceBox.value()
-                    highBoundMovementRange = fishPopulation[k].GetSubReachPos() + (REACH_SIZE * migrationDistance)
-                    # https://www.geeksforgeeks.org/scipy-stats-beta-python/
-                    betaX = np.linspace(0, 1, 100)
-                    y1 = beta.pdf(betaX, BETA_DISTRIBUTION, BETA_DISTRIBUTION)
-                    # lowBoundMovementRange = fishPopulation[k].GetSubReachPos() - (REACH_SIZE * self.migrationDistanceBox.value())
-                    # highBoundMovementRange = fishPopulation[k].GetSubReachPos() + (REACH_SIZE * self.migrationDistanceBox.value())
-                    # First 1/3 of area: D (downstream),  Second 1/3 of area: C (central), Third 1/3 of area: U (upstream)
-                    correction = self.migrationRateBox.value() - 0.5
-                    point = np.random.randint(0, len(betaX))
-                    counter = 0
-                    while point in pointHolder or counter <= 100:
-                        point = np.random.randint(0, len(betaX))
-                        counter += 1
-                        if counter == 100:
-                            pointHolder.clear()
-
-                    if betaX[point] + correction < 0:
-                        if (y1[point] + REACH_SIZE * migrationDistance - (BETA_DISTRIBUTION / 2)) > highBoundMovementRange:
-                            fishMove = highBoundMovementRange
-                            fishPopulation[k].SetMigrationDistance(-fishMove)
-                            fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() - fishMove)
-                        else:
-                            fishMove = y1[point] + REACH_SIZE * migrationDistance - (BETA_DISTRIBUTION / 2)
-                            fishPopulation[k].SetMigrationDistance(-fishMove)
-                            fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() - fishMove)
-                    elif betaX[point] + correction >= 0:
-                        if (y1[point] + REACH_SIZE * migrationDistance - (BETA_DISTRIBUTION / 2)) > highBoundMovementRange:
-                            fishMove = highBoundMovementRange
-                            fishPopulation[k].SetMigrationDistance(fishMove)
-                            fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() + fishMove)
-                        else:
-                            fishMove = y1[point] + REACH_SIZE * migrationDistance - (BETA_DISTRIBUTION / 2)
-                            fishPopulation[k].SetMigrationDistance(fishMove)
-                            fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() + fishMove)
-
-                    # Second scenario: varied sub reach parameter:
-                    if self.checkBoxVariedSubreach.isChecked():
-                        # Do this first scenario if there is equal probability between the two samples:
-                        if self.checkBoxCaptureEqual.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            if lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach:
-                                # Can't capture a dead fish:
-                                if fishPopulation[k].GetMortality() == 1:
-                                    # Can we capture it?
-                                    if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInput.value():
-                                        secondPassFishes += 1
-                                        fishPopulation[k].SetRecaughtStat('NO TAG')
-                                        if fishPopulation[k].tagged == 1:
-                                            recapturedTaggedFish += 1
-                                            fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this second scenario if sample two has different capture variability from first capture sample:
-                        elif self.checkBoxCaptureVary.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            if lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach:
-                                # Can't capture a dead fish:
-                                if fishPopulation[k].GetMortality() == 1:
-                                    # Can we capture it?
-                                    if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInputVaryTwo.value():
-                                        secondPassFishes += 1
-                                        fishPopulation[k].SetRecaughtStat('NO TAG')
-                                        if fishPopulation[k].tagged == 1:
-                                            recapturedTaggedFish += 1
-                                            fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this third scenario if fish has random capture probability as well:
-                        elif self.checkBoxCaptureRandomPerFish.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            fishPopulation[k].SetParameterCaptureTwo(np.random.rand(1))
-                            if lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach:
-                                # Can't capture a dead fish:
-                                if not fishPopulation[k].GetMortality() == 0:
-                                    # Can we capture it?
-                                    if fishPopulation[k].captureProbQTwo <= fishPopulation[k].GetParameterCaptureTwo():
-                                        secondPassFishes += 1
-                                        fishPopulation[k].SetRecaughtStat('NO TAG')
-                                        if fishPopulation[k].tagged == 1:
-                                            recapturedTaggedFish += 1
-                                            fishPopulation[k].SetRecaughtStat('YES')
-            # End Second Capture Pass
-
-            # Estimation formula
-            estimatedSampleSizeN = (((firstPassMarkedFishes + 1) * (secondPassFishes + 1)) / (recapturedTaggedFish + 1)) - 1
-            simulationResults.append(estimatedSampleSizeN)
-            self.progressBar.setValue(i*100/numTrials)
-            # ######## START RAW DATA SAVING, ALLOWS USER TO VIEW RESULTS OF EACH SIMULATION ######################### #
-
-            # Put this test result in a list for raw  data viewing:
-            if i == 0:
-                testResult = TestResults(populationSize, estimatedSampleSizeN, firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishPopulation)
-                testResultsArray = [testResult]
-            else:
-                testResult = TestResults(populationSize, estimatedSampleSizeN, firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishPopulation)
-                testResultsArray.append(testResult)
+            precisionString = "Relative standard error of the mean: " + str('{number:.{digits}f}'.format(number=precision, digits=5))
+        trialsText = "Number of Trials: " + str(statistics.GetCount()) + " (" + config.GetPrecisionText() + ")"
+        if self.partialResult(config, statistics):
+            trialsText += "\nStopped: partial result, " + str(statistics.GetCount()) + " of " \
+                          + str(config.numTrials) + " trials completed"
+        return trialsText + "\n" + precisionString
 
-        # Create an np array for the results:
-        arrayResult = np.array(simulationResults)
+    #################################################################################
+    # Run stopped by the user before all its trials were done, its trials are kept
+    #################################################################################
+    def partialResult(self, config, statistics):
+        return stopSimulation and statistics.GetCount() < config.numTrials
 
-        # Get Quartiles:
-        firstQuart = np.quantile(arrayResult, .25)
-        secondQuart = np.quantile(arrayResult, .50)
-        thirdQuart = np.quantile(arrayResult, 0.75)
-        fourthQuart = np.quantile(arrayResult, 1)
+    #################################################################################
+    # Running statistics of the estimates so far, with the run's throughput and time
+    # left (RunProgress) when given, in the status bar
+    #################################################################################
+    def showRunningStatistics(self, statistics, progress=None):
+        if statistics is None or statistics.GetCount() == 0:
+            return
+        self.statusbar.showMessage(
+            ("Trials: " + str(statistics.GetCount()) if progress is None else progress.GetText())
+            + "   Mean estimate: " + str('{number:.{digits}f}'.format(number=statistics.GetMean(), digits=2))
+            + "   Median: " + str('{number:.{digits}f}'.format(number=statistics.GetMedian(), digits=2))
+            + "   SD: " + str('{number:.{digits}f}'.format(number=statistics.GetStandardDeviation(), digits=2)))
 
-        # Get median:
-        median = np.median(arrayResult)
+    #################################################################################
+    # Parameter Sweep: every combination of the swept parameters, on the process pool
+    #################################################################################
+    def RunSweep(self):
+        global stopSimulation
 
-        # Co-efficient of skewness:
-        # https://www.geeksforgeeks.org/scipy-stats-skew-python/
-        skewNess = scipy.stats.skew(simulationResults)
+        # Range of each swept parameter, everything else comes from the simulator tab:
+        ranges = {SWEEP_PARAMETERS[self.sweepParameterOneInput.currentIndex()]: {
+            'start': self.sweepStartOneInput.value(), 'stop': self.sweepStopOneInput.value(),
+            'step': self.sweepStepOneInput.value()}}
+        if self.sweepParameterTwoInput.currentIndex() > 0:
+            parameterTwo = SWEEP_PARAMETERS[self.sweepParameterTwoInput.currentIndex() - 1]
+            if parameterTwo in ranges:
+                QMessageBox.about(self, "Status Message", "Choose two different parameters to sweep.")
+                return
+            ranges[parameterTwo] = {'start': self.sweepStartTwoInput.value(), 'stop': self.sweepStopTwoInput.value(),
+                                    'step': self.sweepStepTwoInput.value()}
+        try:
+            if not all(sweepValues(spec) for spec in ranges.values()):
+                raise ValueError("Sweep ranges must start at or below where they stop")
+            # Every grid point must be a valid config, e.g. whole population sizes
+            sweepConfigs(self.getSimulationConfig(), ranges)
+        except ValueError as e:
+            QMessageBox.about(self, "Status Message", str(e))
+            return
 
-        additionalStats = "\nMedian: " + str('{number:.{digits}f}'.format(number=median, digits=2)) + "\nQuartiles [Q1, Q2, Q3, Q4]: " \
-                          + str('{number:.{digits}f}'.format(number= firstQuart, digits=2)) + " , " \
-                          + str('{number:.{digits}f}'.format(number= secondQuart, digits=2)) + " , " \
-                          + str('{number:.{digits}f}'.format(number= thirdQuart, digits=2)) + " , " \
-                          + str('{number:.{digits}f}'.format(number= fourthQuart, digits=2)) + "\nCoefficient of Skewness: " \
-                          + str('{number:.{digits}f}'.format(number= skewNess, digits=2))
+        stopSimulation = False
+        self.runSweepButton.setEnabled(False)
+        self.stopSweepButton.setEnabled(True)
+        self.sweepProgressBar.setEnabled(True)
+        self.sweepProgressBar.setValue(0)
+
+        worker = Worker(self.sweepExecute, self.getSimulationConfig(), ranges)
+        worker.signals.result.connect(self.sweepComplete)
+        worker.signals.progress.connect(self.sweepProgressBar.setValue)
+        self.threadpool.start(worker)
 
-        # Add the overall summary for this result to the saved array for all simulations
-        thisSimulation = SimulationParameters(numTrials, arrayResult.mean(), populationSize, testResultsArray)
-        thisSimulation.SetParameterString(populationType + "\n" + captureProbabilityString + "\n" + captureProbabilityType + "\n" + tagLossType + "\n" \
-                                          + subReachType + "\n" + migrationString + "\n" + additionalStats)
-        simulationSaves.append(thisSimulation)
+    #################################################################################
+    # Parameter Sweep Worker: Function to execute
+    #################################################################################
+    def sweepExecute(self, config, ranges, progress_callback):
+        start_time = time.time()
+        rows = []
+        try:
+            rows = runSweep(config, ranges,
+                            progressCallback=lambda pointsCompleted, points: progress_callback.emit(int(pointsCompleted * 100 / points)),
+                            shouldStop=lambda: stopSimulation)
+        except Exception as e:
+            print("Encountered an error, try running again:" + str(e))
 
-        thisSimulation.SetMedian(median)
-        thisSimulation.SetFirstQuart(firstQuart)
-        thisSimulation.SetSecondQuart(secondQuart)
-        thisSimulation.SetThirdQuart(thirdQuart)
-        thisSimulation.SetFirstQuart(fourthQuart)
-        thisSimulation.SetSkew(skewNess)
+        print("--- %s seconds ---" % (time.time() - start_time))
+        return list(ranges), rows
+
+    #################################################################################
+    # Parameter Sweep Worker: Sweep Completed, show the swept parameters and statistics
+    #################################################################################
+    def sweepComplete(self, sweepOutput):
+        sweptParameters, self.sweepRows = sweepOutput
+        columns = sweptParameters + ['trialsRun', 'precision'] + list(SUMMARY_STATISTICS)
+
+        self.tableSweepResults.setRowCount(0)
+        self.tableSweepResults.setColumnCount(len(columns))
+        self.tableSweepResults.setHorizontalHeaderLabels(columns)
+        for row in self.sweepRows:
+            numRows = self.tableSweepResults.rowCount()
+            self.tableSweepResults.insertRow(numRows)
+            for column, name in enumerate(columns):
+                value = row[name]
+                text = str('{number:.{digits}f}'.format(number=value, digits=2)) if isinstance(value, float) else str(value)
+                self.tableSweepResults.setItem(numRows, column, QTableWidgetItem(text))
+
+        self.runSweepButton.setEnabled(True)
+        self.stopSweepButton.setEnabled(False)
+        self.saveSweepButton.setEnabled(len(self.sweepRows) > 0)
+        if stopSimulation:
+            QMessageBox.about(self, "Status Message", "Sweep Stopped: " + str(len(self.sweepRows))
+                              + " parameter combinations completed.")
+        else:
+            QMessageBox.about(self, "Status Message", "Sweep Complete: " + str(len(self.sweepRows)) + " parameter combinations.")
 
-        # For testing - capture probability
-        if self.checkBoxCaptureEqual.isChecked():
+    #################################################################################
+    # Save the table of the last parameter sweep
+    #################################################################################
+    def SaveSweep(self):
+        path = QFileDialog.getSaveFileName(self, 'Save File', os.getenv('HOME'), "CSV Files(*.csv)")
+        if path[0] != '':
+            writeSweepTable(path[0], self.sweepRows)
+
+    #################################################################################
+    # Parameters kept for testing: capture probability and subreach bounds
+    #################################################################################
+    def setTestingParameters(self, thisSimulation, config):
+        if config.captureMode == CAPTURE_EQUAL:
             thisSimulation.SetParamCaptureCategory(1)
-            thisSimulation.SetParamCaptureOne(self.captureProbabilityInput.value())
-            thisSimulation.SetParamCaptureTwo(self.captureProbabilityInput.value())
-        elif self.checkBoxCaptureVary.isChecked():
+            thisSimulation.SetParamCaptureOne(config.captureProbOne)
+            thisSimulation.SetParamCaptureTwo(config.captureProbOne)
+        elif config.captureMode == CAPTURE_VARY:
             thisSimulation.SetParamCaptureCategory(1)
-            thisSimulation.SetParamCaptureOne(self.captureProbabilityInput.value())
-            thisSimulation.SetParamCaptureTwo(self.captureProbabilityInputVaryTwo.value())
-        elif self.checkBoxCaptureRandomPerFish.isChecked():
+            thisSimulation.SetParamCaptureOne(config.captureProbOne)
+            thisSimulation.SetParamCaptureTwo(config.captureProbTwo)
+        elif config.captureMode == CAPTURE_RANDOM:
             thisSimulation.SetParamCaptureCategory(2)
 
-        if self.checkBoxVariedSubreach.isChecked():
+        if config.subReachMode == SUBREACH_VARIED:
             thisSimulation.SetBoundApplicable(1)
-            thisSimulation.SetParamLowBound(lowerBoundStudyReach)
-            thisSimulation.SetParamHighBound(upperBoundStudyReach)
-
-        # Add this to the data log:
-        self.loadSimulationNumberInput.addItem(str(len(simulationSaves)))
-        self.runSimulationButton.setEnabled(True)
-        self.progressBar.setVisible(False)
-
-        return arrayResult, additionalStats
-
-    #################################################################################
-    # Multi-thread Worker: Simulation in multiprocess
-    #################################################################################
-    def simulateMultiProcStyleNoLock(self, simulationResult, i):
-
-        global stopSimulation
-
-        if not stopSimulation:
-            # Be able to save data for each simulation:
-            # Generate random numbers for capture probability for first and second catch:
-            if self.checkBoxClosedPopulation.isChecked():
-                closedPopulation = True
-                openPopulation = False
-                qCatchValue = np.random.rand(populationSize)
-                qCatchValueTwo = np.random.rand(populationSize)
-                fishDeath = np.random.rand(populationSize)
-            elif self.checkBoxOpenPopulation.isChecked():
-                openPopulation = True
-                closedPopulation = False
-                qCatchValue = np.random.rand(populationSize * 3)
-                qCatchValueTwo = np.random.rand(populationSize * 3)
-                fishDeath = np.random.rand(populationSize * 3)
-
-            tagLossIndex = []
-            fishLocation = []
-
-            # For Open Population, do three areas:
-            if openPopulation and not closedPopulation:
-                # Range size - 100 to 200, [-inf, 0) is out of bounds, [0, 100] is the study reach default, [101, to inf) is out of bounds
-                # First 1/3 of area: D (downstream),  Second 1/3 of area: C (central), Third 1/3 of area: U (upstream)
-                fishLocation.extend(np.random.randint(-REACH_SIZE, 1, populationSize))
-                fishLocation.extend(np.random.randint(1, REACH_SIZE + 1, populationSize))
-                fishLocation.extend(np.random.randint(REACH_SIZE + 1, REACH_SIZE * 2, populationSize))
-            # Else we do one whole study reach:
-            else:
-                # Range size: 0 to 100
-                fishLocation = [np.random.randint(0, REACH_SIZE + 1) for p in range(0, populationSize)]
-                # Set initial location of fish:
-
-            # Get lower and upper bounds
-            self.SetSubReachBoundary()
-
-            # ####################### Create fish structure, generate characteristics for each fish ############### #
-            for m in range(len(qCatchValue)):
-                if m == 0:
-                    fish = Fish(qCatchValue[m], -1, -1, -1, 1, -1)
-                    fishPopulation = [fish]
-                    # print(str(fishPopulation[i].captureProbQ))
-                else:
-                    fish = Fish(qCatchValue[m], -1, -1, -1, 1, -1)
-                    fishPopulation.insert(m, fish)
-                    # print(str(fishPopulation[i].captureProbQ))
-
-                # Set location of the fish:
-                fishPopulation[m].SetSubReachPos(fishLocation[m])
-
-            # ################################START THE FIRST PASS ################################################# #
-            firstPassMarkedFishes = 0
-            # First set of fish population marked.
-            for j in range(len(qCatchValue)):
-                # ############################# If sub reach is not a factor: ############################# #
-                if self.checkBoxNoSubreach.isChecked():
-                    checkBoxNoSubReach = True
-                    checkBoxVariedSubReach = False
-                    # Do the first scenario if there is equal or varying probability between samples:
-                    if self.checkBoxCaptureVary.isChecked() or self.checkBoxCaptureEqual.isChecked():
-                        if fishPopulation[j].captureProbQ <= self.captureProbabilityInput.value():
-                            # Tag the fish
-                            fishPopulation[j].SetFishTag(1)
-                            tagLossIndex.append(j)
-                            # Increment Counter:
-                            firstPassMarkedFishes += 1
-                            fishPopulation[j].SetRecaughtStat('FIRST PASS')
-                    # Do this scenario if each fish has a random probability of getting captured:
-                    elif self.checkBoxCaptureRandomPerFish.isChecked():
-                        fishPopulation[j].SetParameterCaptureOne(np.random.rand(1))
-                        if fishPopulation[j].captureProbQ <= fishPopulation[j].GetParameterCaptureOne():
-                            # Tag the fish
-                            fishPopulation[j].SetFishTag(1)
-                            tagLossIndex.append(j)
-                            # Increment Counter:
-                            firstPassMarkedFishes += 1
-                            fishPopulation[j].SetRecaughtStat('FIRST PASS')
-                    # End this scenario
-                # ############################# End the no sub reach parameter ############################# #
-                # If sub reach is a factor, catch only those in study
-                elif self.checkBoxVariedSubreach.isChecked():
-                    checkBoxNoSubReach = False
-                    checkBoxVariedSubReach = True
-                    # Do the first scenario if there is equal or varying probability between samples:
-                    if self.checkBoxCaptureVary.isChecked() or self.checkBoxCaptureEqual.isChecked():
-                        # Capture only if the fish is in the range:
-                        if (lowerBoundStudyReach <= fishPopulation[j].GetSubReachPos() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                            if fishPopulation[j].captureProbQ <= self.captureProbabilityInput.value():
-                                # Tag the fish
-                                fishPopulation[j].SetFishTag(1)
-                                tagLossIndex.append(j)
-                                # Increment Counter:
-                                firstPassMarkedFishes += 1
-                                fishPopulation[j].SetRecaughtStat('FIRST PASS')
-                    # Do this scenario if each fish has a random probability of getting captured:
-                    elif self.checkBoxCaptureRandomPerFish.isChecked():
-                        fishPopulation[j].SetParameterCaptureOne(np.random.rand(1))
-                        if (lowerBoundStudyReach <= fishPopulation[j].GetSubReachPos() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                            if fishPopulation[j].captureProbQ <= fishPopulation[j].GetParameterCaptureOne():
-                                # Tag the fish
-                                fishPopulation[j].SetFishTag(1)
-                                tagLossIndex.append(j)
-                                # Increment Counter:
-                                firstPassMarkedFishes += 1
-                                fishPopulation[j].SetRecaughtStat('FIRST PASS')
-                    # End this scenario
-                # End the normal sub reach parameter
-            # ############################################## BREAK ################################################# #
-            # Tag loss scenario:
-            tagLossCounter = 0
-            # See if the fish loses its tag after being tagged.
-            if self.checkBoxTagLoss.isChecked():
-                tagLossValue = np.random.rand(len(tagLossIndex))
-                for v in range(len(tagLossIndex)):
-                    fishPopulation[tagLossIndex[v]].SetTagLoss(tagLossValue[v])
-                    if fishPopulation[tagLossIndex[v]].tagLoss <= tagLossVar:
-                        fishPopulation[tagLossIndex[v]].SetFishTag(0)
-                        tagLossCounter += 1
-
-            # ########################################### END BREAK ################################################# #
-            # self.simulationParameterPrint.append('Fishes caught during first pass: ' + str(firstPassMarkedFishes))
-            # ################################ START SECOND PASS ################################################# #
-
-            # Declare variables
-            secondPassFishes = 0
-            recapturedTaggedFish = 0
-            pointHolder = []
-
-            # #################################### START SECOND CAPTURE ################################################# #
-            for k in range(len(qCatchValueTwo)):
-                fishPopulation[k].SetCaptureProbabilityTwo(qCatchValueTwo[k])
-                # CLOSED POPULATION:
-                if closedPopulation and not openPopulation:
-                    # First scenario: no sub reach parameter:
-                    if checkBoxNoSubReach and not checkBoxVariedSubReach:
-                        # Do this first scenario if there is equal probability between the two samples:
-                        if self.checkBoxCaptureEqual.isChecked():
-                            if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInput.value():
-                                # Can't capture a dead fish:
-                                if not fishPopulation[k].GetMortality() == 0:
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this second scenario if sample two has different capture variability from first capture sample:
-                        elif self.checkBoxCaptureVary.isChecked():
-                            if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInputVaryTwo.value():
-                                # Can't capture a dead fish:
-                                if not fishPopulation[k].GetMortality() == 0:
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this third scenario if fish has random capture probability as well:
-                        elif self.checkBoxCaptureRandomPerFish.isChecked():
-                            fishPopulation[k].SetParameterCaptureTwo(np.random.rand(1))
-                            if fishPopulation[k].captureProbQTwo <= fishPopulation[k].GetParameterCaptureTwo():
-                                # Can't capture a dead fish:
-                                if not fishPopulation[k].GetMortality() == 0:
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                    # Second scenario: varied sub reach parameter:
-                    elif checkBoxVariedSubReach and not checkBoxNoSubReach:
-                        # Do this first scenario if there is equal probability between the two samples:
-                        if self.checkBoxCaptureEqual.isChecked():
-                            # Check if it's in the sub reach in the first place, we use initial position as there is no
-                            # immigration or emigration
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPos() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                                # Can we capture it?
-                                if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInput.value():
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this second scenario if sample two has different capture variability from first capture sample:
-                        elif self.checkBoxCaptureVary.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPos() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                                # Can we capture it?
-                                if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInputVaryTwo.value():
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this third scenario if fish has random capture probability as well:
-                        elif self.checkBoxCaptureRandomPerFish.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            fishPopulation[k].SetParameterCaptureTwo(np.random.rand(1))
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPos() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                                # Can we capture it?
-                                if fishPopulation[k].captureProbQTwo <= fishPopulation[k].GetParameterCaptureTwo():
-                                    secondPassFishes += 1
-                                    fishPopulation[k].SetRecaughtStat('NO TAG')
-                                    if fishPopulation[k].tagged == 1:
-                                        recapturedTaggedFish += 1
-                                        fishPopulation[k].SetRecaughtStat('YES')
-
-                # OPEN POPULATION SCENARIO
-                elif openPopulation and not closedPopulation:
-                    # Mortality an option?
-                    if fishDeath[k] <= self.openPopulationMoralityInput.value():
-                        # Kill the fish:
-                        fishPopulation[k].SetMortality(0)
-
-                    migrationDistance = self.migrationDistanceBox.value()
-                    highBoundMovementRange = (REACH_SIZE * migrationDistance)
-                    # https://www.geeksforgeeks.org/scipy-stats-beta-python/
-                    betaX = np.linspace(0, 1, populationSize)
-                    y1 = beta.pdf(betaX, BETA_DISTRIBUTION, BETA_DISTRIBUTION)
-                    # lowBoundMovementRange = fishPopulation[k].GetSubReachPos() - (REACH_SIZE * self.migrationDistanceBox.value())
-                    # highBoundMovementRange = fishPopulation[k].GetSubReachPos() + (REACH_SIZE * self.migrationDistanceBox.value())
-                    # First 1/3 of area: D (downstream),  Second 1/3 of area: C (central), Third 1/3 of area: U (upstream)
-                    correction = self.migrationRateBox.value() - 0.5
-                    point = np.random.randint(0, len(betaX))
-                    counter = 0
-
-                    # find a point that has not been used if that point has been used:
-                    while point in pointHolder or counter <= populationSize:
-                        point = np.random.randint(0, len(betaX))
-                        counter += 1
-                        if counter == populationSize:
-                            pointHolder.clear()
-                        # print(counter)
-                    # print("REACH_SIZE:" + str(REACH_SIZE) + " point:" + str(y1[point]) + " migration Distance: " + str(migrationDistance) + " beta:" + str(BETA_DISTRIBUTION))
-                    newLocation = y1[point] + REACH_SIZE * migrationDistance - (BETA_DISTRIBUTION / 2)
-                    if betaX[point] + correction < 0:
-                        if self.migrationDistanceBox.value() > 0:
-                            if newLocation > highBoundMovementRange:
-                                fishMove = highBoundMovementRange
-                                fishPopulation[k].SetMigrationDistance(-fishMove)
-                                fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() - fishMove)
-                            else:
-                                fishMove = newLocation
-                                fishPopulation[k].SetMigrationDistance(-fishMove)
-                                fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() - fishMove)
-                        elif betaX[point] + correction >= 0:
-                            if newLocation > highBoundMovementRange:
-                                fishMove = highBoundMovementRange
-                                fishPopulation[k].SetMigrationDistance(fishMove)
-                                fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() + fishMove)
-                            else:
-                                fishMove = newLocation
-                                fishPopulation[k].SetMigrationDistance(fishMove)
-                                fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() + fishMove)
-                        else:
-                            fishMove = 0
-                            fishPopulation[k].SetMigrationDistance(fishMove)
-                            fishPopulation[k].SetSubReachPosTwo(fishPopulation[k].GetSubReachPos() + fishMove)
-
-                    # Second scenario: varied sub reach parameter:
-                    if self.checkBoxVariedSubreach.isChecked():
-                        # Do this first scenario if there is equal probability between the two samples:
-                        if self.checkBoxCaptureEqual.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                                # Can't capture a dead fish:
-                                if fishPopulation[k].GetMortality() == 1:
-                                    # Can we capture it?
-                                    if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInput.value():
-                                        secondPassFishes += 1
-                                        fishPopulation[k].SetRecaughtStat('NO TAG')
-                                        if fishPopulation[k].tagged == 1:
-                                            recapturedTaggedFish += 1
-                                            fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this second scenario if sample two has different capture variability from first capture sample:
-                        elif self.checkBoxCaptureVary.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                                # Can't capture a dead fish:
-                                if fishPopulation[k].GetMortality() == 1:
-                                    # Can we capture it?
-                                    if fishPopulation[k].captureProbQTwo <= self.captureProbabilityInputVaryTwo.value():
-                                        secondPassFishes += 1
-                                        fishPopulation[k].SetRecaughtStat('NO TAG')
-                                        if fishPopulation[k].tagged == 1:
-                                            recapturedTaggedFish += 1
-                                            fishPopulation[k].SetRecaughtStat('YES')
-                        # Do this third scenario if fish has random capture probability as well:
-                        elif self.checkBoxCaptureRandomPerFish.isChecked():
-                            # Check if it's in the sub reach in the first place:
-                            fishPopulation[k].SetParameterCaptureTwo(np.random.rand(1))
-                            if (lowerBoundStudyReach <= fishPopulation[k].GetSubReachPosTwo() <= upperBoundStudyReach) and self.subReachMovementOptionBox.value() > 0:
-                                # Can't capture a dead fish:
-                                if not fishPopulation[k].GetMortality() == 0:
-                                    # Can we capture it?
-                                    if fishPopulation[k].captureProbQTwo <= fishPopulation[k].GetParameterCaptureTwo():
-                                        secondPassFishes += 1
-                                        fishPopulation[k].SetRecaughtStat('NO TAG')
-                                        if fishPopulation[k].tagged == 1:
-                                            recapturedTaggedFish += 1
-                                            fishPopulation[k].SetRecaughtStat('YES')
-            # End Second Capture Pass
-
-            # Estimation formula
-            estimatedSampleSizeN = (((firstPassMarkedFishes + 1) * (secondPassFishes + 1)) / (recapturedTaggedFish + 1))
-            simulationResult.append(estimatedSampleSizeN)
-            # ######## START RAW DATA SAVING, ALLOWS USER TO VIEW RESULTS OF EACH SIMULATION ######################### #
-            # Put this test result in a list for raw  data viewing:
-            global testResultsArray
-            if i == 0:
-                testResult = TestResults(populationSize, estimatedSampleSizeN, firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishPopulation)
-                testResultsArray = [testResult]
-            else:
-                testResult = TestResults(populationSize, estimatedSampleSizeN, firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishPopulation)
-                testResultsArray.insert(i, testResult)
+            thisSimulation.SetParamLowBound(config.lowerBound)
+            thisSimulation.SetParamHighBound(config.upperBound)
 
 
 #################################################################################
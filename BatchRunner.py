@@ -0,0 +1,139 @@
+#################################################################################
+# Batch Runner
+# Headless command line entry point: runs the scenarios of a JSON or YAML file
+# on the simulation engine and writes summary statistics, and optionally the
+# results of every trial, as CSV. Imports nothing from Qt.
+#
+# A scenario file holds a list of scenarios, or a dict with "scenarios" and
+# optional "defaults" applied to every scenario. A scenario is a dict of
+# SimulationConfig fields plus an optional "name", e.g.
+#   {"defaults": {"numTrials": 10000, "engine": "batched"},
+#    "scenarios": [{"name": "closed-q05", "populationSize": 500, "captureProbOne": 0.5},
+#                  {"name": "open-migrating", "populationType": "open", "migrationDistance": 0.3,
+#                   "migrationRate": 0.7, "mortalityRate": 0.1, "seed": 1234}]}
+# Scenarios without a seed get a new one, which is written to the summary.
+#
+# Usage: python BatchRunner.py scenarios.json [--workers N] [--summary FILE] [--trials-dir DIR]
+#################################################################################
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from SimulationConfig import SimulationConfig
+from SimulationEngine import runTrials, runTrialsParallel, measurePrecision, SUMMARY_STATISTICS
+from SimulationKernel import newMasterSeed, RETENTION_LAZY
+from SimulationResultStore import TRIAL_COLUMNS as STORE_TRIAL_COLUMNS
+
+TRIAL_COLUMNS = ('trial', 'estimate', 'firstPassCaught', 'secondPassCaught', 'secondPassRecaught')
+
+
+#################################################################################
+# Read the scenario file, JSON or YAML by extension
+#################################################################################
+def loadScenarios(path):
+    '''
+    Returns a list of (name, SimulationConfig), one per scenario of the file.
+    '''
+    with open(path) as scenarioFile:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("Reading YAML scenarios needs PyYAML (pip install pyyaml), or use a JSON file.")
+            document = yaml.safe_load(scenarioFile)
+        else:
+            document = json.load(scenarioFile)
+
+    defaults = {}
+    scenarios = document
+    if isinstance(document, dict):
+        defaults = document.get('defaults', {})
+        scenarios = document['scenarios']
+
+    configs = []
+    for index, scenario in enumerate(scenarios):
+        parameters = dict(defaults, **scenario)
+        name = str(parameters.pop('name', 'scenario-' + str(index + 1)))
+        if 'seed' not in parameters:
+            parameters['seed'] = newMasterSeed()
+        try:
+            configs.append((name, SimulationConfig.FromDict(parameters)))
+        except (TypeError, ValueError) as e:
+            raise SystemExit("Scenario " + name + ": " + str(e))
+    return configs
+
+
+#################################################################################
+# Run one scenario
+#################################################################################
+def runScenario(config, workers, keepTrials):
+    '''
+    Without keepTrials only the streaming statistics of the estimates are kept, so memory does not
+    grow with the number of trials. The trial CSV only needs the pass counts, so no fish are kept.
+    '''
+    config = config.Replace(fishRetention=RETENTION_LAZY)
+    if workers == 1:
+        return runTrials(config, keepResults=keepTrials, keepEstimates=False)
+    return runTrialsParallel(config, workers=workers, keepResults=keepTrials, keepEstimates=False)
+
+
+#################################################################################
+# Write the results of every trial of a scenario
+#################################################################################
+def writeTrials(path, resultStore):
+    with open(path, 'w', newline='') as trialFile:
+        writer = csv.writer(trialFile)
+        writer.writerow(TRIAL_COLUMNS)
+        writer.writerows(zip(resultStore.GetTrialIndex() + 1, *[resultStore.GetTrialColumn(name)
+                                                                  for name in STORE_TRIAL_COLUMNS]))
+
+
+#################################################################################
+# MAIN FUNCTION
+#################################################################################
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run AWRI mark and recapture scenarios without the GUI.")
+    parser.add_argument('scenarios', help="JSON or YAML scenario file")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes per scenario, 1 runs in this process (default: all cores)")
+    parser.add_argument('--summary', help="summary CSV file (default: standard output)")
+    parser.add_argument('--trials-dir', help="directory for one CSV of per-trial results per scenario")
+    args = parser.parse_args(argv)
+
+    scenarios = loadScenarios(args.scenarios)
+    if args.trials_dir:
+        os.makedirs(args.trials_dir, exist_ok=True)
+
+    summaryFile = open(args.summary, 'w', newline='') if args.summary else sys.stdout
+    try:
+        fieldNames = list(SimulationConfig().ToDict())
+        writer = csv.writer(summaryFile)
+        writer.writerow(['name'] + fieldNames + ['trialsRun', 'precision'] + list(SUMMARY_STATISTICS) + ['seconds'])
+
+        for number, (name, config) in enumerate(scenarios):
+            print("[" + str(number + 1) + "/" + str(len(scenarios)) + "] " + name, file=sys.stderr)
+            start_time = time.time()
+            resultStore, statistics = runScenario(config, args.workers, bool(args.trials_dir))[1:]
+            seconds = time.time() - start_time
+
+            summary = statistics.GetSummary(config.populationSize)
+            parameters = config.ToDict()
+            writer.writerow([name] + [parameters[field] for field in fieldNames]
+                            + [statistics.GetCount(), measurePrecision(config, statistics)]
+                            + [summary[statistic] for statistic in SUMMARY_STATISTICS] + [round(seconds, 3)])
+            summaryFile.flush()
+
+            if args.trials_dir:
+                writeTrials(os.path.join(args.trials_dir, name + '_trials.csv'), resultStore)
+    finally:
+        if summaryFile is not sys.stdout:
+            summaryFile.close()
+
+
+if __name__ == "__main__":
+    from multiprocessing import freeze_support
+    freeze_support()
+    main()
@@ -0,0 +1,110 @@
+#################################################################################
+# Fish Histograms Class
+# Binned counts of every column of the raw fish data table over the fish of a
+# run: one StreamingStatistics per column, with bins chosen for the values the
+# column can take. A result store counts them the first time they are asked
+# for, so runs do not pay for histograms that are never plotted.
+#################################################################################
+import numpy as np
+
+from FishPopulation import FISH_TABLE_COLUMNS, RECAUGHT_LABELS
+from SimulationKernel import REACH_SIZE, BETA_DISTRIBUTION, POPULATION_OPEN
+from StreamingStatistics import StreamingStatistics
+
+# Bins of the migration distance column
+MIGRATION_BINS = 200
+
+
+#################################################################################
+# Bins of every table column for the fish of a run: (lower, upper, bins)
+#################################################################################
+def fishHistogramBins(config):
+    '''
+    Fish start on the positions 0 to REACH_SIZE of the reach, or on the three areas from -REACH_SIZE
+    to 2 * REACH_SIZE in an open population, where they move at most REACH_SIZE * migrationDistance
+    plus half the beta offset of migrateFishes. Position bins are one position wide.
+    '''
+    if config.populationType == POPULATION_OPEN:
+        lowest, highest = -REACH_SIZE, 2 * REACH_SIZE
+        move = REACH_SIZE * config.migrationDistance + BETA_DISTRIBUTION / 2
+    else:
+        lowest, highest = 0, REACH_SIZE
+        move = 0.0
+    finalLowest, finalHighest = int(np.floor(lowest - move)), int(np.ceil(highest + move))
+    return (
+        (0.0, 1.0, 100),                                                  # Capture Prob (Q1)
+        (lowest - 0.5, highest + 0.5, highest - lowest + 1),              # Initial Subreach (S1)
+        (-1.5, 1.5, 3),                                                   # Tagged: -1 never, 0 tag lost, 1 tagged
+        (-1.0, 1.0, 200),                                                 # Tag Lost, -1 without a tag loss draw
+        (-0.5, 1.5, 2),                                                   # Mortality
+        (-move, move, MIGRATION_BINS) if move else (-1.5, -0.5, 1),       # Migration Distance, closed: -1
+        (0.0, 1.0, 100),                                                  # Capture Prob (Q2)
+        (finalLowest - 0.5, finalHighest + 0.5, finalHighest - finalLowest + 1),  # Final Subreach (S2)
+        (-0.5, len(RECAUGHT_LABELS) - 0.5, len(RECAUGHT_LABELS)),         # Recaught, one bin per status
+    )
+
+
+#################################################################################
+# Values of a table column to bin: as shown, but recapture status codes for labels
+#################################################################################
+def histogramValues(fishData, column):
+    if FISH_TABLE_COLUMNS[column] == 'reCaught':
+        return fishData.reCaught
+    return fishData.GetTableColumn(column)
+
+
+#################################################################################
+# Statistics of one table column of a population, e.g. for the fish of one trial
+#################################################################################
+def columnStatistics(fishData, column, config):
+    statistics = StreamingStatistics(*fishHistogramBins(config)[column])
+    statistics.Update(histogramValues(fishData, column))
+    return statistics
+
+
+class FishHistograms:
+    columns: list
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    #################################################################################
+    # EMPTY HISTOGRAMS IN THE BINS OF config, OR THOSE OF A POPULATION
+    #################################################################################
+    @classmethod
+    def ForConfig(cls, config):
+        return cls([StreamingStatistics(*bins) for bins in fishHistogramBins(config)])
+
+    @classmethod
+    def FromFishData(cls, fishData, config):
+        return cls([columnStatistics(fishData, column, config) for column in range(len(FISH_TABLE_COLUMNS))])
+
+    #################################################################################
+    # ADD THE FISH OF A POPULATION, OR THE COUNTS OF OTHER HISTOGRAMS
+    #################################################################################
+    def Update(self, fishData):
+        for column, statistics in enumerate(self.columns):
+            statistics.Update(histogramValues(fishData, column))
+
+    def Merge(self, other):
+        for statistics, otherStatistics in zip(self.columns, other.columns):
+            statistics.Merge(otherStatistics)
+
+    #################################################################################
+    # GETTERS FOR THE NUMBER OF FISH AND THE STATISTICS OF A COLUMN
+    #################################################################################
+    def GetCount(self):
+        return self.columns[0].GetCount()
+
+    def GetColumn(self, column):
+        return self.columns[column]
+
+    #################################################################################
+    # STATE FOR SAVING: ONE STATE AND ONE HISTOGRAM PER COLUMN
+    #################################################################################
+    def GetState(self):
+        return [statistics.GetState() for statistics in self.columns]
+
+    @classmethod
+    def FromState(cls, states, histograms):
+        return cls([StreamingStatistics.FromState(state, histogram) for state, histogram in zip(states, histograms)])
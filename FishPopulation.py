@@ -0,0 +1,170 @@
+#################################################################################
+# FISH POPULATION CLASS
+# Struct-of-arrays container for the fish of one trial: one typed NumPy column
+# per fish attribute instead of one Fish object per fish.
+#################################################################################
+import numpy as np
+
+# Recapture status codes and the labels shown in the fish table
+RECAUGHT_NONE = 0
+RECAUGHT_FIRST_PASS = 1
+RECAUGHT_NO_TAG = 2
+RECAUGHT_YES = 3
+RECAUGHT_LABELS = ('-', 'FIRST PASS', 'NO TAG', 'YES')
+
+# Columns of the raw fish data table, in table order
+FISH_TABLE_COLUMNS = ('captureProbQ', 'subReachPos', 'tagged', 'tagLoss', 'mortality', 'migrationDistance',
+                      'captureProbQTwo', 'subReachPosTwo', 'reCaught')
+
+# Headers of the raw fish data table and the decimals shown per column (None: as is)
+FISH_TABLE_HEADERS = ('Capture Prob (Q1)', 'Initial Subreach (S1)', 'Tagged', 'Tag Lost', 'Mortality',
+                      'Migration Distance', 'Capture Prob (Q2)', 'Final Subreach (S2)', 'Recaught')
+FISH_TABLE_DECIMALS = (2, None, None, 2, None, 2, 2, 2, None)
+
+# Type of every column, as stored by the constructor (the parameter columns are optional)
+FISH_COLUMN_TYPES = {
+    'captureProbQ': np.float32,
+    'captureProbQTwo': np.float32,
+    'tagged': bool,
+    'tagLoss': np.float32,
+    'subReachPos': np.int16,
+    'subReachPosTwo': np.float32,
+    'mortality': bool,
+    'migrationDistance': np.float32,
+    'reCaught': np.uint8,
+    'parameterCaptureOne': np.float32,
+    'parameterCaptureTwo': np.float32,
+}
+
+
+class FishPopulation:
+    captureProbQ: np.ndarray
+    captureProbQTwo: np.ndarray
+    tagged: np.ndarray
+    tagLoss: np.ndarray
+    subReachPos: np.ndarray
+    subReachPosTwo: np.ndarray
+    mortality: np.ndarray
+    migrationDistance: np.ndarray
+    reCaught: np.ndarray
+
+    # for testing:
+    parameterCaptureOne: np.ndarray
+    parameterCaptureTwo: np.ndarray
+
+    #################################################################################
+    # FISH POPULATION CONSTRUCTOR
+    # tagged: fish carries a tag after tag loss; tagLoss: tag loss draw, -1 if none;
+    # mortality: True if the fish is alive. subReachPosTwo is float32 because open
+    # population fish move by fractions of a position.
+    #################################################################################
+    def __init__(self, captureProbQ, captureProbQTwo, tagged, tagLoss, subReachPos, subReachPosTwo, mortality,
+                 migrationDistance, reCaught, parameterCaptureOne=None, parameterCaptureTwo=None):
+        self.captureProbQ = np.asarray(captureProbQ, dtype=np.float32)
+        self.captureProbQTwo = np.asarray(captureProbQTwo, dtype=np.float32)
+        self.tagged = np.asarray(tagged, dtype=bool)
+        self.tagLoss = np.asarray(tagLoss, dtype=np.float32)
+        self.subReachPos = np.asarray(subReachPos, dtype=np.int16)
+        self.subReachPosTwo = np.asarray(subReachPosTwo, dtype=np.float32)
+        self.mortality = np.asarray(mortality, dtype=bool)
+        self.migrationDistance = np.asarray(migrationDistance, dtype=np.float32)
+        self.reCaught = np.asarray(reCaught, dtype=np.uint8)
+        self.parameterCaptureOne = None if parameterCaptureOne is None \
+            else np.asarray(parameterCaptureOne, dtype=np.float32)
+        self.parameterCaptureTwo = None if parameterCaptureTwo is None \
+            else np.asarray(parameterCaptureTwo, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.captureProbQ)
+
+    def __getitem__(self, index):
+        if not -len(self) <= index < len(self):
+            raise IndexError('fish index out of range')
+        return FishView(self, index % len(self))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield FishView(self, index)
+
+    #################################################################################
+    # GETTER FOR THE FISH start:stop AS A POPULATION (VIEWS OF THE COLUMNS)
+    #################################################################################
+    def GetSlice(self, start, stop):
+        return FishPopulation(**{name: None if column is None else column[start:stop]
+                                 for name, column in vars(self).items()})
+
+    #################################################################################
+    # GETTER FOR TAG STATUS: -1 NEVER TAGGED, 1 TAGGED, 0 TAG LOST
+    #################################################################################
+    def GetTagStatus(self):
+        return np.where(self.tagged, 1, np.where(self.tagLoss >= 0, 0, -1)).astype(np.int8)
+
+    #################################################################################
+    # GETTER FOR RECAUGHT STATUS LABELS
+    #################################################################################
+    def GetRecaughtLabels(self):
+        return np.array(RECAUGHT_LABELS)[self.reCaught]
+
+    #################################################################################
+    # GETTER FOR A COLUMN OF THE RAW FISH DATA TABLE, AS SHOWN IN THE TABLE
+    #################################################################################
+    def GetTableColumn(self, index):
+        name = FISH_TABLE_COLUMNS[index]
+        if name == 'tagged':
+            return self.GetTagStatus()
+        if name == 'mortality':
+            return self.mortality.astype(np.int8)
+        if name == 'reCaught':
+            return self.GetRecaughtLabels()
+        return getattr(self, name)
+
+
+#################################################################################
+# FISH VIEW CLASS
+# One row of a FishPopulation, with the Fish getters used by the GUI.
+#################################################################################
+class FishView:
+    __slots__ = ('population', 'index')
+
+    def __init__(self, population, index):
+        self.population = population
+        self.index = index
+
+    def GetCaptureProbability(self):
+        return float(self.population.captureProbQ[self.index])
+
+    def GetCaptureProbabilityTwo(self):
+        return float(self.population.captureProbQTwo[self.index])
+
+    def GetFishTag(self):
+        if self.population.tagged[self.index]:
+            return 1
+        return 0 if self.population.tagLoss[self.index] >= 0 else -1
+
+    def GetTagLoss(self):
+        return float(self.population.tagLoss[self.index])
+
+    def GetSubReachPos(self):
+        return int(self.population.subReachPos[self.index])
+
+    def GetSubReachPosTwo(self):
+        return float(self.population.subReachPosTwo[self.index])
+
+    def GetMortality(self):
+        return int(self.population.mortality[self.index])
+
+    def GetMigrationDistance(self):
+        return float(self.population.migrationDistance[self.index])
+
+    def GetRecaughtStat(self):
+        return RECAUGHT_LABELS[self.population.reCaught[self.index]]
+
+    def GetParameterCaptureOne(self):
+        if self.population.parameterCaptureOne is None:
+            return None
+        return float(self.population.parameterCaptureOne[self.index])
+
+    def GetParameterCaptureTwo(self):
+        if self.population.parameterCaptureTwo is None:
+            return None
+        return float(self.population.parameterCaptureTwo[self.index])
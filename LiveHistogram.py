@@ -0,0 +1,126 @@
+#################################################################################
+# Live Histogram
+# Draws the histogram of the estimates of a running simulation and its running
+# mean, median, quartiles and bias on an MplWidget. The x axis stays within the
+# bins of the statistics, estimates outside them are only counted. Redraws are throttled to
+# UPDATE_HZ and the artists are created once and updated in place. While the
+# axes limits hold, only the artists are drawn over a cached background
+# (blitting); the whole figure is redrawn only when the limits have to grow.
+#################################################################################
+import time
+
+import numpy as np
+
+# Most redraws per second while a simulation runs
+UPDATE_HZ = 4
+# Bars of the histogram across the x axis
+DISPLAY_BINS = 60
+# Room added when the axes grow: around the estimates (x) and above the tallest bar (y)
+X_MARGIN = 0.25
+Y_MARGIN = 1.5
+
+
+class LiveHistogram:
+
+    def __init__(self, mplWidget):
+        self.canvas = mplWidget.canvas
+        self.axes = mplWidget.canvas.axes
+        self.actualPopulation = 0
+        self.lastDraw = 0.0
+        self.background = None
+
+        # Artists, drawn by blitting and updated in place
+        self.axes.set_xlabel('Population Estimate')
+        self.axes.set_ylabel('Frequency')
+        self.axes.grid(axis='y', alpha=0.75)
+        self.histogramLine, = self.axes.plot([], [], drawstyle='steps-post', color='#0504aa', animated=True)
+        self.actualLine = self.axes.axvline(0, color='g', linestyle='dashed', lw=2, label='True Population Size',
+                                            animated=True)
+        self.meanLine = self.axes.axvline(0, color='r', lw=2, label='Mean', animated=True)
+        self.medianLine = self.axes.axvline(0, color='orange', lw=2, label='Median', animated=True)
+        self.quartileLines = [self.axes.axvline(0, color='grey', linestyle='dotted', lw=1.5, animated=True,
+                                                label='Quartiles' if quartile == 0 else None) for quartile in range(2)]
+        self.statisticsText = self.axes.text(0.02, 0.95, '', transform=self.axes.transAxes, va='top', animated=True)
+        self.axes.legend(loc='upper right')
+
+        # The background is cached after every full draw, e.g. when the widget is resized
+        self.canvas.mpl_connect('draw_event', self._OnDraw)
+
+    #################################################################################
+    # START A RUN: EMPTY HISTOGRAM AROUND THE TRUE POPULATION SIZE
+    #################################################################################
+    def Start(self, actualPopulation):
+        self.actualPopulation = actualPopulation
+        self.lastDraw = 0.0
+        self.histogramLine.set_data([], [])
+        for line in [self.actualLine, self.meanLine, self.medianLine] + self.quartileLines:
+            line.set_xdata([actualPopulation, actualPopulation])
+        self.statisticsText.set_text('')
+        self.axes.set_xlim(actualPopulation * (1 - X_MARGIN), actualPopulation * (1 + X_MARGIN) + 1)
+        self.axes.set_ylim(0, 10)
+        self.canvas.draw_idle()
+
+    #################################################################################
+    # SHOW THE STATISTICS (StreamingStatistics) OF THE ESTIMATES SO FAR
+    # Skipped when the last redraw was less than 1 / UPDATE_HZ ago, unless force.
+    #################################################################################
+    def Update(self, statistics, force=False):
+        now = time.time()
+        if statistics is None or statistics.GetCount() == 0 or (not force and now - self.lastDraw < 1 / UPDATE_HZ):
+            return
+        self.lastDraw = now
+
+        # Grow the x axis to hold every estimate, up to the bins of the statistics
+        binEdges = statistics.GetBinEdges()
+        lowest = max(statistics.GetMin(), binEdges[0])
+        highest = min(statistics.GetMax(), binEdges[-1])
+        low, high = self.axes.get_xlim()
+        margin = X_MARGIN * max(highest - lowest, 1)
+        growX = lowest < low or highest > high
+        if growX:
+            low = max(min(low, lowest - margin), binEdges[0])
+            high = min(max(high, highest + margin), binEdges[-1])
+            self.axes.set_xlim(low, high)
+
+        # Bars from the fine bins of the statistics, spreading a fine bin evenly across it
+        edges = np.linspace(low, high, DISPLAY_BINS + 1)
+        counts = statistics.GetCounts(edges)
+        self.histogramLine.set_data(edges, np.append(counts, counts[-1]))
+
+        mean = statistics.GetMean()
+        self.meanLine.set_xdata([mean, mean])
+        self.medianLine.set_xdata([statistics.GetMedian()] * 2)
+        for line, quantile in zip(self.quartileLines, (.25, .75)):
+            line.set_xdata([statistics.GetQuantile(quantile)] * 2)
+        self.statisticsText.set_text(
+            "Trials: " + str(statistics.GetCount())
+            + "\nMean: " + str('{number:.{digits}f}'.format(number=mean, digits=2))
+            + "\nMedian: " + str('{number:.{digits}f}'.format(number=statistics.GetMedian(), digits=2))
+            + "\nQ1 - Q3: " + str('{number:.{digits}f}'.format(number=statistics.GetQuantile(.25), digits=2))
+            + " - " + str('{number:.{digits}f}'.format(number=statistics.GetQuantile(.75), digits=2))
+            + "\nBias: " + str('{number:.{digits}f}'.format(number=mean - self.actualPopulation, digits=2))
+            + ("\nAbove " + str('{number:.{digits}f}'.format(number=binEdges[-1], digits=0)) + ": "
+               + str(statistics.GetOverflow()) if statistics.GetOverflow() else ""))
+
+        # Full redraw when the axes grow, otherwise blit the artists over the background
+        if growX or counts.max() > self.axes.get_ylim()[1]:
+            self.axes.set_ylim(0, counts.max() * Y_MARGIN)
+            self.canvas.draw()
+        elif self.background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._DrawArtists()
+            self.canvas.blit(self.axes.bbox)
+
+    #################################################################################
+    # CACHE THE BACKGROUND OF A FULL DRAW AND DRAW THE ARTISTS OVER IT
+    #################################################################################
+    def _OnDraw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.axes.bbox)
+        self._DrawArtists()
+
+    def _DrawArtists(self):
+        for artist in [self.histogramLine, self.actualLine, self.meanLine, self.medianLine] + self.quartileLines \
+                + [self.statisticsText]:
+            self.axes.draw_artist(artist)
@@ -2,9 +2,10 @@
 
 # Form implementation generated from reading ui file 'AWRI-GUI.ui'
 #
-# Created by: PyQt5 UI code generator 5.13.0
+# Created by: PyQt5 UI code generator 5.15.11
 #
-# WARNING! All changes made in this file will be lost!
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
 
 
 from PyQt5 import QtCore, QtGui, QtWidgets
@@ -347,6 +348,86 @@ class Ui_MainWindow(object):
         self.runSimulationButton.setFont(font)
         self.runSimulationButton.setObjectName("runSimulationButton")
         self.gridLayout.addWidget(self.runSimulationButton, 7, 8, 1, 1)
+        self.simulationEngineTitle = QtWidgets.QLabel(self.tabSimulator)
+        font = QtGui.QFont()
+        font.setFamily("Yu Gothic UI Semibold")
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.simulationEngineTitle.setFont(font)
+        self.simulationEngineTitle.setObjectName("simulationEngineTitle")
+        self.gridLayout.addWidget(self.simulationEngineTitle, 8, 0, 1, 1)
+        self.simulationEngineInput = QtWidgets.QComboBox(self.tabSimulator)
+        self.simulationEngineInput.setObjectName("simulationEngineInput")
+        self.simulationEngineInput.addItem("")
+        self.simulationEngineInput.addItem("")
+        self.simulationEngineInput.addItem("")
+        self.gridLayout.addWidget(self.simulationEngineInput, 8, 2, 1, 2)
+        self.seedTitle = QtWidgets.QLabel(self.tabSimulator)
+        font = QtGui.QFont()
+        font.setFamily("Yu Gothic UI Semibold")
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.seedTitle.setFont(font)
+        self.seedTitle.setObjectName("seedTitle")
+        self.gridLayout.addWidget(self.seedTitle, 8, 5, 1, 1)
+        self.seedInput = QtWidgets.QSpinBox(self.tabSimulator)
+        self.seedInput.setMinimum(0)
+        self.seedInput.setMaximum(2147483647)
+        self.seedInput.setProperty("value", 0)
+        self.seedInput.setObjectName("seedInput")
+        self.gridLayout.addWidget(self.seedInput, 8, 6, 1, 1)
+        self.precisionModeTitle = QtWidgets.QLabel(self.tabSimulator)
+        font = QtGui.QFont()
+        font.setFamily("Yu Gothic UI Semibold")
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.precisionModeTitle.setFont(font)
+        self.precisionModeTitle.setObjectName("precisionModeTitle")
+        self.gridLayout.addWidget(self.precisionModeTitle, 9, 0, 1, 1)
+        self.precisionModeInput = QtWidgets.QComboBox(self.tabSimulator)
+        self.precisionModeInput.setObjectName("precisionModeInput")
+        self.precisionModeInput.addItem("")
+        self.precisionModeInput.addItem("")
+        self.precisionModeInput.addItem("")
+        self.precisionModeInput.addItem("")
+        self.gridLayout.addWidget(self.precisionModeInput, 9, 2, 1, 2)
+        self.precisionTargetTitle = QtWidgets.QLabel(self.tabSimulator)
+        font = QtGui.QFont()
+        font.setFamily("Yu Gothic UI Semibold")
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.precisionTargetTitle.setFont(font)
+        self.precisionTargetTitle.setObjectName("precisionTargetTitle")
+        self.gridLayout.addWidget(self.precisionTargetTitle, 9, 5, 1, 1)
+        self.precisionTargetInput = QtWidgets.QDoubleSpinBox(self.tabSimulator)
+        self.precisionTargetInput.setDecimals(4)
+        self.precisionTargetInput.setMaximum(1000000.0)
+        self.precisionTargetInput.setSingleStep(0.001)
+        self.precisionTargetInput.setProperty("value", 0.005)
+        self.precisionTargetInput.setObjectName("precisionTargetInput")
+        self.gridLayout.addWidget(self.precisionTargetInput, 9, 6, 1, 1)
+        self.fishRetentionTitle = QtWidgets.QLabel(self.tabSimulator)
+        font = QtGui.QFont()
+        font.setFamily("Yu Gothic UI Semibold")
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.fishRetentionTitle.setFont(font)
+        self.fishRetentionTitle.setObjectName("fishRetentionTitle")
+        self.gridLayout.addWidget(self.fishRetentionTitle, 10, 0, 1, 1)
+        self.fishRetentionInput = QtWidgets.QComboBox(self.tabSimulator)
+        self.fishRetentionInput.setObjectName("fishRetentionInput")
+        self.fishRetentionInput.addItem("")
+        self.fishRetentionInput.addItem("")
+        self.gridLayout.addWidget(self.fishRetentionInput, 10, 2, 1, 2)
+        self.liveHistogramWidget = MplWidget(self.tabSimulator)
+        self.liveHistogramWidget.setMinimumSize(QtCore.QSize(0, 250))
+        self.liveHistogramWidget.setObjectName("liveHistogramWidget")
+        self.gridLayout.addWidget(self.liveHistogramWidget, 11, 0, 1, 9)
         self.migrationDistanceSlider = QtWidgets.QSlider(self.tabSimulator)
         self.migrationDistanceSlider.setToolTipDuration(-1)
         self.migrationDistanceSlider.setWhatsThis("")
@@ -390,35 +471,33 @@ class Ui_MainWindow(object):
         self.refreshResultsButton.setEnabled(False)
         self.refreshResultsButton.setObjectName("refreshResultsButton")
         self.gridLayout_3.addWidget(self.refreshResultsButton, 2, 2, 1, 1)
-        self.tableRawFishData = QtWidgets.QTableWidget(self.tabResults)
+        self.tableRawFishData = QtWidgets.QTableView(self.tabResults)
         self.tableRawFishData.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.tableRawFishData.setAlternatingRowColors(True)
+        self.tableRawFishData.setSortingEnabled(True)
         self.tableRawFishData.setObjectName("tableRawFishData")
-        self.tableRawFishData.setColumnCount(9)
-        self.tableRawFishData.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(3, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(4, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(5, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(6, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(7, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawFishData.setHorizontalHeaderItem(8, item)
         self.gridLayout_3.addWidget(self.tableRawFishData, 5, 2, 3, 4)
+        self.fishFilterTitle = QtWidgets.QLabel(self.tabResults)
+        self.fishFilterTitle.setObjectName("fishFilterTitle")
+        self.gridLayout_3.addWidget(self.fishFilterTitle, 4, 2, 1, 1)
+        self.fishFilterInput = QtWidgets.QComboBox(self.tabResults)
+        self.fishFilterInput.setObjectName("fishFilterInput")
+        self.fishFilterInput.addItem("")
+        self.fishFilterInput.addItem("")
+        self.fishFilterInput.addItem("")
+        self.fishFilterInput.addItem("")
+        self.fishFilterInput.addItem("")
+        self.fishFilterInput.addItem("")
+        self.fishFilterInput.addItem("")
+        self.gridLayout_3.addWidget(self.fishFilterInput, 4, 3, 1, 1)
         self.saveAllTrialsSeparateCheckBox = QtWidgets.QCheckBox(self.tabResults)
         self.saveAllTrialsSeparateCheckBox.setEnabled(False)
         self.saveAllTrialsSeparateCheckBox.setObjectName("saveAllTrialsSeparateCheckBox")
         self.gridLayout_3.addWidget(self.saveAllTrialsSeparateCheckBox, 8, 1, 1, 1)
+        self.saveAllTrialsIndexedCheckBox = QtWidgets.QCheckBox(self.tabResults)
+        self.saveAllTrialsIndexedCheckBox.setEnabled(False)
+        self.saveAllTrialsIndexedCheckBox.setObjectName("saveAllTrialsIndexedCheckBox")
+        self.gridLayout_3.addWidget(self.saveAllTrialsIndexedCheckBox, 9, 0, 1, 2)
         self.clearDataButton = QtWidgets.QPushButton(self.tabResults)
         self.clearDataButton.setEnabled(False)
         self.clearDataButton.setObjectName("clearDataButton")
@@ -447,21 +526,12 @@ class Ui_MainWindow(object):
         self.populationGraphCheckBox.setChecked(False)
         self.populationGraphCheckBox.setObjectName("populationGraphCheckBox")
         self.gridLayout_3.addWidget(self.populationGraphCheckBox, 2, 4, 1, 1)
-        self.tableRawTestData = QtWidgets.QTableWidget(self.tabResults)
+        self.tableRawTestData = QtWidgets.QTableView(self.tabResults)
         self.tableRawTestData.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.tableRawTestData.setAlternatingRowColors(True)
         self.tableRawTestData.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.tableRawTestData.setSortingEnabled(True)
         self.tableRawTestData.setObjectName("tableRawTestData")
-        self.tableRawTestData.setColumnCount(4)
-        self.tableRawTestData.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawTestData.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawTestData.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawTestData.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self.tableRawTestData.setHorizontalHeaderItem(3, item)
         self.gridLayout_3.addWidget(self.tableRawTestData, 7, 0, 1, 2)
         self.saveAllTrialsCheckBox = QtWidgets.QCheckBox(self.tabResults)
         self.saveAllTrialsCheckBox.setEnabled(False)
@@ -488,6 +558,146 @@ class Ui_MainWindow(object):
         self.simulationParameterPrint.setObjectName("simulationParameterPrint")
         self.gridLayout_3.addWidget(self.simulationParameterPrint, 0, 0, 1, 6)
         self.tabBox.addTab(self.tabResults, "")
+        self.tabSweep = QtWidgets.QWidget()
+        self.tabSweep.setObjectName("tabSweep")
+        self.gridLayout_5 = QtWidgets.QGridLayout(self.tabSweep)
+        self.gridLayout_5.setObjectName("gridLayout_5")
+        self.sweepParameterOneTitle = QtWidgets.QLabel(self.tabSweep)
+        self.sweepParameterOneTitle.setObjectName("sweepParameterOneTitle")
+        self.gridLayout_5.addWidget(self.sweepParameterOneTitle, 0, 0, 1, 1)
+        self.sweepParameterOneInput = QtWidgets.QComboBox(self.tabSweep)
+        self.sweepParameterOneInput.setObjectName("sweepParameterOneInput")
+        self.sweepParameterOneInput.addItem("")
+        self.sweepParameterOneInput.addItem("")
+        self.sweepParameterOneInput.addItem("")
+        self.sweepParameterOneInput.addItem("")
+        self.sweepParameterOneInput.addItem("")
+        self.sweepParameterOneInput.addItem("")
+        self.sweepParameterOneInput.addItem("")
+        self.sweepParameterOneInput.addItem("")
+        self.gridLayout_5.addWidget(self.sweepParameterOneInput, 0, 1, 1, 1)
+        self.sweepStartOneTitle = QtWidgets.QLabel(self.tabSweep)
+        self.sweepStartOneTitle.setObjectName("sweepStartOneTitle")
+        self.gridLayout_5.addWidget(self.sweepStartOneTitle, 0, 2, 1, 1)
+        self.sweepStartOneInput = QtWidgets.QDoubleSpinBox(self.tabSweep)
+        self.sweepStartOneInput.setDecimals(2)
+        self.sweepStartOneInput.setMaximum(1000000.0)
+        self.sweepStartOneInput.setSingleStep(0.05)
+        self.sweepStartOneInput.setProperty("value", 0.1)
+        self.sweepStartOneInput.setObjectName("sweepStartOneInput")
+        self.gridLayout_5.addWidget(self.sweepStartOneInput, 0, 3, 1, 1)
+        self.sweepStopOneTitle = QtWidgets.QLabel(self.tabSweep)
+        self.sweepStopOneTitle.setObjectName("sweepStopOneTitle")
+        self.gridLayout_5.addWidget(self.sweepStopOneTitle, 0, 4, 1, 1)
+        self.sweepStopOneInput = QtWidgets.QDoubleSpinBox(self.tabSweep)
+        self.sweepStopOneInput.setDecimals(2)
+        self.sweepStopOneInput.setMaximum(1000000.0)
+        self.sweepStopOneInput.setSingleStep(0.05)
+        self.sweepStopOneInput.setProperty("value", 0.9)
+        self.sweepStopOneInput.setObjectName("sweepStopOneInput")
+        self.gridLayout_5.addWidget(self.sweepStopOneInput, 0, 5, 1, 1)
+        self.sweepStepOneTitle = QtWidgets.QLabel(self.tabSweep)
+        self.sweepStepOneTitle.setObjectName("sweepStepOneTitle")
+        self.gridLayout_5.addWidget(self.sweepStepOneTitle, 0, 6, 1, 1)
+        self.sweepStepOneInput = QtWidgets.QDoubleSpinBox(self.tabSweep)
+        self.sweepStepOneInput.setDecimals(2)
+        self.sweepStepOneInput.setMaximum(1000000.0)
+        self.sweepStepOneInput.setSingleStep(0.05)
+        self.sweepStepOneInput.setProperty("value", 0.1)
+        self.sweepStepOneInput.setObjectName("sweepStepOneInput")
+        self.gridLayout_5.addWidget(self.sweepStepOneInput, 0, 7, 1, 1)
+        self.sweepParameterTwoTitle = QtWidgets.QLabel(self.tabSweep)
+        self.sweepParameterTwoTitle.setObjectName("sweepParameterTwoTitle")
+        self.gridLayout_5.addWidget(self.sweepParameterTwoTitle, 1, 0, 1, 1)
+        self.sweepParameterTwoInput = QtWidgets.QComboBox(self.tabSweep)
+        self.sweepParameterTwoInput.setObjectName("sweepParameterTwoInput")
+        self.sweepParameterTwoInput.addItem("")
+        self.sweepParameterTwoInput.addItem("")
+        self.sweepParameterTwoInput.addItem("")
+        self.sweepParameterTwoInput.addItem("")
+        self.sweepParameterTwoInput.addItem("")
+        self.sweepParameterTwoInput.addItem("")
+        self.sweepParameterTwoInput.addItem("")
+        self.sweepParameterTwoInput.addItem("")
+        self.sweepParameterTwoInput.addItem("")
+        self.gridLayout_5.addWidget(self.sweepParameterTwoInput, 1, 1, 1, 1)
+        self.sweepStartTwoTitle = QtWidgets.QLabel(self.tabSweep)
+        self.sweepStartTwoTitle.setObjectName("sweepStartTwoTitle")
+        self.gridLayout_5.addWidget(self.sweepStartTwoTitle, 1, 2, 1, 1)
+        self.sweepStartTwoInput = QtWidgets.QDoubleSpinBox(self.tabSweep)
+        self.sweepStartTwoInput.setDecimals(2)
+        self.sweepStartTwoInput.setMaximum(1000000.0)
+        self.sweepStartTwoInput.setSingleStep(0.05)
+        self.sweepStartTwoInput.setProperty("value", 100.0)
+        self.sweepStartTwoInput.setObjectName("sweepStartTwoInput")
+        self.gridLayout_5.addWidget(self.sweepStartTwoInput, 1, 3, 1, 1)
+        self.sweepStopTwoTitle = QtWidgets.QLabel(self.tabSweep)
+        self.sweepStopTwoTitle.setObjectName("sweepStopTwoTitle")
+        self.gridLayout_5.addWidget(self.sweepStopTwoTitle, 1, 4, 1, 1)
+        self.sweepStopTwoInput = QtWidgets.QDoubleSpinBox(self.tabSweep)
+        self.sweepStopTwoInput.setDecimals(2)
+        self.sweepStopTwoInput.setMaximum(1000000.0)
+        self.sweepStopTwoInput.setSingleStep(0.05)
+        self.sweepStopTwoInput.setProperty("value", 1000.0)
+        self.sweepStopTwoInput.setObjectName("sweepStopTwoInput")
+        self.gridLayout_5.addWidget(self.sweepStopTwoInput, 1, 5, 1, 1)
+        self.sweepStepTwoTitle = QtWidgets.QLabel(self.tabSweep)
+        self.sweepStepTwoTitle.setObjectName("sweepStepTwoTitle")
+        self.gridLayout_5.addWidget(self.sweepStepTwoTitle, 1, 6, 1, 1)
+        self.sweepStepTwoInput = QtWidgets.QDoubleSpinBox(self.tabSweep)
+        self.sweepStepTwoInput.setDecimals(2)
+        self.sweepStepTwoInput.setMaximum(1000000.0)
+        self.sweepStepTwoInput.setSingleStep(0.05)
+        self.sweepStepTwoInput.setProperty("value", 300.0)
+        self.sweepStepTwoInput.setObjectName("sweepStepTwoInput")
+        self.gridLayout_5.addWidget(self.sweepStepTwoInput, 1, 7, 1, 1)
+        self.sweepDescriptionLabel = QtWidgets.QLabel(self.tabSweep)
+        self.sweepDescriptionLabel.setObjectName("sweepDescriptionLabel")
+        self.gridLayout_5.addWidget(self.sweepDescriptionLabel, 2, 0, 1, 4)
+        self.sweepProgressBar = QtWidgets.QProgressBar(self.tabSweep)
+        self.sweepProgressBar.setEnabled(False)
+        self.sweepProgressBar.setMaximum(100)
+        self.sweepProgressBar.setProperty("value", 0)
+        self.sweepProgressBar.setTextVisible(True)
+        self.sweepProgressBar.setObjectName("sweepProgressBar")
+        self.gridLayout_5.addWidget(self.sweepProgressBar, 2, 4, 1, 1)
+        self.stopSweepButton = QtWidgets.QPushButton(self.tabSweep)
+        self.stopSweepButton.setEnabled(False)
+        font = QtGui.QFont()
+        font.setFamily("Yu Gothic UI Semibold")
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.stopSweepButton.setFont(font)
+        self.stopSweepButton.setObjectName("stopSweepButton")
+        self.gridLayout_5.addWidget(self.stopSweepButton, 2, 5, 1, 1)
+        self.runSweepButton = QtWidgets.QPushButton(self.tabSweep)
+        font = QtGui.QFont()
+        font.setFamily("Yu Gothic UI Semibold")
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.runSweepButton.setFont(font)
+        self.runSweepButton.setObjectName("runSweepButton")
+        self.gridLayout_5.addWidget(self.runSweepButton, 2, 6, 1, 1)
+        self.saveSweepButton = QtWidgets.QPushButton(self.tabSweep)
+        self.saveSweepButton.setEnabled(False)
+        font = QtGui.QFont()
+        font.setFamily("Yu Gothic UI Semibold")
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.saveSweepButton.setFont(font)
+        self.saveSweepButton.setObjectName("saveSweepButton")
+        self.gridLayout_5.addWidget(self.saveSweepButton, 2, 7, 1, 1)
+        self.tableSweepResults = QtWidgets.QTableWidget(self.tabSweep)
+        self.tableSweepResults.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.tableSweepResults.setAlternatingRowColors(True)
+        self.tableSweepResults.setObjectName("tableSweepResults")
+        self.tableSweepResults.setColumnCount(0)
+        self.tableSweepResults.setRowCount(0)
+        self.gridLayout_5.addWidget(self.tableSweepResults, 3, 0, 1, 8)
+        self.tabBox.addTab(self.tabSweep, "")
         self.gridLayout_4.addWidget(self.tabBox, 0, 0, 1, 1)
         MainWindow.setCentralWidget(self.centralwidget)
         self.menubar = QtWidgets.QMenuBar(MainWindow)
@@ -514,6 +724,12 @@ class Ui_MainWindow(object):
         self.actionNight_Mode = QtWidgets.QAction(MainWindow)
         self.actionNight_Mode.setCheckable(True)
         self.actionNight_Mode.setObjectName("actionNight_Mode")
+        self.actionSave_Archive = QtWidgets.QAction(MainWindow)
+        self.actionSave_Archive.setObjectName("actionSave_Archive")
+        self.actionOpen_Archive = QtWidgets.QAction(MainWindow)
+        self.actionOpen_Archive.setObjectName("actionOpen_Archive")
+        self.menuMain.addAction(self.actionOpen_Archive)
+        self.menuMain.addAction(self.actionSave_Archive)
         self.menuMain.addAction(self.actionSave_Results)
         self.menuMain.addAction(self.actionExit)
         self.menuResults.addAction(self.actionUser_Manual)
@@ -524,8 +740,9 @@ class Ui_MainWindow(object):
 
         self.retranslateUi(MainWindow)
         self.tabBox.setCurrentIndex(1)
+        self.fishRetentionInput.setCurrentIndex(1)
         self.loadSimulationNumberInput.setCurrentIndex(-1)
-        self.clearResultsScreenButton.clicked.connect(self.resultScreenOne.clear)
+        self.clearResultsScreenButton.clicked.connect(self.resultScreenOne.clear) # type: ignore
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
 
     def retranslateUi(self, MainWindow):
@@ -581,6 +798,27 @@ class Ui_MainWindow(object):
         self.stopSimulationButton.setText(_translate("MainWindow", "Stop Simulation"))
         self.runSimulationButton.setStatusTip(_translate("MainWindow", "Start the simulation."))
         self.runSimulationButton.setText(_translate("MainWindow", "Run Simulation"))
+        self.simulationEngineTitle.setText(_translate("MainWindow", "Simulation Engine:"))
+        self.simulationEngineInput.setStatusTip(_translate("MainWindow", "Per Trial: one trial at a time. Trial Batched: many trials per array operation, sized to fit in memory. Estimates Only: pass counts drawn directly, no fish records (closed population)."))
+        self.simulationEngineInput.setItemText(0, _translate("MainWindow", "Per Trial"))
+        self.simulationEngineInput.setItemText(1, _translate("MainWindow", "Trial Batched"))
+        self.simulationEngineInput.setItemText(2, _translate("MainWindow", "Estimates Only"))
+        self.seedTitle.setText(_translate("MainWindow", "Seed:"))
+        self.seedInput.setStatusTip(_translate("MainWindow", "Master seed of the simulation, the same seed and parameters give the same results. Random: a new seed is drawn for every run."))
+        self.seedInput.setSpecialValueText(_translate("MainWindow", "Random"))
+        self.precisionModeTitle.setText(_translate("MainWindow", "Run Length:"))
+        self.precisionModeInput.setStatusTip(_translate("MainWindow", "Run the number of trials, or run until the target is reached (the number of trials is then the most trials run)."))
+        self.precisionModeInput.setItemText(0, _translate("MainWindow", "Fixed Trials"))
+        self.precisionModeInput.setItemText(1, _translate("MainWindow", "Relative SE of Mean"))
+        self.precisionModeInput.setItemText(2, _translate("MainWindow", "Median CI Half-width"))
+        self.precisionModeInput.setItemText(3, _translate("MainWindow", "Time Budget"))
+        self.precisionTargetTitle.setText(_translate("MainWindow", "Target:"))
+        self.precisionTargetInput.setStatusTip(_translate("MainWindow", "Relative SE of Mean: e.g. 0.005 for 0.5%. Median CI Half-width: 95% CI half-width in fish. Time Budget: seconds."))
+        self.fishRetentionTitle.setText(_translate("MainWindow", "Fish Data:"))
+        self.fishRetentionInput.setStatusTip(_translate("MainWindow", "Keep All Fish: every fish of every trial stays in memory. Regenerate On Demand: only the pass counts are kept, the fish of a trial are simulated again from its seed when displayed or saved."))
+        self.fishRetentionInput.setItemText(0, _translate("MainWindow", "Keep All Fish"))
+        self.fishRetentionInput.setItemText(1, _translate("MainWindow", "Regenerate On Demand"))
+        self.liveHistogramWidget.setStatusTip(_translate("MainWindow", "Histogram and running statistics of the estimates, updated while the simulation runs."))
         self.migrationDistanceSlider.setToolTip(_translate("MainWindow", "<html><head/><body><p>Change Max Migration Distance. At 0 = Fish moves 0% of subreach size; at 0.5 = fish moves 50% of subreach Size</p></body></html>"))
         self.migrationDistanceSlider.setStatusTip(_translate("MainWindow", "0 - Maximum Rate for Fish to Exit the Subreach 0.5 - Balanced Rate for Fish Entering/Exiting Subreach 1 - Maximum Rate for Fish to Enter the Subreach"))
         self.migrationRateSlider.setToolTip(_translate("MainWindow", "<html><head/><body><p>Change fish migration skew to downstream bias, balanced, or upstream bias</p></body></html>"))
@@ -591,28 +829,18 @@ class Ui_MainWindow(object):
         self.refreshResultsButton.setStatusTip(_translate("MainWindow", "Load the data for the test trial # selected. "))
         self.refreshResultsButton.setText(_translate("MainWindow", "Load Data"))
         self.tableRawFishData.setStatusTip(_translate("MainWindow", "Raw data for the selected simulation are shown on this table."))
-        self.tableRawFishData.setSortingEnabled(True)
-        item = self.tableRawFishData.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Capture Prob (Q1)"))
-        item = self.tableRawFishData.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "Initial Subreach (S1)"))
-        item = self.tableRawFishData.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Tagged"))
-        item = self.tableRawFishData.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Tag Lost"))
-        item = self.tableRawFishData.horizontalHeaderItem(4)
-        item.setText(_translate("MainWindow", "Mortality"))
-        item.setToolTip(_translate("MainWindow", "1 - Fish is alive. 0 - Fish is dead."))
-        item.setWhatsThis(_translate("MainWindow", "<html><head/><body><p><br/></p></body></html>"))
-        item = self.tableRawFishData.horizontalHeaderItem(5)
-        item.setText(_translate("MainWindow", "Migration Distance"))
-        item = self.tableRawFishData.horizontalHeaderItem(6)
-        item.setText(_translate("MainWindow", "Capture Prob (Q2)"))
-        item = self.tableRawFishData.horizontalHeaderItem(7)
-        item.setText(_translate("MainWindow", "Final Subreach (S2)"))
-        item = self.tableRawFishData.horizontalHeaderItem(8)
-        item.setText(_translate("MainWindow", "Recaught"))
+        self.fishFilterTitle.setText(_translate("MainWindow", "Show Fish:"))
+        self.fishFilterInput.setStatusTip(_translate("MainWindow", "Only show the fish of the selected trial that match this filter."))
+        self.fishFilterInput.setItemText(0, _translate("MainWindow", "All Fish"))
+        self.fishFilterInput.setItemText(1, _translate("MainWindow", "Recaught"))
+        self.fishFilterInput.setItemText(2, _translate("MainWindow", "Not Recaught"))
+        self.fishFilterInput.setItemText(3, _translate("MainWindow", "Tag Lost"))
+        self.fishFilterInput.setItemText(4, _translate("MainWindow", "In Subreach Window (S1)"))
+        self.fishFilterInput.setItemText(5, _translate("MainWindow", "In Subreach Window (S2)"))
+        self.fishFilterInput.setItemText(6, _translate("MainWindow", "Dead"))
         self.saveAllTrialsSeparateCheckBox.setText(_translate("MainWindow", "Save all Trials in Separate Files"))
+        self.saveAllTrialsIndexedCheckBox.setStatusTip(_translate("MainWindow", "One file with a trial column, and an index of where each trial starts so a trial can be read back on its own."))
+        self.saveAllTrialsIndexedCheckBox.setText(_translate("MainWindow", "Save all Trials in One Indexed File"))
         self.clearDataButton.setStatusTip(_translate("MainWindow", "Clear all Simulation Sets"))
         self.clearDataButton.setText(_translate("MainWindow", "Clear All Saved Data"))
         self.rawDataTableLabel.setText(_translate("MainWindow", "Load Simulation Set:"))
@@ -621,15 +849,6 @@ class Ui_MainWindow(object):
         self.populationGraphCheckBox.setStatusTip(_translate("MainWindow", "Double click on a column below to graph that trial\'s spread for that category. Check this box to include all trials in the graph for that category."))
         self.populationGraphCheckBox.setText(_translate("MainWindow", "Show the Population Spread"))
         self.tableRawTestData.setStatusTip(_translate("MainWindow", "Results of all trials for this simulation"))
-        self.tableRawTestData.setSortingEnabled(True)
-        item = self.tableRawTestData.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Est. Pop"))
-        item = self.tableRawTestData.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "First Pass Catch"))
-        item = self.tableRawTestData.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Second Pass Catch"))
-        item = self.tableRawTestData.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Recatch"))
         self.saveAllTrialsCheckBox.setText(_translate("MainWindow", "Save all Trials in One File"))
         self.saveSpecificTrialCheckBox.setText(_translate("MainWindow", "Save a specific trial"))
         self.viewImageButton.setStatusTip(_translate("MainWindow", "Show the results in a histogram."))
@@ -638,6 +857,42 @@ class Ui_MainWindow(object):
         self.saveResultsButton.setText(_translate("MainWindow", "Save Results"))
         self.simulationParameterPrint.setStatusTip(_translate("MainWindow", "Most recent simulation results."))
         self.tabBox.setTabText(self.tabBox.indexOf(self.tabResults), _translate("MainWindow", "Results"))
+        self.sweepParameterOneTitle.setText(_translate("MainWindow", "Sweep Parameter:"))
+        self.sweepParameterOneInput.setStatusTip(_translate("MainWindow", "Parameter to sweep, every other parameter comes from the Raw Simulation tab."))
+        self.sweepParameterOneInput.setItemText(0, _translate("MainWindow", "Population Size"))
+        self.sweepParameterOneInput.setItemText(1, _translate("MainWindow", "Capture Probability (Q1)"))
+        self.sweepParameterOneInput.setItemText(2, _translate("MainWindow", "Capture Probability (Q2)"))
+        self.sweepParameterOneInput.setItemText(3, _translate("MainWindow", "Tag Loss Rate"))
+        self.sweepParameterOneInput.setItemText(4, _translate("MainWindow", "Subreach Size"))
+        self.sweepParameterOneInput.setItemText(5, _translate("MainWindow", "Mortality Rate"))
+        self.sweepParameterOneInput.setItemText(6, _translate("MainWindow", "Migration Distance"))
+        self.sweepParameterOneInput.setItemText(7, _translate("MainWindow", "Migration Rate"))
+        self.sweepStartOneTitle.setText(_translate("MainWindow", "From:"))
+        self.sweepStopOneTitle.setText(_translate("MainWindow", "To:"))
+        self.sweepStepOneTitle.setText(_translate("MainWindow", "Step:"))
+        self.sweepParameterTwoTitle.setText(_translate("MainWindow", "Second Parameter:"))
+        self.sweepParameterTwoInput.setStatusTip(_translate("MainWindow", "Optional second parameter, every combination of the two is simulated."))
+        self.sweepParameterTwoInput.setItemText(0, _translate("MainWindow", "None"))
+        self.sweepParameterTwoInput.setItemText(1, _translate("MainWindow", "Population Size"))
+        self.sweepParameterTwoInput.setItemText(2, _translate("MainWindow", "Capture Probability (Q1)"))
+        self.sweepParameterTwoInput.setItemText(3, _translate("MainWindow", "Capture Probability (Q2)"))
+        self.sweepParameterTwoInput.setItemText(4, _translate("MainWindow", "Tag Loss Rate"))
+        self.sweepParameterTwoInput.setItemText(5, _translate("MainWindow", "Subreach Size"))
+        self.sweepParameterTwoInput.setItemText(6, _translate("MainWindow", "Mortality Rate"))
+        self.sweepParameterTwoInput.setItemText(7, _translate("MainWindow", "Migration Distance"))
+        self.sweepParameterTwoInput.setItemText(8, _translate("MainWindow", "Migration Rate"))
+        self.sweepStartTwoTitle.setText(_translate("MainWindow", "From:"))
+        self.sweepStopTwoTitle.setText(_translate("MainWindow", "To:"))
+        self.sweepStepTwoTitle.setText(_translate("MainWindow", "Step:"))
+        self.sweepDescriptionLabel.setText(_translate("MainWindow", "Every other parameter, the number of trials and the seed come from the Raw Simulation tab."))
+        self.sweepProgressBar.setStatusTip(_translate("MainWindow", "Progress of the sweep"))
+        self.stopSweepButton.setText(_translate("MainWindow", "Stop Sweep"))
+        self.runSweepButton.setStatusTip(_translate("MainWindow", "Simulate every combination of the swept parameters."))
+        self.runSweepButton.setText(_translate("MainWindow", "Run Sweep"))
+        self.saveSweepButton.setStatusTip(_translate("MainWindow", "Save the sweep table as a CSV file."))
+        self.saveSweepButton.setText(_translate("MainWindow", "Save Sweep"))
+        self.tableSweepResults.setStatusTip(_translate("MainWindow", "Parameters and estimate statistics of every sweep point"))
+        self.tabBox.setTabText(self.tabBox.indexOf(self.tabSweep), _translate("MainWindow", "Parameter Sweep"))
         self.menuMain.setTitle(_translate("MainWindow", "File"))
         self.menuResults.setTitle(_translate("MainWindow", "Options"))
         self.actionUser_Manual.setText(_translate("MainWindow", "User Manual"))
@@ -645,6 +900,11 @@ class Ui_MainWindow(object):
         self.actionExit.setText(_translate("MainWindow", "Exit"))
         self.actionDebug_Mode.setText(_translate("MainWindow", "Debug Mode"))
         self.actionNight_Mode.setText(_translate("MainWindow", "Night Mode"))
+        self.actionSave_Archive.setText(_translate("MainWindow", "Save Simulation Archive"))
+        self.actionSave_Archive.setStatusTip(_translate("MainWindow", "Save the loaded simulation, with every trial and its fish, as an archive that can be opened again."))
+        self.actionOpen_Archive.setText(_translate("MainWindow", "Open Simulation Archive"))
+        self.actionOpen_Archive.setStatusTip(_translate("MainWindow", "Open a saved simulation archive in the results tab, the data is read from disk as it is viewed."))
+from mplwidget import MplWidget
 
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+#################################################################################
+# Parameter Sweep
+# Runs a simulation for every combination of a grid of parameter values, across
+# a process pool, and collects one table: the parameters of every grid point
+# with the summary statistics of its estimates. Imports nothing from Qt, so it
+# is used by the GUI's sweep tab and by scripts, e.g.
+#   rows = runSweep(SimulationConfig(numTrials=2000, seed=7),
+#                   {'captureProbOne': {'start': 0.1, 'stop': 0.9, 'step': 0.1},
+#                    'populationSize': [100, 500, 1000]})
+#   writeSweepTable('sweep.csv', rows)
+#################################################################################
+import concurrent.futures
+import csv
+import itertools
+import multiprocessing
+import os
+
+import numpy as np
+
+from SimulationConfig import SimulationConfig
+from SimulationEngine import runTrials, measurePrecision, setWorkerStopEvent, workerStopRequested, \
+    SUMMARY_STATISTICS, PROGRESS_INTERVAL
+from SimulationKernel import POPULATION_OPEN, CAPTURE_VARY, SUBREACH_VARIED
+
+# Parameters offered by the sweep tab, in combo box order
+SWEEP_PARAMETERS = ('populationSize', 'captureProbOne', 'captureProbTwo', 'tagLossRate', 'subReachFraction',
+                    'mortalityRate', 'migrationDistance', 'migrationRate')
+
+# Options a swept parameter needs to have any effect
+SWEEP_IMPLIED_OPTIONS = {
+    'captureProbTwo': {'captureMode': CAPTURE_VARY},
+    'tagLossRate': {'tagLoss': True},
+    'subReachFraction': {'subReachMode': SUBREACH_VARIED},
+    'mortalityRate': {'populationType': POPULATION_OPEN},
+    'migrationDistance': {'populationType': POPULATION_OPEN},
+    'migrationRate': {'populationType': POPULATION_OPEN},
+}
+
+
+#################################################################################
+# Values of one swept parameter
+#################################################################################
+def sweepValues(spec):
+    '''
+    A list of values is used as given. A dict {'start', 'stop', 'step'} is the range from start to
+    stop inclusive, and {'start', 'stop', 'num'} is num evenly spaced values from start to stop.
+    '''
+    if not isinstance(spec, dict):
+        return list(spec)
+    if 'num' in spec:
+        return list(np.linspace(spec['start'], spec['stop'], int(spec['num'])))
+    if spec['step'] <= 0:
+        raise ValueError("Sweep step must be positive")
+    count = int(np.floor((spec['stop'] - spec['start']) / spec['step'] + 1e-9)) + 1
+    return [round(spec['start'] + index * spec['step'], 10) for index in range(max(count, 0))]
+
+
+#################################################################################
+# Config of every grid point
+#################################################################################
+def sweepConfigs(baseConfig, ranges):
+    '''
+    One SimulationConfig per combination of the values in ranges (parameter name: sweepValues spec),
+    in grid order with the last parameter changing fastest. Every other parameter, including the
+    seed, comes from baseConfig, so all the grid points share the same random streams.
+    '''
+    names = list(ranges)
+    grids = [sweepValues(ranges[name]) for name in names]
+    base = baseConfig.ToDict()
+    for name in names:
+        base.update(SWEEP_IMPLIED_OPTIONS.get(name, {}))
+    return [SimulationConfig.FromDict(dict(base, **dict(zip(names, values)))) for values in itertools.product(*grids)]
+
+
+#################################################################################
+# Run one grid point, in a worker process
+#################################################################################
+def simulateSweepPoint(pointIndex, config):
+    stopped = []
+
+    def shouldStop():
+        if workerStopRequested():
+            stopped.append(True)
+        return bool(stopped)
+
+    # Only the streaming statistics are kept, so a grid point needs no memory per trial
+    statistics = runTrials(config, shouldStop=shouldStop, keepResults=False, keepEstimates=False)[2]
+    if stopped:
+        # Cut short by a stop, the point is left out of the table
+        return pointIndex, None
+    row = config.ToDict()
+    row['trialsRun'] = statistics.GetCount()
+    row['precision'] = measurePrecision(config, statistics)
+    row.update(statistics.GetSummary(config.populationSize))
+    return pointIndex, row
+
+
+#################################################################################
+# Run every grid point on a process pool
+#################################################################################
+def runSweep(baseConfig, ranges, workers=None, progressCallback=None, shouldStop=None):
+    '''
+    Simulate every grid point of sweepConfigs(baseConfig, ranges), one point per task.
+
+    progressCallback(pointsCompleted, totalPoints) is called as points finish. shouldStop() is
+    checked every PROGRESS_INTERVAL seconds; when it returns True the pending points are cancelled
+    and the running points end after their current batch, through the stop event of the workers
+    (see runTrialsParallel). Returns the table as a list of dicts, one per completed point in grid
+    order (a partial table when stopped), with the SimulationConfig fields, trialsRun, precision
+    (see measurePrecision) and SUMMARY_STATISTICS.
+    '''
+    configs = sweepConfigs(baseConfig, ranges)
+    rows = {}
+    stopEvent = multiprocessing.Event()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                                initializer=setWorkerStopEvent, initargs=(stopEvent,)) as executor:
+        pending = {executor.submit(simulateSweepPoint, pointIndex, config) for pointIndex, config in enumerate(configs)}
+
+        def addRows(futures):
+            for future in futures:
+                pointIndex, row = future.result()
+                if row is not None:
+                    rows[pointIndex] = row
+
+        while pending:
+            # Time out to check shouldStop while long points run
+            done, pending = concurrent.futures.wait(pending, timeout=PROGRESS_INTERVAL,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            addRows(done)
+            if done and progressCallback is not None:
+                progressCallback(len(rows), len(configs))
+            if shouldStop is not None and shouldStop():
+                # Keep the points that finished before the workers saw the stop event
+                stopEvent.set()
+                for future in pending:
+                    future.cancel()
+                addRows([future for future in concurrent.futures.wait(pending)[0] if not future.cancelled()])
+                break
+    return [rows[pointIndex] for pointIndex in sorted(rows)]
+
+
+#################################################################################
+# Columns of the sweep table
+#################################################################################
+def sweepColumns():
+    return list(SimulationConfig().ToDict()) + ['trialsRun', 'precision'] + list(SUMMARY_STATISTICS)
+
+
+#################################################################################
+# Write the sweep table as CSV
+#################################################################################
+def writeSweepTable(path, rows):
+    with open(path, 'w', newline='') as sweepFile:
+        writer = csv.DictWriter(sweepFile, fieldnames=sweepColumns())
+        writer.writeheader()
+        writer.writerows(rows)
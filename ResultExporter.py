@@ -0,0 +1,329 @@
+#################################################################################
+# Result Exporter
+# Writes simulation results as CSV straight from the result arrays, without the
+# Qt tables: rows are formatted a block of CHUNK_ROWS at a time with numpy string
+# operations and every block is written in one call, so exporting millions of
+# fish is limited by the disk rather than by per-cell Python or Qt objects.
+# Paths ending in .gz are gzip-compressed. The long format puts the fish of every
+# trial in one file with a trial column and an index of where every trial starts,
+# so a trial is read back by seeking. An ExportJob writes a list of files
+# block by block with progress and cancellation, for running in the background.
+# Imports nothing from Qt.
+#################################################################################
+import csv
+import dataclasses
+import gzip
+import os
+import time
+
+import numpy as np
+
+from FishPopulation import FISH_TABLE_COLUMNS, FISH_TABLE_HEADERS, FISH_TABLE_DECIMALS
+from SimulationKernel import POPULATION_OPEN
+from SimulationResultStore import TRIAL_COLUMNS, TRIAL_TABLE_HEADERS
+
+# Rows formatted and written at a time
+CHUNK_ROWS = 65536
+# Line terminator of csv's excel dialect, as the tables were saved before
+LINE_END = '\r\n'
+# Decimals of the trial columns (None: as is)
+TRIAL_TABLE_DECIMALS = (0, None, None, None)
+# Columns of the long-format fish file and of its index
+LONG_FORMAT_HEADERS = ('Trial',) + FISH_TABLE_HEADERS
+LONG_FORMAT_INDEX_HEADERS = ('Trial', 'Offset', 'Rows')
+# zlib's default level: close to the smallest files at a fraction of level 9's time
+GZIP_LEVEL = 6
+
+
+#################################################################################
+# Open a CSV file for writing, gzip-compressed when asked or, by default, for .gz
+#################################################################################
+def openCsv(path, compress=None):
+    if compress is None:
+        compress = path.lower().endswith('.gz')
+    if compress:
+        return gzip.open(path, 'wt', compresslevel=GZIP_LEVEL, newline='')
+    return open(path, 'w', newline='')
+
+
+#################################################################################
+# Format a column as strings, with a fixed number of decimals or as is (None)
+# Numbers are rounded to integers of their last decimal; when those span fewer
+# values than the column has rows (probabilities, subreaches, flags), each
+# distinct value is formatted once and the column is a lookup into the table.
+# Negative values that round to zero keep their sign ("-0.00"), as str.format.
+#################################################################################
+def formatColumn(values, decimals=None):
+    values = np.asarray(values)
+    if values.dtype.kind in 'US' or len(values) == 0:
+        return values.astype(str)
+    scale = 10 ** (decimals or 0)
+    scaled = np.round(values.astype(float) * scale).astype(np.int64)
+    lowest, highest = scaled.min(), scaled.max()
+    if highest - lowest < len(scaled):
+        text = formatScaled(np.arange(lowest, highest + 1), decimals)[scaled - lowest]
+    else:
+        text = formatScaled(scaled, decimals)
+    if values.dtype.kind == 'f':
+        negativeZero = np.signbit(values) & (scaled == 0)
+        if negativeZero.any():
+            text = np.where(negativeZero, np.char.add('-', text), text)
+    return text
+
+
+def formatScaled(scaled, decimals):
+    text = scaled.astype(str)
+    if decimals:
+        scale = 10 ** decimals
+        text = np.char.add(np.char.add((np.abs(scaled) // scale).astype(str), '.'),
+                           np.char.zfill((np.abs(scaled) % scale).astype(str), decimals))
+        text = np.where(scaled < 0, np.char.add('-', text), text)
+    # Narrowest string type, joining the columns takes time in proportion to it
+    return text.astype('U' + str(max(1, np.char.str_len(text).max(initial=1))))
+
+
+#################################################################################
+# Write rows given as equal length columns of strings, in one write
+# Returns the number of characters written (bytes before compression).
+#################################################################################
+def writeRows(outputFile, columns):
+    if len(columns[0]) == 0:
+        return 0
+    return outputFile.write(joinRows(columns))
+
+
+def joinRows(columns):
+    lines = columns[0]
+    for column in columns[1:]:
+        lines = np.char.add(np.char.add(lines, ','), column)
+    return LINE_END.join(lines.tolist()) + LINE_END
+
+
+def writeHeader(outputFile, headers):
+    return outputFile.write(','.join(headers) + LINE_END)
+
+
+#################################################################################
+# Write the rows of the raw fish data table of a population, CHUNK_ROWS at a time
+# onBlock(rows, characters) is called after every block written.
+#################################################################################
+def writeFishRows(outputFile, fishData, chunkRows=CHUNK_ROWS, onBlock=None):
+    for start in range(0, len(fishData), chunkRows):
+        block = fishData.GetSlice(start, start + chunkRows)
+        characters = writeRows(outputFile, [formatColumn(block.GetTableColumn(column), FISH_TABLE_DECIMALS[column])
+                                            for column in range(len(FISH_TABLE_COLUMNS))])
+        if onBlock is not None:
+            onBlock(len(block), characters)
+
+
+#################################################################################
+# Export the fish of one trial
+#################################################################################
+def exportFishData(path, fishData, compress=None, onBlock=None):
+    with openCsv(path, compress) as outputFile:
+        writeHeader(outputFile, FISH_TABLE_HEADERS)
+        writeFishRows(outputFile, fishData, onBlock=onBlock)
+
+
+#################################################################################
+# Export the fish of every trial of a result store in one file, one header
+#################################################################################
+def exportAllFish(path, resultStore, compress=None, onBlock=None):
+    '''
+    Stored fish are written in blocks across trial boundaries; lazy trials are regenerated and
+    written one trial at a time, so only one trial's fish are in memory.
+    '''
+    with openCsv(path, compress) as outputFile:
+        writeHeader(outputFile, FISH_TABLE_HEADERS)
+        if resultStore.fishColumns is not None:
+            writeFishRows(outputFile, resultStore.GetAllFishData(), onBlock=onBlock)
+        else:
+            for row in range(resultStore.GetNumTrials()):
+                writeFishRows(outputFile, resultStore.GetFishData(row), onBlock=onBlock)
+
+
+#################################################################################
+# Export the fish of every trial in one long-format file, with an index
+# Every row starts with its trial number. The index (indexPath) holds the byte
+# offset and number of rows of every trial. Compressed files are one gzip member
+# per block, so decompression can start at any trial's offset.
+#################################################################################
+def exportLongFormat(path, resultStore, indexPath, compress=None, onBlock=None):
+    if compress is None:
+        compress = path.lower().endswith('.gz')
+    offsets = np.zeros(resultStore.GetNumTrials(), dtype=np.int64)
+    counts = np.zeros(resultStore.GetNumTrials(), dtype=np.int64)
+    with open(path, 'wb') as outputFile:
+
+        def write(text):
+            data = text.encode('ascii')
+            outputFile.write(gzip.compress(data, GZIP_LEVEL) if compress else data)
+            return len(text)
+
+        write(','.join(LONG_FORMAT_HEADERS) + LINE_END)
+        for row in range(resultStore.GetNumTrials()):
+            offsets[row] = outputFile.tell()
+            fishData = resultStore.GetFishData(row)
+            counts[row] = len(fishData)
+            trial = str(resultStore.GetTrialIndex()[row] + 1)
+            for start in range(0, len(fishData), CHUNK_ROWS):
+                block = fishData.GetSlice(start, start + CHUNK_ROWS)
+                characters = write(joinRows([np.full(len(block), trial)]
+                                            + [formatColumn(block.GetTableColumn(column), FISH_TABLE_DECIMALS[column])
+                                               for column in range(len(FISH_TABLE_COLUMNS))]))
+                if onBlock is not None:
+                    onBlock(len(block), characters)
+
+    with open(indexPath, 'w', newline='') as indexFile:
+        writeHeader(indexFile, LONG_FORMAT_INDEX_HEADERS)
+        writeRows(indexFile, [formatColumn(resultStore.GetTrialIndex() + 1), formatColumn(offsets),
+                              formatColumn(counts)])
+
+
+#################################################################################
+# Read the fish rows of one trial of a long-format file, by seeking to it
+#################################################################################
+def readLongFormatTrial(path, indexPath, trial):
+    '''
+    Returns the rows (lists of strings, trial column first) of trial number trial (from 1), read
+    from the offset in the index; raises KeyError if the trial is not in the file.
+    '''
+    with open(indexPath, newline='') as indexFile:
+        index = {int(entry[0]): (int(entry[1]), int(entry[2])) for entry in list(csv.reader(indexFile))[1:]}
+    offset, rows = index[trial]
+    with open(path, 'rb') as inputFile:
+        inputFile.seek(offset)
+        with gzip.GzipFile(fileobj=inputFile) if path.lower().endswith('.gz') else inputFile as stream:
+            lines = [stream.readline().decode('ascii') for _ in range(rows)]
+    return list(csv.reader(lines))
+
+
+#################################################################################
+# Export the raw test data (one row per trial), optionally followed by a summary
+#################################################################################
+def exportTrials(path, resultStore, summary=None, compress=None, onBlock=None):
+    with openCsv(path, compress) as outputFile:
+        writeHeader(outputFile, TRIAL_TABLE_HEADERS)
+        for start in range(0, resultStore.GetNumTrials(), CHUNK_ROWS):
+            columns = [formatColumn(resultStore.GetTrialColumn(name)[start:start + CHUNK_ROWS], decimals)
+                       for name, decimals in zip(TRIAL_COLUMNS, TRIAL_TABLE_DECIMALS)]
+            characters = writeRows(outputFile, columns)
+            if onBlock is not None:
+                onBlock(len(columns[0]), characters)
+        if summary is not None:
+            csv.writer(outputFile, dialect='excel').writerow(["\n\n", summary])
+
+
+#################################################################################
+# Number of fish of the trials of a store: stored counts, or the fish a lazy
+# trial regenerates (populationSize per area, three areas in open populations)
+#################################################################################
+def countFish(resultStore, rows=None):
+    rows = range(resultStore.GetNumTrials()) if rows is None else rows
+    if resultStore.fishColumns is not None:
+        return int(resultStore.GetFishCounts()[list(rows)].sum())
+    if resultStore.config is not None:
+        areas = 3 if resultStore.config.populationType == POPULATION_OPEN else 1
+        return len(rows) * resultStore.config.populationSize * areas
+    return 0
+
+
+#################################################################################
+# Progress of an export job
+#################################################################################
+@dataclasses.dataclass
+class ExportProgress:
+    files: int
+    filesWritten: int = 0
+    rows: int = 0
+    rowsWritten: int = 0
+    bytesWritten: int = 0
+    seconds: float = 0.0
+    cancelled: bool = False
+
+    def GetPercent(self):
+        if self.rows == 0:
+            return 100 * self.filesWritten // max(self.files, 1)
+        return min(100, 100 * self.rowsWritten // self.rows)
+
+    def GetSecondsRemaining(self):
+        if self.rowsWritten == 0 or self.rows == 0:
+            return None
+        return max(0.0, self.seconds * (self.rows - self.rowsWritten) / self.rowsWritten)
+
+    def GetText(self):
+        text = "Exported " + str(self.filesWritten) + "/" + str(self.files) + " files, " \
+               + str('{number:.{digits}f}'.format(number=self.bytesWritten / 1e6, digits=1)) + " MB"
+        remaining = self.GetSecondsRemaining()
+        if remaining is not None and self.filesWritten < self.files:
+            text += ", about " + str(int(round(remaining))) + " s left"
+        return text
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+#################################################################################
+# EXPORT JOB: FILES TO WRITE, WRITTEN IN ORDER BY Run
+#################################################################################
+class ExportJob:
+
+    def __init__(self, compress=None):
+        self.compress = compress
+        # (path, export function, arguments, rows) of every file, in order
+        self.files = []
+
+    #################################################################################
+    # FILES OF THE JOB
+    #################################################################################
+    def AddFishData(self, path, fishData):
+        self.files.append((path, exportFishData, (fishData,), len(fishData)))
+
+    def AddTrialFishData(self, path, resultStore, row):
+        # The fish of a lazy trial are only regenerated when its file is written
+        self.files.append((path, lambda path, **kwargs: exportFishData(path, resultStore.GetFishData(row), **kwargs),
+                           (), countFish(resultStore, [row])))
+
+    def AddAllFish(self, path, resultStore):
+        self.files.append((path, exportAllFish, (resultStore,), countFish(resultStore)))
+
+    def AddLongFormat(self, path, indexPath, resultStore):
+        self.files.append((path, exportLongFormat, (resultStore, indexPath), countFish(resultStore)))
+
+    def AddTrials(self, path, resultStore, summary=None):
+        self.files.append((path, exportTrials, (resultStore, summary), resultStore.GetNumTrials()))
+
+    #################################################################################
+    # WRITE THE FILES
+    # progressCallback(ExportProgress) is called after every block; when shouldStop()
+    # returns True the file being written is deleted and no more files are written.
+    #################################################################################
+    def Run(self, progressCallback=None, shouldStop=None):
+        progress = ExportProgress(files=len(self.files), rows=sum(file[3] for file in self.files))
+        start_time = time.time()
+
+        def onBlock(rows, characters):
+            progress.rowsWritten += rows
+            progress.bytesWritten += characters
+            progress.seconds = time.time() - start_time
+            if progressCallback is not None:
+                progressCallback(progress)
+            if shouldStop is not None and shouldStop():
+                raise ExportCancelled()
+
+        for path, export, arguments, rows in self.files:
+            try:
+                export(path, *arguments, compress=self.compress, onBlock=onBlock)
+            except ExportCancelled:
+                os.remove(path)
+                progress.cancelled = True
+                return progress
+            progress.filesWritten += 1
+            progress.seconds = time.time() - start_time
+            if progressCallback is not None:
+                progressCallback(progress)
+            if shouldStop is not None and shouldStop():
+                progress.cancelled = True
+                return progress
+        return progress
@@ -0,0 +1,273 @@
+#################################################################################
+# Result Table Models
+# Qt models behind the raw test data and raw fish data tables. They read the
+# result arrays directly and format a cell only when the view asks for it, so
+# only the visible rows are ever turned into text, whatever the trial or fish
+# count. Sorting and filtering reorder a row index array, the data is never
+# copied. The fish model caches the sort order of every column and the mask of
+# every filter per trial, so sorting or filtering a trial again is a lookup.
+#################################################################################
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QVariant
+from PyQt5.QtGui import QColor
+
+from FishPopulation import FISH_TABLE_COLUMNS, FISH_TABLE_HEADERS, FISH_TABLE_DECIMALS, RECAUGHT_YES
+from SimulationResultStore import SimulationResultStore, TRIAL_COLUMNS, TRIAL_TABLE_HEADERS
+
+# Header tooltips of the raw fish data table
+FISH_TABLE_TOOLTIPS = {4: '1 - Fish is alive. 0 - Fish is dead.'}
+
+# Fish table filters, in the order of the fish filter input
+FILTER_ALL = 0
+FILTER_RECAUGHT = 1
+FILTER_NOT_RECAUGHT = 2
+FILTER_TAG_LOST = 3
+FILTER_IN_WINDOW_ONE = 4
+FILTER_IN_WINDOW_TWO = 5
+FILTER_DEAD = 6
+
+# Sort orders and filter masks kept by a fish model, the oldest are dropped first
+MAX_CACHED_INDEXES = 64
+
+# Debug mode cell highlights: codes of the highlight arrays and their colours
+HIGHLIGHT_NONE = 0
+HIGHLIGHT_GREEN = 1
+HIGHLIGHT_RED = 2
+HIGHLIGHT_COLOURS = (None, QColor(55, 174, 114), QColor(223, 36, 36))
+
+
+#################################################################################
+# Sorted row order of a column, descending order keeps equal values in order
+#################################################################################
+def sortedRows(keys, order):
+    if order == Qt.DescendingOrder:
+        return len(keys) - 1 - np.argsort(keys[::-1], kind='stable')[::-1]
+    return np.argsort(keys, kind='stable')
+
+
+#################################################################################
+# Mask of the fish kept by a filter
+# window: (lower, upper) bounds of the study subreach, None when all fish are in it
+#################################################################################
+def fishFilterMask(fishData, filterId, window=None):
+    if filterId == FILTER_RECAUGHT:
+        return fishData.reCaught == RECAUGHT_YES
+    if filterId == FILTER_NOT_RECAUGHT:
+        return fishData.reCaught != RECAUGHT_YES
+    if filterId == FILTER_TAG_LOST:
+        return fishData.GetTagStatus() == 0
+    if filterId == FILTER_DEAD:
+        return ~np.asarray(fishData.mortality, dtype=bool)
+    if filterId in (FILTER_IN_WINDOW_ONE, FILTER_IN_WINDOW_TWO):
+        positions = fishData.subReachPos if filterId == FILTER_IN_WINDOW_ONE else fishData.subReachPosTwo
+        if window is None:
+            return np.ones(len(positions), dtype=bool)
+        return (window[0] <= positions) & (positions <= window[1])
+    return None
+
+
+#################################################################################
+# RAW TEST DATA: ONE ROW PER TRIAL OF A SimulationResultStore
+#################################################################################
+class TrialTableModel(QAbstractTableModel):
+
+    def __init__(self, parent=None):
+        super(TrialTableModel, self).__init__(parent)
+        self.resultStore = SimulationResultStore.Concatenate([])
+        # Store row shown in every table row, and the sort orders of the current store
+        self.rows = np.arange(0)
+        self.sortOrders = {}
+
+    #################################################################################
+    # SHOW THE TRIALS OF A RESULT STORE, IN TRIAL ORDER
+    #################################################################################
+    def SetResultStore(self, resultStore):
+        self.beginResetModel()
+        self.resultStore = resultStore
+        self.rows = np.arange(len(resultStore))
+        self.sortOrders = {}
+        self.endResetModel()
+
+    def Clear(self):
+        self.SetResultStore(SimulationResultStore.Concatenate([]))
+
+    #################################################################################
+    # GETTER FOR THE STORE ROW OF A TABLE ROW (TABLE ROWS MOVE WHEN SORTED)
+    #################################################################################
+    def GetStoreRow(self, row):
+        return int(self.rows[row])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(TRIAL_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        if role == Qt.DisplayRole:
+            value = self.resultStore.GetTrialColumn(TRIAL_COLUMNS[index.column()])[self.rows[index.row()]]
+            if index.column() == 0:
+                return str('{number:.{digits}f}'.format(number=value, digits=0))
+            return str(value)
+        if role == Qt.UserRole:
+            return self.GetStoreRow(index.row())
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return TRIAL_TABLE_HEADERS[section]
+        # Trial number, stays with its trial when sorted
+        return str(self.resultStore.GetTrialIndex()[self.rows[section]] + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.beginResetModel()
+        if (column, order) not in self.sortOrders:
+            self.sortOrders[column, order] = sortedRows(self.resultStore.GetTrialColumn(TRIAL_COLUMNS[column]), order)
+        self.rows = self.sortOrders[column, order]
+        self.endResetModel()
+
+
+#################################################################################
+# RAW FISH DATA: ONE ROW PER FISH OF A FishPopulation
+#################################################################################
+class FishTableModel(QAbstractTableModel):
+
+    def __init__(self, parent=None):
+        super(FishTableModel, self).__init__(parent)
+        self.fishData = None
+        self.columns = [np.arange(0) for _ in FISH_TABLE_COLUMNS]
+        self.highlights = {}
+        self.cacheKey = None
+        self.window = None
+        # Fish shown in every table row, from the current sort and filter
+        self.rows = np.arange(0)
+        self.sortColumn = None
+        self.sortOrder = Qt.AscendingOrder
+        self.filterId = FILTER_ALL
+        self.indexCache = OrderedDict()
+
+    #################################################################################
+    # SHOW THE FISH OF A POPULATION, WITH THE CURRENT SORT AND FILTER
+    # highlights: column index -> array of HIGHLIGHT_ codes, one per fish (debug mode)
+    # cacheKey: key of the trial, e.g. (simulation, trial), its sort orders and filter
+    # masks are cached under it (None: not cached); window: subreach bounds or None
+    #################################################################################
+    def SetFishData(self, fishData, highlights=None, cacheKey=None, window=None):
+        self.beginResetModel()
+        self.fishData = fishData
+        self.columns = [fishData.GetTableColumn(column) for column in range(len(FISH_TABLE_COLUMNS))]
+        self.highlights = highlights or {}
+        self.cacheKey = cacheKey
+        self.window = window
+        self.rows = self._Rows()
+        self.endResetModel()
+
+    def Clear(self):
+        self.beginResetModel()
+        self.fishData = None
+        self.columns = [np.arange(0) for _ in FISH_TABLE_COLUMNS]
+        self.highlights = {}
+        self.cacheKey = None
+        self.rows = np.arange(0)
+        self.endResetModel()
+
+    def ClearCache(self):
+        self.indexCache.clear()
+
+    #################################################################################
+    # GETTER FOR THE FISH POPULATION SHOWN (NONE WHEN NO TRIAL IS SHOWN)
+    #################################################################################
+    def GetFishData(self):
+        return self.fishData
+
+    #################################################################################
+    # SETTER FOR THE FILTER (FILTER_ ID)
+    #################################################################################
+    def SetFilter(self, filterId):
+        self.beginResetModel()
+        self.filterId = filterId
+        self.rows = self._Rows()
+        self.endResetModel()
+
+    def GetFilter(self):
+        return self.filterId
+
+    #################################################################################
+    # GETTER FOR THE FISH (ROW OF THE POPULATION) SHOWN IN A TABLE ROW
+    #################################################################################
+    def GetFish(self, row):
+        return int(self.rows[row])
+
+    #################################################################################
+    # FISH OF THE TABLE ROWS: THE SORT ORDER WITHOUT THE FISH THE FILTER DROPS
+    #################################################################################
+    def _Rows(self):
+        if self.fishData is None:
+            return np.arange(0)
+        rows = np.arange(len(self.fishData))
+        if self.sortColumn is not None:
+            # Recaught labels sort as their codes, which are in label order
+            keys = self.fishData.reCaught if FISH_TABLE_COLUMNS[self.sortColumn] == 'reCaught' \
+                else self.columns[self.sortColumn]
+            rows = self._Cached(('sort', self.sortColumn, self.sortOrder), lambda: sortedRows(keys, self.sortOrder))
+        if self.filterId != FILTER_ALL:
+            mask = self._Cached(('filter', self.filterId, self.window),
+                                lambda: fishFilterMask(self.fishData, self.filterId, self.window))
+            rows = rows[mask[rows]]
+        return rows
+
+    def _Cached(self, key, compute):
+        if self.cacheKey is None:
+            return compute()
+        key = (self.cacheKey,) + key
+        if key in self.indexCache:
+            self.indexCache.move_to_end(key)
+        else:
+            self.indexCache[key] = compute()
+            if len(self.indexCache) > MAX_CACHED_INDEXES:
+                self.indexCache.popitem(last=False)
+        return self.indexCache[key]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(FISH_TABLE_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        column = index.column()
+        fish = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            value = self.columns[column][fish]
+            if FISH_TABLE_DECIMALS[column] is not None:
+                return str('{number:.{digits}f}'.format(number=value, digits=FISH_TABLE_DECIMALS[column]))
+            return str(value)
+        if role == Qt.BackgroundRole and column in self.highlights:
+            colour = HIGHLIGHT_COLOURS[self.highlights[column][fish]]
+            return colour if colour is not None else QVariant()
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return FISH_TABLE_HEADERS[section]
+        if orientation == Qt.Horizontal and role == Qt.ToolTipRole and section in FISH_TABLE_TOOLTIPS:
+            return FISH_TABLE_TOOLTIPS[section]
+        if orientation == Qt.Vertical and role == Qt.DisplayRole:
+            # Fish number, stays with its fish when sorted or filtered
+            return str(self.rows[section] + 1)
+        return QVariant()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.beginResetModel()
+        self.sortColumn = column
+        self.sortOrder = order
+        self.rows = self._Rows()
+        self.endResetModel()
@@ -0,0 +1,124 @@
+#################################################################################
+# Simulation Archive
+# Saves a simulation (SimulationParameters with its result store) as a directory
+# of .npy files plus a JSON metadata file, and loads it back. Every array is one
+# .npy file, so loading memory-maps it (np.load mmap_mode='r'): reopening a
+# multi-gigabyte run reads only the metadata, the arrays are paged in as they
+# are looked at.
+#
+#   name.awri/
+#       metadata.json           config, summary and the layout of the arrays
+#       trialIndex.npy, estimate.npy, firstPassCaught.npy, ...  trial columns
+#       fishOffsets.npy, fish_<column>.npy                      stored fish (CSR)
+#       statisticsHistogram.npy histogram of the streaming statistics
+#       fishHistogram_<column>.npy histograms of the fish table columns
+#################################################################################
+import json
+import os
+
+import numpy as np
+
+from FishHistograms import FishHistograms
+from SimulationConfig import SimulationConfig
+from SimulationParameters import SimulationParameters
+from SimulationResultStore import SimulationResultStore, TRIAL_COLUMNS
+from StreamingStatistics import StreamingStatistics
+
+ARCHIVE_VERSION = 1
+ARCHIVE_EXTENSION = '.awri'
+METADATA_FILE = 'metadata.json'
+
+# Summary attributes of SimulationParameters kept in the metadata
+SIMULATION_FIELDS = ('numberTrials', 'estimatedPopulation', 'actualPopulation', 'parameters', 'seed', 'precision',
+                     'partial', 'median', 'skew', 'firstQuart', 'secondQuart', 'thirdQuart', 'fourthQuart',
+                     'paramCaptureCategory', 'paramCaptureOne', 'paramCaptureTwo', 'paramLowBound', 'paramHighBound',
+                     'paramBoundsApply')
+
+
+#################################################################################
+# Write a simulation archive
+#################################################################################
+def writeArchive(path, simulation):
+    '''
+    Save simulation (SimulationParameters) in the directory path, created if needed. The metadata is
+    written last, so a directory without it is an incomplete archive. Returns the path.
+    '''
+    os.makedirs(path, exist_ok=True)
+    resultStore = simulation.GetTestData()
+    statistics = simulation.GetStatistics()
+    config = simulation.GetConfig()
+
+    for name in ('trialIndex',) + TRIAL_COLUMNS + ('fishOffsets',):
+        np.save(os.path.join(path, name + '.npy'), getattr(resultStore, name))
+    fishColumns = []
+    if resultStore.fishColumns is not None:
+        for name, column in resultStore.fishColumns.items():
+            if column is not None:
+                np.save(os.path.join(path, 'fish_' + name + '.npy'), column)
+                fishColumns.append(name)
+    if statistics is not None:
+        np.save(os.path.join(path, 'statisticsHistogram.npy'), statistics.histogram)
+    fishHistograms = resultStore.fishHistograms
+    if fishHistograms is not None:
+        for column, columnStatistics in enumerate(fishHistograms.columns):
+            np.save(os.path.join(path, 'fishHistogram_' + str(column) + '.npy'), columnStatistics.histogram)
+
+    metadata = {
+        'version': ARCHIVE_VERSION,
+        'config': None if config is None else config.ToDict(),
+        'simulation': {name: getattr(simulation, name) for name in SIMULATION_FIELDS if hasattr(simulation, name)},
+        'statistics': None if statistics is None else statistics.GetState(),
+        'fishHistograms': None if fishHistograms is None else fishHistograms.GetState(),
+        # Stored fish columns, or None when the fish are regenerated from the config (lazy) or not kept
+        'fishColumns': fishColumns if resultStore.fishColumns is not None else None,
+        'regenerateFish': resultStore.config is not None,
+    }
+    with open(os.path.join(path, METADATA_FILE), 'w') as metadataFile:
+        # Numpy scalars are written as Python numbers
+        json.dump(metadata, metadataFile, indent=2, default=lambda value: value.item())
+    return path
+
+
+#################################################################################
+# Read a simulation archive
+#################################################################################
+def readArchive(path, mmapMode='r'):
+    '''
+    Load the archive in the directory path as a SimulationParameters. The arrays are memory-mapped
+    read-only (mmapMode=None reads them into memory). Raises ValueError if path is not an archive
+    this version can read.
+    '''
+    metadataPath = os.path.join(path, METADATA_FILE)
+    if not os.path.isfile(metadataPath):
+        raise ValueError("Not a simulation archive (no " + METADATA_FILE + "): " + str(path))
+    with open(metadataPath) as metadataFile:
+        metadata = json.load(metadataFile)
+    if metadata.get('version') != ARCHIVE_VERSION:
+        raise ValueError("Unsupported simulation archive version: " + str(metadata.get('version')))
+
+    def loadArray(name):
+        return np.load(os.path.join(path, name + '.npy'), mmap_mode=mmapMode)
+
+    config = None if metadata['config'] is None else SimulationConfig.FromDict(metadata['config'])
+    fishColumns = None
+    if metadata['fishColumns'] is not None:
+        fishColumns = {name: None for name in ('parameterCaptureOne', 'parameterCaptureTwo')}
+        fishColumns.update({name: loadArray('fish_' + name) for name in metadata['fishColumns']})
+    resultStore = SimulationResultStore(*[loadArray(name) for name in ('trialIndex',) + TRIAL_COLUMNS],
+                                        fishColumns, loadArray('fishOffsets'),
+                                        config if metadata['regenerateFish'] else None)
+    if metadata.get('fishHistograms') is not None:
+        resultStore.fishHistograms = FishHistograms.FromState(
+            metadata['fishHistograms'], [loadArray('fishHistogram_' + str(column))
+                                         for column in range(len(metadata['fishHistograms']))])
+
+    fields = metadata['simulation']
+    simulation = SimulationParameters(fields.get('numberTrials', len(resultStore)), fields.get('estimatedPopulation'),
+                                      fields.get('actualPopulation'), resultStore)
+    for name, value in fields.items():
+        setattr(simulation, name, value)
+    simulation.SetConfig(config)
+    if metadata['statistics'] is not None:
+        simulation.SetStatistics(StreamingStatistics.FromState(metadata['statistics'],
+                                                               loadArray('statisticsHistogram')))
+    return simulation
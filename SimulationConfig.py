@@ -0,0 +1,194 @@
+#################################################################################
+# Simulation Config Class
+# Frozen snapshot of every parameter of one simulation run. It is captured once
+# from the widgets (or read from a scenario file) and is the only input of the
+# simulation engine, so runs share no state and can be sent to worker processes.
+#################################################################################
+import dataclasses
+import numbers
+
+import numpy as np
+
+from SimulationKernel import subReachBoundary, POPULATION_CLOSED, POPULATION_OPEN, CAPTURE_EQUAL, CAPTURE_VARY, \
+    CAPTURE_RANDOM, SUBREACH_VARIED, SUBREACH_NONE, ENGINE_PER_TRIAL, ENGINE_BATCHED, ENGINE_ESTIMATES_ONLY, \
+    PRECISION_FIXED, PRECISION_RELATIVE_SE, PRECISION_MEDIAN_CI, PRECISION_TIME, RETENTION_FULL, RETENTION_LAZY
+
+# Option names accepted in scenario files, next to the option ids
+OPTION_NAMES = {
+    'populationType': {'closed': POPULATION_CLOSED, 'open': POPULATION_OPEN},
+    'captureMode': {'equal': CAPTURE_EQUAL, 'vary': CAPTURE_VARY, 'random': CAPTURE_RANDOM},
+    'subReachMode': {'none': SUBREACH_NONE, 'varied': SUBREACH_VARIED},
+    'engine': {'per-trial': ENGINE_PER_TRIAL, 'batched': ENGINE_BATCHED, 'estimates-only': ENGINE_ESTIMATES_ONLY},
+    'precisionMode': {'fixed': PRECISION_FIXED, 'relative-se': PRECISION_RELATIVE_SE, 'median-ci': PRECISION_MEDIAN_CI,
+                      'time': PRECISION_TIME},
+    'fishRetention': {'full': RETENTION_FULL, 'lazy': RETENTION_LAZY},
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class SimulationConfig:
+    populationType: int = POPULATION_CLOSED
+    populationSize: int = 100
+    captureMode: int = CAPTURE_EQUAL
+    captureProbOne: float = 0.5
+    captureProbTwo: float = 0.5
+    tagLoss: bool = False
+    tagLossRate: float = 0.0
+    subReachMode: int = SUBREACH_NONE
+    subReachFraction: float = 0.5
+    mortalityRate: float = 0.0
+    migrationDistance: float = 0.5
+    migrationRate: float = 0.5
+    numTrials: int = 1
+    seed: int = 1
+    engine: int = ENGINE_BATCHED
+    # Adaptive runs: numTrials is the most trials run, precisionTarget is the relative standard error
+    # of the mean, the 95% CI half-width of the median (fish) or the time budget (seconds)
+    precisionMode: int = PRECISION_FIXED
+    precisionTarget: float = 0.0
+    # Lazy retention keeps the pass counts of every trial, its fish are simulated again on demand
+    fishRetention: int = RETENTION_LAZY
+
+    #################################################################################
+    # LOWER AND UPPER BOUNDARY OF THE STUDY REACH
+    #################################################################################
+    @property
+    def lowerBound(self):
+        return subReachBoundary(self.subReachFraction)[0]
+
+    @property
+    def upperBound(self):
+        return subReachBoundary(self.subReachFraction)[1]
+
+    #################################################################################
+    # ARGUMENTS OF THE CLOSED POPULATION KERNELS, IN ORDER
+    #################################################################################
+    def GetKernelArguments(self):
+        return (self.populationSize, self.captureMode, self.captureProbOne, self.captureProbTwo, self.tagLoss,
+                self.tagLossRate, self.subReachMode, self.lowerBound, self.upperBound, self.subReachFraction)
+
+    #################################################################################
+    # ARGUMENTS OF THE OPEN POPULATION KERNEL, IN ORDER
+    #################################################################################
+    def GetOpenKernelArguments(self):
+        return self.GetKernelArguments() + (self.mortalityRate, self.migrationDistance, self.migrationRate)
+
+    #################################################################################
+    # BUILD FROM A DICT OF PARAMETERS (SCENARIO FILES)
+    #################################################################################
+    @classmethod
+    def FromDict(cls, parameters):
+        '''
+        Config from a dict keyed by field name. Options may be given by id or by name (see OPTION_NAMES),
+        missing fields keep their defaults. Every value must match the type of its field (see
+        checkFieldValue). Raises ValueError, naming the field, on unknown fields, option names or
+        values of the wrong type.
+        '''
+        fields = {field.name: field.type for field in dataclasses.fields(cls)}
+        values = {}
+        for name, value in parameters.items():
+            if name not in fields:
+                raise ValueError("Unknown simulation parameter: " + str(name) + ", expected one of "
+                                 + ", ".join(fields))
+            if name in OPTION_NAMES and isinstance(value, str):
+                if value.lower() not in OPTION_NAMES[name]:
+                    raise ValueError("Unknown " + name + ": " + value + ", expected one of "
+                                     + ", ".join(OPTION_NAMES[name]))
+                value = OPTION_NAMES[name][value.lower()]
+            values[name] = checkFieldValue(name, fields[name], value)
+        return cls(**values)
+
+    #################################################################################
+    # PARAMETERS AS A DICT, OPTIONS BY NAME
+    #################################################################################
+    def ToDict(self):
+        parameters = dataclasses.asdict(self)
+        for name, options in OPTION_NAMES.items():
+            parameters[name] = next(option for option, value in options.items() if value == parameters[name])
+        return parameters
+
+    #################################################################################
+    # COPY WITH SOME PARAMETERS CHANGED
+    #################################################################################
+    def Replace(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+    #################################################################################
+    # PARAMETER DESCRIPTIONS FOR THE PARAMETER SUMMARY
+    #################################################################################
+    def GetPopulationTypeText(self):
+        if self.populationType == POPULATION_OPEN:
+            return "Open Population"
+        return "Closed Population"
+
+    def GetCaptureProbabilityText(self):
+        if self.captureMode == CAPTURE_VARY:
+            return 'Capture probability for first pass: q = ' + str(self.captureProbOne) \
+                   + 'Capture probability for second pass: q = ' + str(self.captureProbTwo)
+        if self.captureMode == CAPTURE_RANDOM:
+            return 'Capture Probability: Completely random'
+        return 'Capture Probability q = ' + str(self.captureProbOne)
+
+    def GetCaptureProbabilityTypeText(self):
+        if self.captureMode == CAPTURE_VARY:
+            return "Capture probability varying per sample."
+        if self.captureMode == CAPTURE_RANDOM:
+            return "Capture Probability: Completely random per fish"
+        return "Equal capture probability for all samples"
+
+    def GetTagLossText(self):
+        if self.tagLoss:
+            return "Possible tag loss at " + str(self.tagLossRate * 100) + "%"
+        return "No Tag Loss"
+
+    def GetSubReachText(self):
+        if self.subReachMode == SUBREACH_VARIED:
+            return "Varied Subreach Size: " + str(round(self.subReachFraction * 100)) + "% of subreach. " \
+                   + " L-bound:" + str(self.lowerBound) + ". H-bound: " + str(self.upperBound)
+        return "No Subreach Parameter"
+
+    def GetMigrationText(self):
+        if self.populationType == POPULATION_OPEN:
+            return 'Migration Rate: ' + str(self.migrationRate) + '\nMigration Distance: ' + str(self.migrationDistance)
+        return "Migration Distance/Rate: None"
+
+    def GetPrecisionText(self):
+        if self.precisionMode == PRECISION_RELATIVE_SE:
+            target = "Target relative standard error of the mean: " + str(self.precisionTarget)
+        elif self.precisionMode == PRECISION_MEDIAN_CI:
+            target = "Target 95% CI half-width of the median: " + str(self.precisionTarget)
+        elif self.precisionMode == PRECISION_TIME:
+            target = "Time budget: " + str(self.precisionTarget) + " s"
+        else:
+            return "Fixed number of trials"
+        return target + ", at most " + str(self.numTrials) + " trials"
+
+    #################################################################################
+    # PARAMETER STRING SAVED WITH THE SIMULATION
+    #################################################################################
+    def GetParameterString(self):
+        return self.GetPopulationTypeText() + "\n" + self.GetCaptureProbabilityText() + "\n" \
+               + self.GetCaptureProbabilityTypeText() + "\n" + self.GetTagLossText() + "\n" + self.GetSubReachText() \
+               + "\n" + self.GetMigrationText() + "\n" + self.GetPrecisionText() + "\nSeed: " + str(self.seed)
+
+
+#################################################################################
+# Value of a config field read from a dict, checked against the field's type
+#################################################################################
+def checkFieldValue(name, fieldType, value):
+    '''
+    Booleans must be true or false (not 1, "false", ...), integers must be whole numbers (2.0 is 2,
+    2.7 is an error) and floats any number; booleans are not numbers. Returns the value as
+    fieldType, raises ValueError naming the field otherwise.
+    '''
+    if fieldType is bool:
+        if not isinstance(value, (bool, np.bool_)):
+            raise ValueError(name + ": expected true or false, got " + repr(value))
+        return bool(value)
+    if isinstance(value, (bool, np.bool_)) or not isinstance(value, numbers.Real):
+        raise ValueError(name + ": expected a number, got " + repr(value))
+    if fieldType is int:
+        if not float(value).is_integer():
+            raise ValueError(name + ": expected a whole number, got " + repr(value))
+        return int(value)
+    return float(value)
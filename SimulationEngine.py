@@ -0,0 +1,446 @@
+#################################################################################
+# Simulation Engine
+# Runs simulation trials in this process or across worker processes. It only
+# takes a SimulationConfig, imports nothing from Qt and keeps no global state
+# (apart from the stop event a worker process is started with), so the GUI,
+# worker processes and scripts all share the same kernel.
+#################################################################################
+import concurrent.futures
+import dataclasses
+import itertools
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from SimulationResultStore import SimulationResultStore
+from StreamingStatistics import StreamingStatistics
+from SimulationKernel import simulateClosedBatch, simulateOpenTrial, simulateClosedCounts, chapmanEstimate, \
+    trialGenerator, trialGenerators, countGenerator, batchTrialsForBudget, POPULATION_OPEN, \
+    RETENTION_LAZY, \
+    ENGINE_BATCHED, ENGINE_ESTIMATES_ONLY, COUNT_BATCH_TRIALS, PRECISION_FIXED, PRECISION_MEDIAN_CI, \
+    PRECISION_TIME
+
+# Chunks submitted per worker, so faster workers pick up the remaining work
+CHUNKS_PER_WORKER = 4
+
+# Most fish in a closed population batch of a worker: workers check the stop event
+# between batches, so a batch stays a fraction of a second long
+WORKER_BATCH_FISH = 2 ** 20
+
+# Adaptive runs: trials before the first precision check, growth of the trial
+# count between checks, and the largest chunk sent to a worker
+ADAPTIVE_MIN_TRIALS = 100
+ADAPTIVE_CHECK_GROWTH = 1.25
+ADAPTIVE_CHUNK_TRIALS = 250
+
+# Starting histogram range of the estimate statistics, in multiples of the fish in the reach
+ESTIMATE_RANGE_FACTOR = 4
+
+# Least time between two progress events of a run, in seconds
+PROGRESS_INTERVAL = 0.25
+
+# Normal quantile of the 95% confidence intervals
+CONFIDENCE_Z = 1.959963984540054
+
+# Statistics of StreamingStatistics.GetSummary, in table order
+SUMMARY_STATISTICS = ('mean', 'median', 'firstQuart', 'secondQuart', 'thirdQuart', 'fourthQuart', 'skew',
+                      'standardDeviation', 'bias', 'rmse')
+
+# Stop event of a worker process of runTrialsParallel, set by the parent to stop the run
+workerStopEvent = None
+
+
+#################################################################################
+# Run a chunk of trials, in this process or in a worker process
+#################################################################################
+def simulateTrialChunk(config, firstTrial, chunkTrials, batchTrials=None, keepResults=True, shouldStop=None):
+    '''
+    Simulate trials firstTrial to firstTrial + chunkTrials - 1 of config.
+
+    Every trial draws from its own stream of the master seed config.seed, so the results do not
+    depend on how the trials are split into chunks. Closed population trials run batchTrials at a
+    time (default: as many as fit the memory budget). Returns (firstTrial, estimates, resultStore)
+    with one estimate per trial and the SimulationResultStore of the chunk, None unless
+    keepResults. With lazy fish retention the store keeps only the pass counts and regenerates the
+    fish of a trial from its stream when asked. When shouldStop() returns True, checked before every
+    trial (open population) or batch (closed population), the chunk ends with the trials completed.
+    '''
+    lazyFish = config.fishRetention == RETENTION_LAZY
+    trialIndex = np.arange(firstTrial, firstTrial + chunkTrials)
+    if config.populationType == POPULATION_OPEN:
+        trials = []
+        for index in trialIndex:
+            if shouldStop is not None and shouldStop():
+                break
+            trials.append(simulateOpenTrial(trialGenerator(config.seed, index), *config.GetOpenKernelArguments()))
+        if not trials:
+            return firstTrial, np.array([]), SimulationResultStore.Concatenate([]) if keepResults else None
+        trialIndex = trialIndex[:len(trials)]
+        firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishPopulations = zip(*trials)
+        estimates = chapmanEstimate(np.array(firstPassMarkedFishes), np.array(secondPassFishes),
+                                    np.array(recapturedTaggedFish))
+        if not keepResults:
+            return firstTrial, estimates, None
+        return firstTrial, estimates, SimulationResultStore.FromPopulations(
+            trialIndex, estimates, firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish,
+            None if lazyFish else fishPopulations, config if lazyFish else None)
+
+    # Closed population chunks run in batches that fit the memory budget
+    batchEstimates = []
+    stores = []
+    batchTrials = batchTrials or batchTrialsForBudget(config.populationSize)
+    for batchStart in range(0, chunkTrials, batchTrials):
+        if shouldStop is not None and shouldStop():
+            break
+        batchIndex = trialIndex[batchStart:batchStart + batchTrials]
+        firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishColumns = \
+            simulateClosedBatch(trialGenerators(config.seed, batchIndex[0], len(batchIndex)), *config.GetKernelArguments())
+        batchEstimates.append(chapmanEstimate(firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish))
+        if keepResults:
+            stores.append(SimulationResultStore.FromBatch(
+                batchIndex, batchEstimates[-1], firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish,
+                None if lazyFish else fishColumns, config if lazyFish else None))
+    estimates = np.concatenate(batchEstimates) if batchEstimates else np.array([])
+    return firstTrial, estimates, SimulationResultStore.Concatenate(stores) if keepResults else None
+
+
+#################################################################################
+# Estimates of a block of closed population trials, counts only
+#################################################################################
+def simulateCountBlock(config, blockIndex, keepResults=True, shouldStop=None):
+    '''
+    The pass counts are kept in the SimulationResultStore when keepResults, there are no fish. The
+    block is one vectorized batch, it is skipped (no trials) when shouldStop() returns True.
+    '''
+    firstTrial = blockIndex * COUNT_BATCH_TRIALS
+    if shouldStop is not None and shouldStop():
+        return firstTrial, np.array([]), SimulationResultStore.Concatenate([]) if keepResults else None
+    blockTrials = min(COUNT_BATCH_TRIALS, config.numTrials - firstTrial)
+    counts = simulateClosedCounts(countGenerator(config.seed, blockIndex), blockTrials, *config.GetKernelArguments())
+    estimates = chapmanEstimate(*counts)
+    if not keepResults:
+        return firstTrial, estimates, None
+    return firstTrial, estimates, SimulationResultStore(np.arange(firstTrial, firstTrial + blockTrials), estimates, *counts)
+
+
+#################################################################################
+# Empty accumulator for the estimates of a run
+#################################################################################
+def estimateStatistics(config):
+    '''
+    StreamingStatistics whose histogram starts on 0 to ESTIMATE_RANGE_FACTOR times the fish in the
+    reach (three areas of populationSize fish in an open population), so every accumulator of a run
+    starts with the same bins and they merge. The bins widen for larger estimates, e.g. under heavy
+    tag loss.
+    '''
+    reachFish = config.populationSize * (3 if config.populationType == POPULATION_OPEN else 1)
+    return StreamingStatistics(0, ESTIMATE_RANGE_FACTOR * max(reachFish, 1))
+
+
+#################################################################################
+# Precision reached by the estimates of a run
+#################################################################################
+def measurePrecision(config, statistics):
+    '''
+    From the StreamingStatistics of the estimates: the 95% CI half-width of the median (in fish) in
+    median CI mode, otherwise the relative standard error of the mean estimate. NaN when there are
+    too few estimates.
+    '''
+    count = statistics.GetCount()
+    if count < 2:
+        return np.nan
+    if config.precisionMode == PRECISION_MEDIAN_CI:
+        # Distribution free interval between two order statistics
+        spread = CONFIDENCE_Z * np.sqrt(count) / 2
+        lower = max(np.floor(count / 2 - spread), 0)
+        upper = min(np.ceil(count / 2 + spread), count - 1)
+        return (statistics.GetQuantile(upper / (count - 1)) - statistics.GetQuantile(lower / (count - 1))) / 2
+    return np.sqrt(statistics.GetSampleVariance() / count) / abs(statistics.GetMean())
+
+
+#################################################################################
+# Adaptive runs: has the target precision or time budget been reached?
+#################################################################################
+class PrecisionCheck:
+    '''
+    Tracks an adaptive run. Reached(statistics) is called as trials complete, with the statistics of
+    the first trials. The time budget is checked every call, the precision only once
+    ADAPTIVE_MIN_TRIALS trials have run and then each time the trial count grows by
+    ADAPTIVE_CHECK_GROWTH.
+    '''
+
+    def __init__(self, config):
+        self.config = config
+        self.startTime = time.time()
+        self.nextCheck = ADAPTIVE_MIN_TRIALS
+
+    def Reached(self, statistics):
+        if self.config.precisionMode == PRECISION_FIXED:
+            return False
+        if self.config.precisionMode == PRECISION_TIME:
+            return time.time() - self.startTime >= self.config.precisionTarget
+        if statistics.GetCount() < self.nextCheck:
+            return False
+        self.nextCheck = statistics.GetCount() * ADAPTIVE_CHECK_GROWTH
+        return measurePrecision(self.config, statistics) <= self.config.precisionTarget
+
+
+#################################################################################
+# Progress of a run: trials completed, throughput and time left
+#################################################################################
+@dataclasses.dataclass
+class RunProgress:
+    trialsCompleted: int
+    trials: int
+    fishPerTrial: int
+    seconds: float
+
+    def GetPercent(self):
+        return min(100, int(self.trialsCompleted * 100 / max(self.trials, 1)))
+
+    def GetTrialsPerSecond(self):
+        return self.trialsCompleted / self.seconds if self.seconds > 0 else 0.0
+
+    def GetFishPerSecond(self):
+        return self.GetTrialsPerSecond() * self.fishPerTrial
+
+    def GetSecondsRemaining(self):
+        # Up to config.numTrials, adaptive runs may stop sooner
+        if self.trialsCompleted == 0:
+            return None
+        return max(0.0, self.seconds * (self.trials - self.trialsCompleted) / self.trialsCompleted)
+
+    def GetText(self):
+        text = "Trials: " + str(self.trialsCompleted) + "/" + str(self.trials) \
+               + "   " + str('{number:.{digits}f}'.format(number=self.GetTrialsPerSecond(), digits=1)) + " trials/s" \
+               + "   " + str('{number:.{digits}f}'.format(number=self.GetFishPerSecond() / 1e6, digits=2)) + " M fish/s"
+        remaining = self.GetSecondsRemaining()
+        if remaining is not None and self.trialsCompleted < self.trials:
+            text += "   ETA: " + str(int(round(remaining))) + " s"
+        return text
+
+
+#################################################################################
+# PROGRESS METER: THROTTLED PROGRESS EVENTS OF A RUN
+#################################################################################
+class ProgressMeter:
+    '''
+    Calls progressCallback(RunProgress, statistics) as trials complete, at most every
+    PROGRESS_INTERVAL seconds apart, and always for the last report of the run (final).
+    '''
+
+    def __init__(self, config, progressCallback):
+        self.progressCallback = progressCallback
+        self.trials = config.numTrials
+        # Fish simulated per trial: populationSize per area, three areas in an open population
+        self.fishPerTrial = config.populationSize * (3 if config.populationType == POPULATION_OPEN else 1)
+        self.startTime = time.time()
+        self.lastReport = None
+
+    def Report(self, trialsCompleted, statistics, final=False):
+        if self.progressCallback is None:
+            return
+        now = time.time()
+        if not final and self.lastReport is not None and now - self.lastReport < PROGRESS_INTERVAL:
+            return
+        self.lastReport = now
+        self.progressCallback(RunProgress(trialsCompleted, self.trials, self.fishPerTrial, now - self.startTime),
+                              statistics)
+
+
+#################################################################################
+# Run one task (chunk of trials or count block) and summarize its estimates
+#################################################################################
+def simulateTask(task, keepEstimates):
+    firstTrial, estimates, resultStore = task[0](*task[1:], shouldStop=workerStopRequested)
+    statistics = estimateStatistics(task[1])
+    statistics.Update(estimates)
+    return firstTrial, estimates if keepEstimates else estimates[:0], resultStore, statistics
+
+
+#################################################################################
+# Worker process initializer: keep the stop event of the run
+#################################################################################
+def setWorkerStopEvent(stopEvent):
+    global workerStopEvent
+    workerStopEvent = stopEvent
+
+
+#################################################################################
+# Worker process: the parent has set the stop event of the pool
+#################################################################################
+def workerStopRequested():
+    return workerStopEvent is not None and workerStopEvent.is_set()
+
+
+#################################################################################
+# Run all trials in this process
+#################################################################################
+def runTrials(config, progressCallback=None, shouldStop=None, keepResults=True, keepEstimates=True):
+    '''
+    Simulate the config.numTrials trials of config with its engine, one batch at a time.
+
+    progressCallback(RunProgress, statistics) is called as batches complete (see ProgressMeter) with
+    the running StreamingStatistics. The run ends early when shouldStop() returns True or, in an
+    adaptive run, when the precision target is reached. The SimulationResultStore holds no trials
+    unless keepResults and no fish in the estimates only engine (closed population); the estimates
+    array is empty unless keepEstimates, so memory does not grow with the trials. Returns (estimates
+    array, SimulationResultStore, StreamingStatistics of the estimates), in trial order.
+    '''
+    countsOnly = config.engine == ENGINE_ESTIMATES_ONLY and config.populationType != POPULATION_OPEN
+    if countsOnly:
+        stepTrials = COUNT_BATCH_TRIALS
+    elif config.engine == ENGINE_BATCHED:
+        stepTrials = batchTrialsForBudget(config.populationSize)
+    else:
+        stepTrials = 1
+
+    precisionCheck = PrecisionCheck(config)
+    progressMeter = ProgressMeter(config, progressCallback)
+    statistics = estimateStatistics(config)
+    estimates = []
+    stores = []
+    trialsCompleted = 0
+    while trialsCompleted < config.numTrials:
+        if shouldStop is not None and shouldStop():
+            break
+        if countsOnly:
+            firstTrial, blockEstimates, resultStore = simulateCountBlock(
+                config, trialsCompleted // COUNT_BATCH_TRIALS, keepResults)
+        else:
+            # Adaptive runs grow their batches with the run, so they stop close to the target
+            batchTrials = stepTrials
+            if config.precisionMode != PRECISION_FIXED:
+                batchTrials = min(stepTrials, max(ADAPTIVE_MIN_TRIALS, int(trialsCompleted * (ADAPTIVE_CHECK_GROWTH - 1))))
+            firstTrial, blockEstimates, resultStore = simulateTrialChunk(
+                config, trialsCompleted, min(batchTrials, config.numTrials - trialsCompleted), batchTrials, keepResults)
+        statistics.Update(blockEstimates)
+        if keepEstimates:
+            estimates.append(blockEstimates)
+        if keepResults:
+            stores.append(resultStore)
+        trialsCompleted = firstTrial + len(blockEstimates)
+        progressMeter.Report(trialsCompleted, statistics)
+        if precisionCheck.Reached(statistics):
+            break
+    progressMeter.Report(trialsCompleted, statistics, final=True)
+
+    return np.concatenate(estimates) if estimates else np.array([]), SimulationResultStore.Concatenate(stores), \
+        statistics
+
+
+#################################################################################
+# Run all trials on a process pool and gather the results in trial order
+#################################################################################
+def runTrialsParallel(config, workers=None, progressCallback=None, shouldStop=None, keepResults=True,
+                      keepEstimates=True):
+    '''
+    Simulate the config.numTrials trials of config in chunks across worker processes.
+
+    Every worker summarizes its chunk in a StreamingStatistics, merged here as chunks finish, and
+    progressCallback(RunProgress, statistics) is called with the merged statistics (see
+    ProgressMeter). shouldStop() is checked every PROGRESS_INTERVAL seconds. When it returns True
+    the pending chunks are cancelled and a shared stop event ends the running chunks after their
+    current batch; the run returns the completed trials from trial 0 up to the first one missing.
+    Adaptive runs submit small chunks a few at a time and check the precision on that same prefix of
+    completed chunks, which they return once the target is reached. keepResults and keepEstimates
+    are as in runTrials. Returns (estimates array, SimulationResultStore, StreamingStatistics of the
+    estimates), in trial order.
+    '''
+    numTrials = config.numTrials
+    workers = workers or os.cpu_count() or 1
+    adaptive = config.precisionMode != PRECISION_FIXED
+    chunkTrials = max(1, -(-numTrials // (workers * CHUNKS_PER_WORKER)))
+
+    if config.engine == ENGINE_ESTIMATES_ONLY and config.populationType != POPULATION_OPEN:
+        # Counts only: one task per block, as the blocks are the unit of the random streams
+        tasks = ((simulateCountBlock, config, blockIndex, keepResults)
+                 for blockIndex in range(-(-numTrials // COUNT_BATCH_TRIALS)))
+    else:
+        if adaptive:
+            chunkTrials = min(chunkTrials, ADAPTIVE_CHUNK_TRIALS)
+        batchTrials = min(batchTrialsForBudget(config.populationSize),
+                          max(1, WORKER_BATCH_FISH // max(config.populationSize, 1)))
+        tasks = ((simulateTrialChunk, config, firstTrial, min(chunkTrials, numTrials - firstTrial), batchTrials,
+                  keepResults)
+                 for firstTrial in range(0, numTrials, chunkTrials))
+
+    # Completed chunks by first trial: (estimates, resultStore, trials, statistics)
+    chunks = {}
+    statistics = estimateStatistics(config)
+    prefixStatistics = estimateStatistics(config)
+    prefixTrials = 0
+    precisionCheck = PrecisionCheck(config)
+    progressMeter = ProgressMeter(config, progressCallback)
+    stopEvent = multiprocessing.Event()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=setWorkerStopEvent,
+                                                initargs=(stopEvent,)) as executor:
+        pending = set()
+
+        def submitTasks(count):
+            for task in itertools.islice(tasks, count):
+                pending.add(executor.submit(simulateTask, task, keepEstimates))
+
+        def addChunks(futures):
+            for future in futures:
+                firstTrial, estimates, resultStore, chunkStatistics = future.result()
+                # Chunks stopped before their first batch have no trials
+                if chunkStatistics.GetCount():
+                    chunks[firstTrial] = (estimates, resultStore, chunkStatistics.GetCount(), chunkStatistics)
+                    statistics.Merge(chunkStatistics)
+
+        submitTasks(2 * workers if adaptive else None)
+        while pending:
+            # Time out to check shouldStop while long chunks run
+            done, pending = concurrent.futures.wait(pending, timeout=PROGRESS_INTERVAL,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            addChunks(done)
+            progressMeter.Report(statistics.GetCount(), statistics)
+            if shouldStop is not None and shouldStop():
+                # Keep the trials the running chunks completed before they saw the stop event
+                stopEvent.set()
+                for future in pending:
+                    future.cancel()
+                addChunks([future for future in concurrent.futures.wait(pending)[0] if not future.cancelled()])
+                pending = set()
+                chunks, statistics = chunkPrefix(config, chunks)
+                break
+            if not done:
+                continue
+            if adaptive:
+                # Completed chunks from trial 0 on, up to the first missing chunk
+                while prefixTrials in chunks:
+                    prefixStatistics.Merge(chunks[prefixTrials][3])
+                    prefixTrials += chunks[prefixTrials][2]
+                if precisionCheck.Reached(prefixStatistics):
+                    chunks = {firstTrial: chunk for firstTrial, chunk in chunks.items() if firstTrial < prefixTrials}
+                    statistics = prefixStatistics
+                    # The running chunks are not needed, they end after their current batch
+                    stopEvent.set()
+                    break
+                submitTasks(len(done))
+        for future in pending:
+            future.cancel()
+    progressMeter.Report(statistics.GetCount(), statistics, final=True)
+
+    estimates = [chunks[firstTrial][0] for firstTrial in sorted(chunks)]
+    stores = [chunks[firstTrial][1] for firstTrial in sorted(chunks)] if keepResults else []
+    return np.concatenate(estimates) if estimates else np.array([]), SimulationResultStore.Concatenate(stores), \
+        statistics
+
+
+#################################################################################
+# Completed chunks from trial 0 on, up to the first missing trial, and their statistics
+#################################################################################
+def chunkPrefix(config, chunks):
+    prefix = {}
+    statistics = estimateStatistics(config)
+    firstTrial = 0
+    # A chunk stopped part way ends the prefix, the next chunk does not start where it ends
+    while firstTrial in chunks:
+        prefix[firstTrial] = chunks[firstTrial]
+        statistics.Merge(chunks[firstTrial][3])
+        firstTrial += chunks[firstTrial][2]
+    return prefix, statistics
@@ -0,0 +1,405 @@
+#################################################################################
+# Simulation Kernel
+# Vectorized mark-recapture trials: the fish population of a trial is held as
+# NumPy arrays (one entry per fish) instead of a list of Fish objects, and the
+# passes are computed with boolean masks.
+#################################################################################
+import functools
+
+import numpy as np
+from scipy.stats import beta
+
+from FishPopulation import FishPopulation, RECAUGHT_NONE, RECAUGHT_FIRST_PASS, RECAUGHT_NO_TAG, RECAUGHT_YES
+
+# Global Variables
+REACH_SIZE = 100
+BETA_DISTRIBUTION = 2.70
+
+# Population options (same ids as the populationOption button group)
+POPULATION_CLOSED = 1
+POPULATION_OPEN = 2
+
+# Capture probability options (same ids as the captureProbabilityOption button group)
+CAPTURE_EQUAL = 1
+CAPTURE_VARY = 2
+CAPTURE_RANDOM = 3
+
+# Subreach options (same ids as the subReachSizeOption button group)
+SUBREACH_NONE = 1
+SUBREACH_VARIED = 2
+
+# Simulation engines (same order as the simulationEngineInput combo box)
+ENGINE_PER_TRIAL = 0
+ENGINE_BATCHED = 1
+ENGINE_ESTIMATES_ONLY = 2
+
+# Run lengths (same order as the precisionModeInput combo box): a fixed number of
+# trials, or trials until a target precision or time budget is reached
+PRECISION_FIXED = 0
+PRECISION_RELATIVE_SE = 1
+PRECISION_MEDIAN_CI = 2
+PRECISION_TIME = 3
+
+# Fish data kept per trial (same order as the fishRetentionInput combo box): every
+# fish of every trial, or only the pass counts, with the fish of a trial simulated
+# again from its random stream when they are looked at
+RETENTION_FULL = 0
+RETENTION_LAZY = 1
+
+# Memory allowed for one (trials x fish) block in the batched engine, and the
+# approximate bytes used per fish per trial by the kernel's temporary arrays.
+BATCH_MEMORY_BUDGET = 256 * 1024 * 1024
+BYTES_PER_FISH_TRIAL = 64
+
+# Trials drawn per call in the estimates only engine. Each block of trials has
+# its own random stream, so this is also the size of a reproducible block.
+COUNT_BATCH_TRIALS = 65536
+
+# Random streams spawned from the master seed: one child per trial, and one
+# child per block of the estimates only engine
+TRIAL_STREAMS = 0
+COUNT_STREAMS = 1
+
+# Master seeds are kept below 2**31 so they fit the seed spin box
+MAX_SEED = 2 ** 31 - 1
+
+
+#################################################################################
+# New master seed, for runs where the user did not pick one
+#################################################################################
+def newMasterSeed():
+    return int(np.random.SeedSequence().generate_state(1)[0] % MAX_SEED) + 1
+
+
+#################################################################################
+# Random stream of one trial
+#################################################################################
+def trialGenerator(masterSeed, trialIndex):
+    '''
+    Generator of trial trialIndex of the run seeded with masterSeed.
+
+    The seed sequence is SeedSequence(masterSeed).spawn(2)[TRIAL_STREAMS].spawn(n)[trialIndex] for any
+    n > trialIndex, built from its spawn key so no earlier trial has to be spawned. A trial draws the
+    same numbers whichever worker, chunk or batch runs it.
+    '''
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(masterSeed,
+                                                                      spawn_key=(TRIAL_STREAMS, trialIndex))))
+
+
+#################################################################################
+# Random streams of consecutive trials
+#################################################################################
+def trialGenerators(masterSeed, firstTrial, numTrials):
+    return [trialGenerator(masterSeed, trialIndex) for trialIndex in range(firstTrial, firstTrial + numTrials)]
+
+
+#################################################################################
+# Random stream of one block of the estimates only engine
+#################################################################################
+def countGenerator(masterSeed, blockIndex):
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(masterSeed,
+                                                                      spawn_key=(COUNT_STREAMS, blockIndex))))
+
+
+#################################################################################
+# Uniform draws: from one Generator, or one row per Generator of a list
+#################################################################################
+def uniformDraws(rng, count):
+    if isinstance(rng, np.random.Generator):
+        return rng.random(count)
+    draws = np.empty((len(rng), count))
+    for row, generator in enumerate(rng):
+        generator.random(out=draws[row])
+    return draws
+
+
+#################################################################################
+# Integer draws in [low, high): from one Generator, or one row per Generator
+#################################################################################
+def integerDraws(rng, low, high, count):
+    if isinstance(rng, np.random.Generator):
+        return rng.integers(low, high, count)
+    draws = np.empty((len(rng), count), dtype=np.int64)
+    for row, generator in enumerate(rng):
+        draws[row] = generator.integers(low, high, count)
+    return draws
+
+
+#################################################################################
+# Lincoln Peterson (Chapman's) estimate, works on scalars or arrays
+#################################################################################
+def chapmanEstimate(firstPassMarked, secondPassCaught, recaptured):
+    return ((firstPassMarked + 1) * (secondPassCaught + 1)) / (recaptured + 1) - 1
+
+
+#################################################################################
+# Subreach Boundaries
+#################################################################################
+def subReachBoundary(subReachFraction):
+    size = REACH_SIZE * subReachFraction
+    return (REACH_SIZE / 2) - (size / 2), (REACH_SIZE / 2) + (size / 2)
+
+
+#################################################################################
+# Mask of the fish a pass can reach, given their positions
+#################################################################################
+def catchableMask(positions, subReachMode, lowerBound, upperBound, subReachFraction):
+    if subReachMode == SUBREACH_VARIED:
+        if subReachFraction <= 0:
+            return np.zeros(positions.shape, dtype=bool)
+        return (lowerBound <= positions) & (positions <= upperBound)
+    return np.ones(positions.shape, dtype=bool)
+
+
+#################################################################################
+# Capture draws of one pass: returns the caught mask and, when every fish has
+# its own random capture parameter, the drawn parameters.
+#################################################################################
+def capturePass(rng, qCatchValue, captureMode, captureProb):
+    if captureMode == CAPTURE_RANDOM:
+        parameterCapture = uniformDraws(rng, qCatchValue.shape[-1])
+        return qCatchValue <= parameterCapture, parameterCapture
+    return qCatchValue <= captureProb, None
+
+
+#################################################################################
+# Number of trials to run per batch so one (trials x fish) block stays in budget
+#################################################################################
+def batchTrialsForBudget(populationSize, memoryBudget=BATCH_MEMORY_BUDGET):
+    return max(1, int(memoryBudget // (BYTES_PER_FISH_TRIAL * max(populationSize, 1))))
+
+
+#################################################################################
+# A batch of closed population trials, one row per trial
+#################################################################################
+def simulateClosedBatch(generators, populationSize, captureMode, captureProbOne, captureProbTwo, tagLoss,
+                        tagLossRate, subReachMode, lowerBound, upperBound, subReachFraction):
+    '''
+    Run the first pass, tag loss and second pass of closed population trials at once, one trial per
+    Generator of generators (see trialGenerators).
+
+    Every per-fish array has shape (trials, populationSize) and row t only uses draws of
+    generators[t]. Returns (firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish,
+    fishColumns) where the counts are arrays with one entry per trial and fishColumns is a dict of
+    per-fish arrays named after the FishPopulation columns.
+    '''
+    shape = (len(generators), populationSize)
+
+    # Capture draws and initial location of every fish, range size: 0 to 100
+    qCatchValue = uniformDraws(generators, populationSize)
+    fishLocation = integerDraws(generators, 0, REACH_SIZE + 1, populationSize)
+    # Closed population: nobody moves, so both passes see the same fish
+    inStudyReach = catchableMask(fishLocation, subReachMode, lowerBound, upperBound, subReachFraction)
+
+    # ################################ FIRST PASS ################################ #
+    firstPassCaught, parameterCaptureOne = capturePass(generators, qCatchValue, captureMode, captureProbOne)
+    firstPassCaught &= inStudyReach
+    firstPassMarkedFishes = np.count_nonzero(firstPassCaught, axis=1)
+
+    # Fish that carry a tag into the second pass
+    tagged = firstPassCaught.copy()
+
+    # ################################ TAG LOSS ################################## #
+    tagLossValue = np.full(shape, -1.0)
+    if tagLoss:
+        for row, generator in enumerate(generators):
+            tagLossValue[row, firstPassCaught[row]] = generator.random(firstPassMarkedFishes[row])
+        tagged &= tagLossValue > tagLossRate
+
+    # ################################ SECOND PASS ############################### #
+    qCatchValueTwo = uniformDraws(generators, populationSize)
+    if captureMode == CAPTURE_VARY:
+        secondPassCaught, parameterCaptureTwo = capturePass(generators, qCatchValueTwo, captureMode, captureProbTwo)
+    else:
+        secondPassCaught, parameterCaptureTwo = capturePass(generators, qCatchValueTwo, captureMode, captureProbOne)
+    secondPassCaught &= inStudyReach
+    recaptured = secondPassCaught & tagged
+
+    secondPassFishes = np.count_nonzero(secondPassCaught, axis=1)
+    recapturedTaggedFish = np.count_nonzero(recaptured, axis=1)
+
+    # Recapture status of every fish
+    reCaught = np.full(shape, RECAUGHT_NONE, dtype=np.uint8)
+    reCaught[firstPassCaught] = RECAUGHT_FIRST_PASS
+    reCaught[secondPassCaught] = RECAUGHT_NO_TAG
+    reCaught[recaptured] = RECAUGHT_YES
+
+    fishColumns = {
+        'captureProbQ': qCatchValue,
+        'captureProbQTwo': qCatchValueTwo,
+        'tagged': tagged,
+        'tagLoss': tagLossValue,
+        'subReachPos': fishLocation,
+        'subReachPosTwo': fishLocation,
+        'mortality': np.ones(shape, dtype=bool),
+        'migrationDistance': np.full(shape, -1),
+        'reCaught': reCaught,
+        'parameterCaptureOne': parameterCaptureOne,
+        'parameterCaptureTwo': parameterCaptureTwo,
+    }
+    return firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishColumns
+
+
+#################################################################################
+# One closed population trial
+#################################################################################
+def simulateClosedTrial(rng, populationSize, captureMode, captureProbOne, captureProbTwo, tagLoss, tagLossRate,
+                        subReachMode, lowerBound, upperBound, subReachFraction):
+    '''
+    Run the first pass, tag loss and second pass of one closed population trial drawing from rng.
+
+    Returns (firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishPopulation).
+    '''
+    firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishColumns = \
+        simulateClosedBatch([rng], populationSize, captureMode, captureProbOne, captureProbTwo, tagLoss, tagLossRate,
+                            subReachMode, lowerBound, upperBound, subReachFraction)
+    return int(firstPassMarkedFishes[0]), int(secondPassFishes[0]), int(recapturedTaggedFish[0]), \
+        trialPopulation(fishColumns, 0)
+
+
+#################################################################################
+# Beta distribution lookup table used for fish movement, built once per size
+#################################################################################
+@functools.lru_cache(maxsize=16)
+def betaLookupTable(tableSize):
+    # https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.beta.html
+    betaX = np.linspace(0, 1, tableSize)
+    y1 = beta.pdf(betaX, BETA_DISTRIBUTION, BETA_DISTRIBUTION)
+    betaX.flags.writeable = False
+    y1.flags.writeable = False
+    return betaX, y1
+
+
+#################################################################################
+# Movement of every fish between the two passes of an open population
+#################################################################################
+def migrateFishes(rng, positions, migrationDistance, migrationRate, tableSize):
+    '''
+    Move every fish along the reach using the beta lookup table of tableSize points.
+
+    Table points are drawn without replacement (one permutation of the table per tableSize fish), the
+    migration skew decides the direction and the movement is capped at migrationDistance of the reach.
+    Returns (signed movement, position after the movement).
+    '''
+    betaX, y1 = betaLookupTable(tableSize)
+    count = len(positions)
+    blocks = -(-count // tableSize)
+    point = np.concatenate([rng.permutation(tableSize) for b in range(blocks)])[:count]
+
+    if migrationDistance > 0:
+        highBoundMovementRange = REACH_SIZE * migrationDistance
+        newLocation = y1[point] + REACH_SIZE * migrationDistance - (BETA_DISTRIBUTION / 2)
+        fishMove = np.minimum(newLocation, highBoundMovementRange)
+    else:
+        fishMove = np.zeros(count)
+
+    # Skewed downstream (negative) or upstream (positive):
+    correction = migrationRate - 0.5
+    fishMove = np.where(betaX[point] + correction < 0, -fishMove, fishMove)
+    return fishMove, positions + fishMove
+
+
+#################################################################################
+# One open population trial
+#################################################################################
+def simulateOpenTrial(rng, populationSize, captureMode, captureProbOne, captureProbTwo, tagLoss, tagLossRate,
+                      subReachMode, lowerBound, upperBound, subReachFraction, mortalityRate, migrationDistance,
+                      migrationRate):
+    '''
+    Run the first pass, tag loss, mortality, migration and second pass of one open population trial,
+    drawing from rng.
+
+    The reach holds populationSize fish in each of the downstream, central and upstream areas.
+    Returns (firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish, fishPopulation).
+    '''
+    totalFish = populationSize * 3
+
+    # Range size - 100 to 200, [-inf, 0) is out of bounds, [0, 100] is the study reach default, [101, to inf) is out of bounds
+    # First 1/3 of area: D (downstream),  Second 1/3 of area: C (central), Third 1/3 of area: U (upstream)
+    qCatchValue = rng.random(totalFish)
+    fishLocation = np.concatenate((rng.integers(-REACH_SIZE, 1, populationSize),
+                                   rng.integers(1, REACH_SIZE + 1, populationSize),
+                                   rng.integers(REACH_SIZE + 1, REACH_SIZE * 2, populationSize)))
+
+    # ################################ FIRST PASS ################################ #
+    firstPassCaught, parameterCaptureOne = capturePass(rng, qCatchValue, captureMode, captureProbOne)
+    firstPassCaught &= catchableMask(fishLocation, subReachMode, lowerBound, upperBound, subReachFraction)
+    firstPassMarkedFishes = np.count_nonzero(firstPassCaught)
+    tagged = firstPassCaught.copy()
+
+    # ################################ TAG LOSS ################################## #
+    tagLossValue = np.full(totalFish, -1.0)
+    if tagLoss:
+        tagLossValue[firstPassCaught] = rng.random(firstPassMarkedFishes)
+        tagged &= tagLossValue > tagLossRate
+
+    # ######################### MORTALITY AND MOVEMENT ########################### #
+    alive = rng.random(totalFish) > mortalityRate
+    fishMove, fishLocationTwo = migrateFishes(rng, fishLocation, migrationDistance, migrationRate, populationSize)
+
+    # ################################ SECOND PASS ############################### #
+    qCatchValueTwo = rng.random(totalFish)
+    if captureMode == CAPTURE_VARY:
+        secondPassCaught, parameterCaptureTwo = capturePass(rng, qCatchValueTwo, captureMode, captureProbTwo)
+    else:
+        secondPassCaught, parameterCaptureTwo = capturePass(rng, qCatchValueTwo, captureMode, captureProbOne)
+    # Can't capture a dead fish, or one that left the study reach:
+    secondPassCaught &= alive & catchableMask(fishLocationTwo, subReachMode, lowerBound, upperBound, subReachFraction)
+    recaptured = secondPassCaught & tagged
+
+    # Recapture status of every fish
+    reCaught = np.full(totalFish, RECAUGHT_NONE, dtype=np.uint8)
+    reCaught[firstPassCaught] = RECAUGHT_FIRST_PASS
+    reCaught[secondPassCaught] = RECAUGHT_NO_TAG
+    reCaught[recaptured] = RECAUGHT_YES
+
+    fishPopulation = FishPopulation(qCatchValue, qCatchValueTwo, tagged, tagLossValue, fishLocation, fishLocationTwo,
+                                    alive, fishMove, reCaught, parameterCaptureOne, parameterCaptureTwo)
+    return firstPassMarkedFishes, np.count_nonzero(secondPassCaught), np.count_nonzero(recaptured), fishPopulation
+
+
+#################################################################################
+# Closed population trials without per-fish state: counts only
+#################################################################################
+def simulateClosedCounts(rng, numTrials, populationSize, captureMode, captureProbOne, captureProbTwo, tagLoss,
+                         tagLossRate, subReachMode, lowerBound, upperBound, subReachFraction):
+    '''
+    Draw the pass counts of numTrials closed population trials straight from binomial distributions,
+    using rng (see countGenerator).
+
+    Every fish of a closed population is caught independently in each pass, so the counts have the
+    same distribution as in simulateClosedBatch without building any per-fish array. In random per
+    fish mode a fish is caught when one uniform draw is below another, i.e. with probability 0.5.
+    Returns (firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish), one entry per trial.
+    '''
+    # Fish inside the study reach, positions are uniform on the integers 0 to 100
+    if subReachMode == SUBREACH_VARIED:
+        positions = np.arange(0, REACH_SIZE + 1)
+        inReach = np.count_nonzero(catchableMask(positions, subReachMode, lowerBound, upperBound, subReachFraction))
+        inStudyReach = rng.binomial(populationSize, inReach / len(positions), numTrials)
+    else:
+        inStudyReach = np.full(numTrials, populationSize)
+
+    # Capture probability of each pass
+    if captureMode == CAPTURE_RANDOM:
+        captureProbOne = captureProbTwo = 0.5
+    elif captureMode != CAPTURE_VARY:
+        captureProbTwo = captureProbOne
+
+    # First pass and tag loss
+    firstPassMarkedFishes = rng.binomial(inStudyReach, captureProbOne)
+    taggedFish = firstPassMarkedFishes
+    if tagLoss:
+        taggedFish = firstPassMarkedFishes - rng.binomial(firstPassMarkedFishes, tagLossRate)
+
+    # Second pass: tagged and untagged fish are caught independently
+    recapturedTaggedFish = rng.binomial(taggedFish, captureProbTwo)
+    secondPassFishes = recapturedTaggedFish + rng.binomial(inStudyReach - taggedFish, captureProbTwo)
+    return firstPassMarkedFishes, secondPassFishes, recapturedTaggedFish
+
+
+#################################################################################
+# Fish population of one row (trial) of a batch
+#################################################################################
+def trialPopulation(fishColumns, row):
+    return FishPopulation(**{name: None if column is None else column[row] for name, column in fishColumns.items()})
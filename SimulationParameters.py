@@ -1,7 +1,7 @@
 #################################################################################
 # Simulation Parameters Class
 #################################################################################
-from Fish import Fish
+from StreamingStatistics import StreamingStatistics
 
 
 class SimulationParameters:
@@ -10,6 +10,11 @@ class SimulationParameters:
     estimatedPopulation: float
     actualPopulation: int
     testData = []
+    statistics: StreamingStatistics
+    config: object
+    seed: int
+    precision: float
+    partial: bool
     median: float
     skew: float
     firstQuart: float
@@ -46,6 +51,11 @@ class SimulationParameters:
         self.estimatedPopulation = estimatedPopulation
         self.actualPopulation = actualPopulation
         self.testData = testData
+        self.statistics = None
+        self.config = None
+        self.seed = -1
+        self.precision = -1
+        self.partial = False
         self.parameters = ''
         self.paramBoundsApply = -1
         self.paramCaptureCategory = -1
@@ -80,6 +90,36 @@ class SimulationParameters:
     def SetActualEstimatedPopulation(self, testData):
         self.testData = testData
 
+    #################################################################################
+    # SETTER FOR THE STREAMING STATISTICS OF THE ESTIMATES
+    #################################################################################
+    def SetStatistics(self, statistics):
+        self.statistics = statistics
+
+    #################################################################################
+    # SETTER FOR THE SIMULATION CONFIG OF THE RUN
+    #################################################################################
+    def SetConfig(self, config):
+        self.config = config
+
+    #################################################################################
+    # SETTER FOR THE MASTER SEED OF THE RANDOM STREAMS
+    #################################################################################
+    def SetSeed(self, seed):
+        self.seed = seed
+
+    #################################################################################
+    # SETTER FOR THE PRECISION REACHED (RELATIVE SE OF THE MEAN OR MEDIAN CI HALF-WIDTH)
+    #################################################################################
+    def SetPrecision(self, precision):
+        self.precision = precision
+
+    #################################################################################
+    # SETTER FOR A PARTIAL RESULT (RUN STOPPED BEFORE ALL ITS TRIALS WERE DONE)
+    #################################################################################
+    def SetPartial(self, partial):
+        self.partial = partial
+
     #################################################################################
     # Setter FOR Median
     #################################################################################
@@ -188,6 +228,42 @@ class SimulationParameters:
     def GetTestData(self):
         return self.testData
 
+    #################################################################################
+    # GETTER FOR THE ESTIMATE OF EVERY TRIAL, FROM THE TRIAL COLUMNS OF THE TEST DATA
+    #################################################################################
+    def GetEstimates(self):
+        return self.GetTestData().estimate
+
+    #################################################################################
+    # GETTER FOR THE STREAMING STATISTICS OF THE ESTIMATES
+    #################################################################################
+    def GetStatistics(self):
+        return self.statistics
+
+    #################################################################################
+    # GETTER FOR THE SIMULATION CONFIG OF THE RUN
+    #################################################################################
+    def GetConfig(self):
+        return self.config
+
+    #################################################################################
+    # GETTER FOR THE MASTER SEED OF THE RANDOM STREAMS
+    #################################################################################
+    def GetSeed(self):
+        return self.seed
+
+    #################################################################################
+    # GETTER FOR THE PRECISION REACHED (RELATIVE SE OF THE MEAN OR MEDIAN CI HALF-WIDTH)
+    #################################################################################
+    def GetPrecision(self):
+        return self.precision
+
+    #################################################################################
+    # GETTER FOR A PARTIAL RESULT (RUN STOPPED BEFORE ALL ITS TRIALS WERE DONE)
+    #################################################################################
+    def GetPartial(self):
+        return self.partial
+
     #################################################################################
     # GETTER FOR Median
     #################################################################################
@@ -0,0 +1,213 @@
+#################################################################################
+# Simulation Result Store Class
+# Columnar results of one simulation run. The trial columns (estimate and pass
+# counts) are contiguous arrays with one entry per trial. The fish columns hold
+# the fish of every trial concatenated, the fish of the trial in row r being
+# fishOffsets[r]:fishOffsets[r + 1] (compressed sparse row layout). Runs with
+# lazy fish retention keep no fish columns: the fish of a trial are simulated
+# again from its random stream when asked for. The histograms of the fish table
+# columns are counted over all the fish the first time they are asked for.
+#################################################################################
+import numpy as np
+
+from FishHistograms import FishHistograms
+from FishPopulation import FishPopulation, FISH_COLUMN_TYPES
+from SimulationKernel import simulateClosedTrial, simulateOpenTrial, trialGenerator, POPULATION_OPEN
+
+# Stored fish binned at a time when counting the fish histograms
+HISTOGRAM_BLOCK_FISH = 2 ** 20
+
+# Trial columns, in the order of the raw test data table
+TRIAL_COLUMNS = ('estimate', 'firstPassCaught', 'secondPassCaught', 'secondPassRecaught')
+TRIAL_TABLE_HEADERS = ('Est. Pop', 'First Pass Catch', 'Second Pass Catch', 'Recatch')
+
+
+#################################################################################
+# Simulate the fish of one trial again, from the trial's own random stream
+#################################################################################
+def regenerateFishPopulation(config, trialIndex):
+    rng = trialGenerator(config.seed, trialIndex)
+    if config.populationType == POPULATION_OPEN:
+        return simulateOpenTrial(rng, *config.GetOpenKernelArguments())[3]
+    return simulateClosedTrial(rng, *config.GetKernelArguments())[3]
+
+
+class SimulationResultStore:
+    trialIndex: np.ndarray
+    estimate: np.ndarray
+    firstPassCaught: np.ndarray
+    secondPassCaught: np.ndarray
+    secondPassRecaught: np.ndarray
+    fishOffsets: np.ndarray
+    fishColumns: dict
+    config: object
+    fishHistograms: object
+
+    #################################################################################
+    # RESULT STORE CONSTRUCTOR
+    # trialIndex: index of every trial in its run (its random stream); fishColumns:
+    # concatenated fish columns by FishPopulation name with fishOffsets, or None when
+    # no fish are kept; config: SimulationConfig to regenerate the fish from (lazy);
+    # fishHistograms: FishHistograms of all the fish of the trials, or None.
+    #################################################################################
+    def __init__(self, trialIndex, estimate, firstPassCaught, secondPassCaught, secondPassRecaught,
+                 fishColumns=None, fishOffsets=None, config=None, fishHistograms=None):
+        self.trialIndex = np.asarray(trialIndex, dtype=np.int64)
+        self.estimate = np.asarray(estimate, dtype=float)
+        self.firstPassCaught = np.asarray(firstPassCaught, dtype=np.int32)
+        self.secondPassCaught = np.asarray(secondPassCaught, dtype=np.int32)
+        self.secondPassRecaught = np.asarray(secondPassRecaught, dtype=np.int32)
+        self.fishColumns = fishColumns
+        self.fishOffsets = np.zeros(len(self.trialIndex) + 1, dtype=np.int64) if fishOffsets is None \
+            else np.asarray(fishOffsets, dtype=np.int64)
+        self.config = config
+        self.fishHistograms = fishHistograms
+
+    #################################################################################
+    # BUILD FROM A BATCH: FISH COLUMNS WITH ONE ROW PER TRIAL
+    #################################################################################
+    @classmethod
+    def FromBatch(cls, trialIndex, estimate, firstPassCaught, secondPassCaught, secondPassRecaught,
+                  fishColumns=None, config=None):
+        if fishColumns is None:
+            return cls(trialIndex, estimate, firstPassCaught, secondPassCaught, secondPassRecaught, config=config)
+        fishPerTrial = next(iter(fishColumns.values())).shape[1]
+        return cls(trialIndex, estimate, firstPassCaught, secondPassCaught, secondPassRecaught,
+                   {name: None if column is None else np.asarray(column, dtype=FISH_COLUMN_TYPES[name]).ravel()
+                    for name, column in fishColumns.items()},
+                   np.arange(len(trialIndex) + 1, dtype=np.int64) * fishPerTrial)
+
+    #################################################################################
+    # BUILD FROM ONE FISH POPULATION PER TRIAL
+    #################################################################################
+    @classmethod
+    def FromPopulations(cls, trialIndex, estimate, firstPassCaught, secondPassCaught, secondPassRecaught,
+                        populations=None, config=None):
+        if populations is None:
+            return cls(trialIndex, estimate, firstPassCaught, secondPassCaught, secondPassRecaught, config=config)
+        return cls(trialIndex, estimate, firstPassCaught, secondPassCaught, secondPassRecaught,
+                   concatenateColumns([vars(population) for population in populations]),
+                   np.concatenate(([0], np.cumsum([len(population) for population in populations]))))
+
+    #################################################################################
+    # JOIN STORES OF CONSECUTIVE CHUNKS, IN ORDER
+    #################################################################################
+    @classmethod
+    def Concatenate(cls, stores):
+        if not stores:
+            return cls([], [], [], [], [])
+        fishColumns = None
+        if all(store.fishColumns is not None for store in stores):
+            fishColumns = concatenateColumns([store.fishColumns for store in stores])
+        # Shift the offsets of every store past the fish of the stores before it
+        fishOffsets = [np.zeros(1, dtype=np.int64)]
+        fishBefore = 0
+        for store in stores:
+            fishOffsets.append(store.fishOffsets[1:] + fishBefore)
+            fishBefore += store.fishOffsets[-1]
+        return cls(*[np.concatenate([getattr(store, name) for store in stores]) for name in ('trialIndex',) + TRIAL_COLUMNS],
+                   fishColumns, np.concatenate(fishOffsets) if fishColumns is not None else None, stores[0].config)
+
+    #################################################################################
+    # GETTERS FOR THE TRIAL COLUMNS
+    #################################################################################
+    def __len__(self):
+        return len(self.trialIndex)
+
+    def GetNumTrials(self):
+        return len(self.trialIndex)
+
+    def GetTrialIndex(self):
+        return self.trialIndex
+
+    def GetTrialColumn(self, name):
+        return getattr(self, name)
+
+    #################################################################################
+    # GETTER FOR THE FISH OF THE TRIAL IN ROW row
+    # Stored columns are sliced without copying; lazy trials are simulated again.
+    #################################################################################
+    def GetFishData(self, row):
+        if self.fishColumns is not None:
+            start, stop = self.fishOffsets[row], self.fishOffsets[row + 1]
+            return FishPopulation(**{name: None if column is None else column[start:stop]
+                                     for name, column in self.fishColumns.items()})
+        if self.config is not None:
+            return regenerateFishPopulation(self.config, int(self.trialIndex[row]))
+        return emptyFishPopulation()
+
+    #################################################################################
+    # GETTER FOR THE FISH OF EVERY TRIAL AS ONE POPULATION
+    #################################################################################
+    def GetAllFishData(self):
+        if self.fishColumns is not None:
+            return FishPopulation(**self.fishColumns)
+        if self.config is not None and len(self):
+            return FishPopulation(**concatenateColumns([vars(self.GetFishData(row)) for row in range(len(self))]))
+        return emptyFishPopulation()
+
+    #################################################################################
+    # GETTER FOR A FISH COLUMN, FOR THE TRIAL IN ROW row OR FOR ALL TRIALS (row None)
+    #################################################################################
+    def GetFishColumn(self, name, row=None):
+        if row is None:
+            return getattr(self.GetAllFishData(), name)
+        return getattr(self.GetFishData(row), name)
+
+    #################################################################################
+    # GETTER FOR A COLUMN OF THE RAW FISH DATA TABLE, AS SHOWN IN THE TABLE
+    #################################################################################
+    def GetFishTableColumn(self, index, row=None):
+        if row is None:
+            return self.GetAllFishData().GetTableColumn(index)
+        return self.GetFishData(row).GetTableColumn(index)
+
+    #################################################################################
+    # GETTER FOR THE HISTOGRAMS OF THE FISH TABLE COLUMNS OVER ALL TRIALS
+    # Counted on the first call, in the bins for the runs of config, and kept: stored
+    # fish HISTOGRAM_BLOCK_FISH at a time, lazy trials one trial at a time. None when
+    # the store has no fish.
+    #################################################################################
+    def GetFishHistograms(self, config):
+        if self.fishHistograms is None and (self.fishColumns is not None or self.config is not None):
+            fishHistograms = FishHistograms.ForConfig(config)
+            if self.fishColumns is not None:
+                fishData = self.GetAllFishData()
+                for start in range(0, len(fishData), HISTOGRAM_BLOCK_FISH):
+                    fishHistograms.Update(fishData.GetSlice(start, start + HISTOGRAM_BLOCK_FISH))
+            else:
+                for row in range(len(self)):
+                    fishHistograms.Update(self.GetFishData(row))
+            self.fishHistograms = fishHistograms
+        return self.fishHistograms
+
+    #################################################################################
+    # GETTER FOR THE NUMBER OF FISH OF EVERY TRIAL (ZERO WHEN NOT STORED)
+    #################################################################################
+    def GetFishCounts(self):
+        return np.diff(self.fishOffsets)
+
+    #################################################################################
+    # GETTER FOR MEMORY USED BY THE COLUMNS
+    #################################################################################
+    def GetMemorySize(self):
+        columns = [self.trialIndex, self.fishOffsets] + [getattr(self, name) for name in TRIAL_COLUMNS]
+        if self.fishColumns is not None:
+            columns += [column for column in self.fishColumns.values() if column is not None]
+        return sum(column.nbytes for column in columns)
+
+
+#################################################################################
+# Concatenate dicts of fish columns, a column missing from any dict is dropped
+#################################################################################
+def concatenateColumns(columnDicts):
+    return {name: None if any(columns[name] is None for columns in columnDicts)
+            else np.concatenate([columns[name] for columns in columnDicts])
+            for name in columnDicts[0]}
+
+
+#################################################################################
+# Population without fish, for runs that keep no fish
+#################################################################################
+def emptyFishPopulation():
+    return FishPopulation(**{name: [] for name in FISH_COLUMN_TYPES})
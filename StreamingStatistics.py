@@ -0,0 +1,235 @@
+#################################################################################
+# Streaming Statistics Class
+# Summary statistics of a stream of estimates in constant memory: count, mean,
+# variance, skewness, min and max are updated online, the quartiles and median
+# come from a histogram whose bins widen as larger values arrive. Accumulators
+# started with the same bins merge, so every worker can summarize its own trials.
+#################################################################################
+import numpy as np
+
+# Histogram bins of a new accumulator
+DEFAULT_BINS = 4096
+
+
+class StreamingStatistics:
+    count: int
+    mean: float
+    m2: float
+    m3: float
+    minimum: float
+    maximum: float
+    lower: float
+    width: float
+    histogram: np.ndarray
+    underflow: int
+    overflow: int
+
+    #################################################################################
+    # STREAMING STATISTICS CONSTRUCTOR
+    # The histogram starts on [lower, upper) in bins equal bins. A value at or past
+    # the end doubles the bin width, merging neighbouring bins, until it fits, so
+    # quantiles stay exact to within one (current) bin width. Values below lower
+    # are only counted.
+    #################################################################################
+    def __init__(self, lower, upper, bins=DEFAULT_BINS):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.lower = float(lower)
+        self.width = (float(upper) - float(lower)) / bins
+        self.histogram = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    #################################################################################
+    # ADD A BLOCK OF VALUES
+    #################################################################################
+    def Update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        mean = values.mean()
+        deviation = values - mean
+        self._MergeMoments(len(values), mean, np.dot(deviation, deviation), np.dot(deviation * deviation, deviation))
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        if np.isfinite(self.maximum):
+            while self.maximum >= self.GetUpper():
+                self._DoubleWidth()
+
+        # One count for the values below the bins, one for those above, around the bins
+        bins = np.clip(np.floor((values - self.lower) / self.width), -1, len(self.histogram)).astype(np.int64) + 1
+        counts = np.bincount(bins, minlength=len(self.histogram) + 2)
+        self.histogram += counts[1:-1]
+        self.underflow += int(counts[0])
+        self.overflow += int(counts[-1])
+
+    #################################################################################
+    # ADD THE VALUES OF ANOTHER ACCUMULATOR STARTED WITH THE SAME BINS
+    # The accumulator with the narrower bins is widened to the other's bins first.
+    #################################################################################
+    def Merge(self, other):
+        if (other.lower, len(other.histogram)) != (self.lower, len(self.histogram)):
+            raise ValueError("Only statistics with the same histogram bins can be merged")
+        if other.count == 0:
+            return
+        if other.width < self.width:
+            other = StreamingStatistics.FromState(other.GetState(), other.histogram)
+            other._WidenTo(self.width)
+        else:
+            self._WidenTo(other.width)
+        self._MergeMoments(other.count, other.mean, other.m2, other.m3)
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.histogram += other.histogram
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    #################################################################################
+    # DOUBLE THE BIN WIDTH: EVERY PAIR OF BINS BECOMES THE FIRST HALF OF THE BINS
+    #################################################################################
+    def _DoubleWidth(self):
+        histogram = self.histogram if len(self.histogram) % 2 == 0 else np.append(self.histogram, 0)
+        pairs = histogram.reshape(-1, 2).sum(axis=1)
+        self.histogram = np.concatenate((pairs, np.zeros(len(self.histogram) - len(pairs), dtype=np.int64)))
+        self.width *= 2
+
+    def _WidenTo(self, width):
+        while self.width < width:
+            self._DoubleWidth()
+        if self.width != width:
+            raise ValueError("Only statistics with the same histogram bins can be merged")
+
+    #################################################################################
+    # COMBINE COUNT, MEAN AND CENTRAL MOMENT SUMS (PEBAY'S PAIRWISE UPDATE)
+    #################################################################################
+    def _MergeMoments(self, count, mean, m2, m3):
+        total = self.count + count
+        delta = mean - self.mean
+        self.m3 += m3 + delta ** 3 * self.count * count * (self.count - count) / total ** 2 \
+            + 3 * delta * (self.count * m2 - count * self.m2) / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+
+    #################################################################################
+    # GETTERS FOR THE MOMENTS
+    #################################################################################
+    def GetCount(self):
+        return self.count
+
+    def GetMean(self):
+        return self.mean if self.count else np.nan
+
+    def GetVariance(self):
+        return self.m2 / self.count if self.count else np.nan
+
+    def GetSampleVariance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    def GetStandardDeviation(self):
+        return np.sqrt(self.GetVariance())
+
+    def GetSkew(self):
+        # Same (biased) coefficient of skewness as scipy.stats.skew
+        if self.count == 0 or self.m2 == 0:
+            return np.nan
+        return np.sqrt(self.count) * self.m3 / self.m2 ** 1.5
+
+    def GetMin(self):
+        return self.minimum
+
+    def GetMax(self):
+        return self.maximum
+
+    #################################################################################
+    # GETTER FOR A QUANTILE, FROM THE HISTOGRAM
+    #################################################################################
+    def GetQuantile(self, quantile):
+        if self.count == 0:
+            return np.nan
+        if quantile <= 0:
+            return self.minimum
+        if quantile >= 1:
+            return self.maximum
+
+        # Rank of the quantile among the sorted values, as numpy's default (linear) method
+        rank = quantile * (self.count - 1)
+        if rank < self.underflow:
+            return self.minimum
+        cumulative = np.cumsum(self.histogram) + self.underflow
+        index = int(np.searchsorted(cumulative, rank, side='right'))
+        if index >= len(self.histogram):
+            return self.maximum
+
+        # Spread the values of the bin evenly across it
+        before = cumulative[index] - self.histogram[index]
+        value = self.lower + (index + (rank - before + 0.5) / self.histogram[index]) * self.width
+        return float(min(max(value, self.minimum), self.maximum))
+
+    def GetMedian(self):
+        return self.GetQuantile(0.5)
+
+    #################################################################################
+    # GETTERS FOR THE HISTOGRAM: COUNTS AND BIN EDGES, AND VALUES OUTSIDE THE BINS
+    #################################################################################
+    def GetHistogram(self):
+        return self.histogram
+
+    def GetBinEdges(self):
+        return self.lower + self.width * np.arange(len(self.histogram) + 1)
+
+    def GetUpper(self):
+        return self.lower + self.width * len(self.histogram)
+
+    #################################################################################
+    # GETTER FOR THE COUNTS BETWEEN OTHER BIN EDGES, E.G. FEWER BINS FOR A PLOT
+    # The values of a bin are spread evenly across it; values outside the bins
+    # (underflow and overflow) are not counted.
+    #################################################################################
+    def GetCounts(self, edges):
+        cumulative = np.concatenate(([0], np.cumsum(self.histogram)))
+        return np.diff(np.interp(edges, self.GetBinEdges(), cumulative))
+
+    def GetUnderflow(self):
+        return self.underflow
+
+    def GetOverflow(self):
+        return self.overflow
+
+    #################################################################################
+    # STATE FOR SAVING: THE SCALARS AS A DICT, AND THE HISTOGRAM
+    #################################################################################
+    def GetState(self):
+        return {'count': int(self.count), 'mean': float(self.mean), 'm2': float(self.m2), 'm3': float(self.m3),
+                'minimum': float(self.minimum), 'maximum': float(self.maximum), 'lower': self.lower,
+                'width': self.width, 'underflow': self.underflow, 'overflow': self.overflow}
+
+    @classmethod
+    def FromState(cls, state, histogram):
+        statistics = cls(0, 1, len(histogram))
+        for name, value in state.items():
+            setattr(statistics, name, value)
+        statistics.histogram = np.array(histogram, dtype=np.int64)
+        return statistics
+
+    #################################################################################
+    # GETTER FOR THE SUMMARY OF ESTIMATES: MEAN, QUARTILES, SKEW, SPREAD AND ERROR
+    #################################################################################
+    def GetSummary(self, actualPopulation):
+        bias = self.GetMean() - actualPopulation
+        return {
+            'mean': self.GetMean(),
+            'median': self.GetMedian(),
+            'firstQuart': self.GetQuantile(.25),
+            'secondQuart': self.GetQuantile(.50),
+            'thirdQuart': self.GetQuantile(.75),
+            'fourthQuart': self.GetQuantile(1),
+            'skew': self.GetSkew(),
+            'standardDeviation': self.GetStandardDeviation(),
+            'bias': bias,
+            'rmse': np.sqrt(self.GetVariance() + bias ** 2),
+        }
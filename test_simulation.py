@@ -0,0 +1,632 @@
+#################################################################################
+# Simulation Tests
+# Checks of the simulation engine, the result formats and the headless tools
+# that do not need Qt.
+# Run with: python -m pytest test_simulation.py (or python -m unittest test_simulation)
+#################################################################################
+import contextlib
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import scipy.stats
+
+import BatchRunner
+from FishHistograms import fishHistogramBins, histogramValues
+from FishPopulation import FISH_TABLE_COLUMNS, FISH_TABLE_HEADERS, FISH_TABLE_DECIMALS
+from ParameterSweep import runSweep, sweepColumns, sweepConfigs, sweepValues
+from ResultExporter import formatColumn, exportFishData, exportAllFish, exportTrials, exportLongFormat, \
+    readLongFormatTrial, ExportJob
+from SimulationArchive import writeArchive, readArchive
+from SimulationConfig import SimulationConfig
+from SimulationEngine import runTrials, runTrialsParallel, measurePrecision, ProgressMeter, RunProgress, \
+    ADAPTIVE_MIN_TRIALS
+from SimulationKernel import chapmanEstimate, REACH_SIZE, POPULATION_OPEN, SUBREACH_VARIED, ENGINE_PER_TRIAL, \
+    ENGINE_BATCHED, ENGINE_ESTIMATES_ONLY, PRECISION_RELATIVE_SE, PRECISION_MEDIAN_CI, PRECISION_TIME, RETENTION_FULL, \
+    RETENTION_LAZY
+from SimulationParameters import SimulationParameters
+from SimulationResultStore import TRIAL_TABLE_HEADERS
+from StreamingStatistics import StreamingStatistics
+
+# Smallest p-value of a two-sample test taken as the same distribution
+MIN_P_VALUE = 0.001
+
+
+#################################################################################
+# The original closed population trial: one fish at a time, equal capture
+# probability, tag loss and a study subreach
+#################################################################################
+def perFishTrial(rng, config):
+    lowerBound, upperBound = config.lowerBound, config.upperBound
+    positions = [rng.integers(0, REACH_SIZE + 1) for _ in range(config.populationSize)]
+    inStudyReach = [config.subReachMode != SUBREACH_VARIED or lowerBound <= position <= upperBound
+                    for position in positions]
+
+    # First pass, then tag loss of every marked fish
+    firstPassMarked = 0
+    tagged = [False] * config.populationSize
+    for fish in range(config.populationSize):
+        if rng.random() <= config.captureProbOne and inStudyReach[fish]:
+            firstPassMarked += 1
+            tagged[fish] = not (config.tagLoss and rng.random() <= config.tagLossRate)
+
+    # Second pass
+    secondPassCaught = 0
+    recaptured = 0
+    for fish in range(config.populationSize):
+        if rng.random() <= config.captureProbOne and inStudyReach[fish]:
+            secondPassCaught += 1
+            recaptured += tagged[fish]
+    return firstPassMarked, secondPassCaught, recaptured
+
+
+#################################################################################
+# Expected text of the rows of a fish table: as the raw fish data table shows it
+#################################################################################
+def fishTableRows(fishData):
+    columns = [fishData.GetTableColumn(index) for index in range(len(FISH_TABLE_COLUMNS))]
+    return [[str(column[fish]) if decimals is None
+             else str('{number:.{digits}f}'.format(number=column[fish], digits=decimals))
+             for column, decimals in zip(columns, FISH_TABLE_DECIMALS)]
+            for fish in range(len(fishData))]
+
+
+#################################################################################
+# Rows of a CSV file, plain or gzip-compressed, and whether every line ends in CRLF
+#################################################################################
+def readCsv(path):
+    with (gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')) as inputFile:
+        text = inputFile.read().decode('ascii')
+    lines = text.split('\r\n')
+    return list(csv.reader(lines[:-1])), lines[-1] == '' and '\n' not in text.replace('\r\n', '')
+
+
+#################################################################################
+# KERNELS AGAINST THE ORIGINAL PER-FISH LOOP
+#################################################################################
+class TestSimulationKernel(unittest.TestCase):
+
+    def testChapmanEstimate(self):
+        self.assertEqual(chapmanEstimate(10, 20, 4), 11 * 21 / 5 - 1)
+        np.testing.assert_allclose(chapmanEstimate(np.array([10, 0]), np.array([20, 5]), np.array([4, 0])),
+                                   [11 * 21 / 5 - 1, 5])
+
+    def testEnginesMatchPerFishLoop(self):
+        config = SimulationConfig(populationSize=150, captureProbOne=0.4, tagLoss=True, tagLossRate=0.2,
+                                  subReachMode=SUBREACH_VARIED, subReachFraction=0.6, numTrials=1500, seed=11)
+        rng = np.random.default_rng(5)
+        expected = np.array([perFishTrial(rng, config) for _ in range(config.numTrials)])
+        expectedEstimates = chapmanEstimate(*expected.T)
+
+        for engine in (ENGINE_PER_TRIAL, ENGINE_BATCHED, ENGINE_ESTIMATES_ONLY):
+            with self.subTest(engine=engine):
+                estimates, resultStore, statistics = runTrials(config.Replace(engine=engine))
+                self.assertEqual(statistics.GetCount(), config.numTrials)
+                self.assertGreater(scipy.stats.ks_2samp(estimates, expectedEstimates).pvalue, MIN_P_VALUE)
+                # Mean pass counts within four standard errors of the per-fish loop
+                for name, column in zip(('firstPassCaught', 'secondPassCaught', 'secondPassRecaught'), expected.T):
+                    counts = resultStore.GetTrialColumn(name)
+                    standardError = np.sqrt(counts.var() / len(counts) + column.var() / len(column))
+                    self.assertLess(abs(counts.mean() - column.mean()), 4 * standardError + 1e-9, name)
+
+
+#################################################################################
+# SAME SEED, SAME RESULTS: IN THIS PROCESS OR ACROSS WORKER PROCESSES
+#################################################################################
+class TestParallelRuns(unittest.TestCase):
+
+    def testParallelMatchesSingleProcess(self):
+        for config in (SimulationConfig(populationSize=300, numTrials=700, seed=21),
+                       SimulationConfig(populationSize=300, numTrials=700, seed=21, engine=ENGINE_ESTIMATES_ONLY),
+                       SimulationConfig(populationType=POPULATION_OPEN, populationSize=100, numTrials=60, seed=21,
+                                        mortalityRate=0.1)):
+            with self.subTest(config=config):
+                estimates, resultStore, statistics = runTrials(config)
+                parallelEstimates, parallelStore, parallelStatistics = runTrialsParallel(config, workers=3)
+                np.testing.assert_array_equal(parallelEstimates, estimates)
+                np.testing.assert_array_equal(parallelStore.GetTrialIndex(), np.arange(config.numTrials))
+                np.testing.assert_array_equal(parallelStore.GetTrialColumn('secondPassRecaught'),
+                                              resultStore.GetTrialColumn('secondPassRecaught'))
+                self.assertEqual(parallelStatistics.GetCount(), config.numTrials)
+                self.assertAlmostEqual(parallelStatistics.GetMean(), statistics.GetMean())
+
+
+#################################################################################
+# CONFIG FROM A DICT (SCENARIO FILES, ARCHIVE METADATA)
+#################################################################################
+class TestSimulationConfig(unittest.TestCase):
+
+    def testDictRoundTrip(self):
+        config = SimulationConfig(populationType=POPULATION_OPEN, populationSize=250, tagLoss=True, tagLossRate=0.25,
+                                  numTrials=40, seed=2 ** 40, engine=ENGINE_ESTIMATES_ONLY)
+        self.assertEqual(SimulationConfig.FromDict(config.ToDict()), config)
+        self.assertEqual(SimulationConfig.FromDict({'numTrials': 20.0, 'engine': 'per-trial'}),
+                         SimulationConfig(numTrials=20, engine=ENGINE_PER_TRIAL))
+
+    def testRejectsBadInput(self):
+        for parameters in ({'tagLoss': 'false'}, {'tagLoss': 1}, {'numTrials': 2.7}, {'numTrials': '5'},
+                           {'captureProbOne': True}, {'captureProbOne': None}, {'populationSize': 'many'},
+                           {'engine': 'fastest'}, {'numberOfTrials': 10}):
+            with self.subTest(parameters=parameters):
+                with self.assertRaises(ValueError) as raised:
+                    SimulationConfig.FromDict(parameters)
+                self.assertIn(next(iter(parameters)), str(raised.exception))
+
+
+#################################################################################
+# HEADLESS BATCH RUNNER
+#################################################################################
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def runScenarios(self, document, *options):
+        scenarioPath = os.path.join(self.directory, 'scenarios.json')
+        with open(scenarioPath, 'w') as scenarioFile:
+            json.dump(document, scenarioFile)
+        with contextlib.redirect_stderr(io.StringIO()):
+            BatchRunner.main([scenarioPath] + list(options))
+
+    def testSummaryAndTrials(self):
+        summaryPath = os.path.join(self.directory, 'summary.csv')
+        trialsDirectory = os.path.join(self.directory, 'trials')
+        self.runScenarios({'defaults': {'numTrials': 300, 'populationSize': 120},
+                           'scenarios': [{'name': 'seeded', 'captureProbOne': 0.6, 'seed': 31},
+                                         {'engine': 'estimates-only'}]},
+                          '--workers', '1', '--summary', summaryPath, '--trials-dir', trialsDirectory)
+
+        with open(summaryPath, newline='') as summaryFile:
+            rows = list(csv.DictReader(summaryFile))
+        self.assertEqual([row['name'] for row in rows], ['seeded', 'scenario-2'])
+        self.assertEqual([row['trialsRun'] for row in rows], ['300', '300'])
+        self.assertEqual(rows[0]['seed'], '31')
+        self.assertTrue(rows[1]['seed'].isdigit())
+
+        config = SimulationConfig(numTrials=300, populationSize=120, captureProbOne=0.6, seed=31)
+        estimates, resultStore, statistics = runTrials(config)
+        self.assertAlmostEqual(float(rows[0]['mean']), statistics.GetMean())
+        with open(os.path.join(trialsDirectory, 'seeded_trials.csv'), newline='') as trialFile:
+            trialRows = list(csv.reader(trialFile))
+        self.assertEqual(trialRows[0], list(BatchRunner.TRIAL_COLUMNS))
+        self.assertEqual([int(row[0]) for row in trialRows[1:]], list(range(1, 301)))
+        np.testing.assert_allclose([float(row[1]) for row in trialRows[1:]], estimates)
+        np.testing.assert_array_equal([int(row[4]) for row in trialRows[1:]],
+                                      resultStore.GetTrialColumn('secondPassRecaught'))
+
+    def testWorkersGiveTheSameSummary(self):
+        summaries = []
+        for workers in ('1', '2'):
+            summaryPath = os.path.join(self.directory, 'summary' + workers + '.csv')
+            self.runScenarios([{'numTrials': 400, 'seed': 5}], '--workers', workers, '--summary', summaryPath)
+            with open(summaryPath, newline='') as summaryFile:
+                row = next(csv.DictReader(summaryFile))
+            summaries.append([float(row[statistic]) for statistic in ('trialsRun', 'mean', 'median', 'rmse')])
+        np.testing.assert_allclose(summaries[0], summaries[1], rtol=1e-12)
+
+    def testBadScenarioNamesTheScenario(self):
+        with self.assertRaises(SystemExit) as raised:
+            self.runScenarios([{'name': 'broken', 'numTrials': 'many'}])
+        self.assertIn('broken', str(raised.exception))
+        self.assertIn('numTrials', str(raised.exception))
+
+
+#################################################################################
+# PARAMETER SWEEPS
+#################################################################################
+class TestParameterSweep(unittest.TestCase):
+
+    def testSweepValues(self):
+        self.assertEqual(sweepValues([3, 1, 2]), [3, 1, 2])
+        self.assertEqual(sweepValues({'start': 0.1, 'stop': 0.5, 'step': 0.1}), [0.1, 0.2, 0.3, 0.4, 0.5])
+        np.testing.assert_allclose(sweepValues({'start': 0, 'stop': 1, 'num': 5}), [0, .25, .5, .75, 1])
+        with self.assertRaises(ValueError):
+            sweepValues({'start': 0, 'stop': 1, 'step': 0})
+
+    def testGridOrderAndImpliedOptions(self):
+        configs = sweepConfigs(SimulationConfig(seed=3), {'populationSize': [100, 200], 'tagLossRate': [0.1, 0.2]})
+        self.assertEqual([(config.populationSize, config.tagLossRate) for config in configs],
+                         [(100, 0.1), (100, 0.2), (200, 0.1), (200, 0.2)])
+        self.assertTrue(all(config.tagLoss and config.seed == 3 for config in configs))
+
+    def testRowsMatchSingleRuns(self):
+        baseConfig = SimulationConfig(numTrials=200, seed=9)
+        progress = []
+        rows = runSweep(baseConfig, {'captureProbOne': [0.3, 0.6], 'populationSize': [80, 160]}, workers=2,
+                        progressCallback=lambda completed, total: progress.append((completed, total)))
+        self.assertEqual(progress[-1], (4, 4))
+        self.assertEqual(list(rows[0]), sweepColumns())
+        for row, config in zip(rows, sweepConfigs(baseConfig, {'captureProbOne': [0.3, 0.6],
+                                                               'populationSize': [80, 160]})):
+            statistics = runTrials(config)[2]
+            self.assertEqual((row['captureProbOne'], row['populationSize']),
+                             (config.captureProbOne, config.populationSize))
+            self.assertEqual(row['trialsRun'], config.numTrials)
+            self.assertAlmostEqual(row['mean'], statistics.GetMean())
+
+    def testStoppedSweepKeepsCompletedPoints(self):
+        # Stop as soon as the first point is done: the point still running is cut short and left out
+        progress = []
+        rows = runSweep(SimulationConfig(numTrials=5000, seed=2),
+                        {'populationSize': [1000, 1001, 1002, 1003, 1004, 1005]}, workers=2,
+                        progressCallback=lambda completed, total: progress.append(completed),
+                        shouldStop=lambda: bool(progress))
+        self.assertGreaterEqual(len(rows), 1)
+        self.assertLess(len(rows), 6)
+        self.assertTrue(all(row['trialsRun'] == 5000 for row in rows))
+        self.assertEqual([row['populationSize'] for row in rows], sorted(row['populationSize'] for row in rows))
+
+
+#################################################################################
+# ADAPTIVE RUNS: STOP AT THE TARGET PRECISION OR TIME BUDGET
+#################################################################################
+class TestAdaptiveRuns(unittest.TestCase):
+
+    def testRelativeStandardError(self):
+        estimates = np.random.default_rng(6).normal(500, 40, 1000)
+        statistics = StreamingStatistics(0, 2000)
+        statistics.Update(estimates)
+        self.assertAlmostEqual(measurePrecision(SimulationConfig(precisionMode=PRECISION_RELATIVE_SE), statistics),
+                               estimates.std(ddof=1) / np.sqrt(len(estimates)) / estimates.mean())
+
+    def testStopsAtTargetPrecision(self):
+        fixedEstimates = runTrials(SimulationConfig(populationSize=200, numTrials=3000, seed=3))[0]
+        for precisionMode, precisionTarget in ((PRECISION_RELATIVE_SE, 0.002), (PRECISION_MEDIAN_CI, 1.5)):
+            config = SimulationConfig(populationSize=200, numTrials=100000, seed=3, precisionMode=precisionMode,
+                                      precisionTarget=precisionTarget)
+            for run in (runTrials, lambda config: runTrialsParallel(config, workers=2)):
+                with self.subTest(precisionMode=precisionMode, run=run):
+                    estimates, resultStore, statistics = run(config)
+                    self.assertGreater(len(estimates), ADAPTIVE_MIN_TRIALS)
+                    self.assertLess(len(estimates), 3000)
+                    self.assertEqual(statistics.GetCount(), len(estimates))
+                    self.assertLessEqual(measurePrecision(config, statistics), precisionTarget)
+                    # The trials run are the first trials of the fixed length run
+                    np.testing.assert_array_equal(resultStore.GetTrialIndex(), np.arange(len(estimates)))
+                    np.testing.assert_array_equal(estimates, fixedEstimates[:len(estimates)])
+
+    def testStopsAtTimeBudget(self):
+        config = SimulationConfig(populationSize=200, numTrials=10 ** 7, seed=3, precisionMode=PRECISION_TIME,
+                                  precisionTarget=0.3)
+        started = time.time()
+        statistics = runTrials(config, keepResults=False, keepEstimates=False)[2]
+        self.assertLess(time.time() - started, 3)
+        self.assertGreater(statistics.GetCount(), 0)
+        self.assertLess(statistics.GetCount(), config.numTrials)
+
+
+#################################################################################
+# STREAMING STATISTICS AGAINST NUMPY
+#################################################################################
+class TestStreamingStatistics(unittest.TestCase):
+
+    def testMergedMomentsAndQuantiles(self):
+        values = np.random.default_rng(3).gamma(4.0, 250.0, 20000)
+        statistics = StreamingStatistics(0, 8000)
+        for part in np.array_split(values, 7):
+            partStatistics = StreamingStatistics(0, 8000)
+            partStatistics.Update(part)
+            statistics.Merge(partStatistics)
+
+        self.assertEqual(statistics.GetCount(), len(values))
+        self.assertAlmostEqual(statistics.GetMean(), values.mean(), places=6)
+        self.assertAlmostEqual(statistics.GetVariance() / values.var(), 1, places=9)
+        self.assertAlmostEqual(statistics.GetSkew(), scipy.stats.skew(values), places=6)
+        self.assertEqual(statistics.GetMin(), values.min())
+        self.assertEqual(statistics.GetMax(), values.max())
+        for quantile in (.1, .25, .5, .75, .9):
+            self.assertLessEqual(abs(statistics.GetQuantile(quantile) - np.quantile(values, quantile)),
+                                 statistics.width)
+
+    def testValuesPastTheBins(self):
+        statistics = StreamingStatistics(0, 10, bins=10)
+        statistics.Update([-1, 0.5, 9.5, 10, 25])
+        # Below the bins: only counted. Past the end: the bins widen to 0..40
+        self.assertEqual((statistics.GetUnderflow(), statistics.GetOverflow()), (1, 0))
+        self.assertEqual(statistics.GetBinEdges()[-1], 40)
+        self.assertEqual(statistics.GetHistogram().tolist(), [1, 0, 2, 0, 0, 0, 1, 0, 0, 0])
+        self.assertEqual(statistics.GetCounts(np.array([0, 8, 40])).tolist(), [1, 3])
+
+    def testMergeWidensBins(self):
+        values = np.random.default_rng(4).exponential(30.0, 3000)
+        expected = StreamingStatistics(0, 50)
+        expected.Update(values)
+        for parts in ((values[:1000], values[1000:]), (values[1000:], values[:1000])):
+            statistics = StreamingStatistics(0, 50)
+            for part in parts:
+                partStatistics = StreamingStatistics(0, 50)
+                partStatistics.Update(part)
+                statistics.Merge(partStatistics)
+            self.assertEqual(statistics.width, expected.width)
+            np.testing.assert_array_equal(statistics.GetHistogram(), expected.GetHistogram())
+        with self.assertRaises(ValueError):
+            StreamingStatistics(0, 50).Merge(expected.FromState(expected.GetState(), expected.GetHistogram()[:-1]))
+
+    def testHeavyTagLossQuartiles(self):
+        # Most estimates are far above the starting range of 0 to four times the population
+        config = SimulationConfig(populationSize=100, captureProbOne=0.5, tagLoss=True, tagLossRate=0.9,
+                                  numTrials=5000, seed=12)
+        for run in (runTrials, lambda config: runTrialsParallel(config, workers=3)):
+            with self.subTest(run=run):
+                estimates, resultStore, statistics = run(config)
+                self.assertGreater(np.mean(estimates > 4 * config.populationSize), 0.9)
+                self.assertEqual(statistics.GetOverflow(), 0)
+                for quantile in (.25, .5, .75):
+                    self.assertLessEqual(abs(statistics.GetQuantile(quantile) - np.quantile(estimates, quantile)),
+                                         statistics.width)
+
+    def testStateRoundTrip(self):
+        statistics = StreamingStatistics(0, 100)
+        statistics.Update(np.arange(50.0))
+        restored = StreamingStatistics.FromState(statistics.GetState(), statistics.GetHistogram())
+        self.assertEqual(restored.GetSummary(25), statistics.GetSummary(25))
+
+
+#################################################################################
+# LAZY FISH, SIMULATED AGAIN FROM THE TRIAL'S STREAM, MATCH THE STORED FISH
+#################################################################################
+class TestLazyFishData(unittest.TestCase):
+
+    def testLazyMatchesFull(self):
+        for config in (SimulationConfig(populationSize=80, numTrials=12, seed=8, tagLoss=True, tagLossRate=0.3),
+                       SimulationConfig(populationSize=80, numTrials=12, seed=8, engine=ENGINE_PER_TRIAL),
+                       SimulationConfig(populationType=POPULATION_OPEN, populationSize=40, numTrials=6, seed=8,
+                                        mortalityRate=0.2)):
+            with self.subTest(config=config):
+                fullStore = runTrials(config.Replace(fishRetention=RETENTION_FULL))[1]
+                lazyStore = runTrials(config.Replace(fishRetention=RETENTION_LAZY))[1]
+                self.assertIsNone(lazyStore.fishColumns)
+                for row in (0, 5, len(fullStore) - 1):
+                    fullFish, lazyFish = fullStore.GetFishData(row), lazyStore.GetFishData(row)
+                    for name, column in vars(fullFish).items():
+                        if column is None:
+                            self.assertIsNone(getattr(lazyFish, name), name)
+                        else:
+                            np.testing.assert_array_equal(getattr(lazyFish, name), column, err_msg=name)
+
+
+#################################################################################
+# FILE ROUND TRIPS: SIMULATION ARCHIVES AND EXPORTS
+#################################################################################
+class TestFileRoundTrips(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testArchiveRoundTrip(self):
+        for fishRetention in (RETENTION_FULL, RETENTION_LAZY):
+            with self.subTest(fishRetention=fishRetention):
+                config = SimulationConfig(populationSize=60, numTrials=25, seed=13, tagLoss=True, tagLossRate=0.1,
+                                          fishRetention=fishRetention)
+                estimates, resultStore, statistics = runTrials(config)
+                simulation = SimulationParameters(statistics.GetCount(), statistics.GetMean(), config.populationSize,
+                                                  resultStore)
+                simulation.SetStatistics(statistics)
+                simulation.SetConfig(config)
+                simulation.SetPartial(True)
+
+                path = writeArchive(os.path.join(self.directory, 'run' + str(fishRetention) + '.awri'), simulation)
+                loaded = readArchive(path)
+                self.assertEqual(loaded.GetConfig(), config)
+                self.assertTrue(loaded.GetPartial())
+                np.testing.assert_array_equal(loaded.GetEstimates(), estimates)
+                self.assertEqual(loaded.GetStatistics().GetSummary(60), statistics.GetSummary(60))
+                loadedStore = loaded.GetTestData()
+                for name in ('trialIndex', 'estimate', 'firstPassCaught', 'secondPassCaught', 'secondPassRecaught'):
+                    np.testing.assert_array_equal(getattr(loadedStore, name), getattr(resultStore, name))
+                for row in (0, 24):
+                    for index in range(len(FISH_TABLE_COLUMNS)):
+                        np.testing.assert_array_equal(loadedStore.GetFishTableColumn(index, row),
+                                                      resultStore.GetFishTableColumn(index, row))
+    def testFormatColumn(self):
+        values = np.random.default_rng(18).uniform(-100, 100, 5000)
+        values = values[np.abs(values) >= 0.005]
+        for decimals in (0, 2, 3):
+            expected = [str('{number:.{digits}f}'.format(number=value, digits=decimals)) for value in values]
+            # Many distinct values, and few (a lookup table of every value)
+            self.assertEqual(formatColumn(values, decimals).tolist(), expected)
+            self.assertEqual(formatColumn(values[:20].repeat(100), decimals).tolist(),
+                             [text for text in expected[:20] for _ in range(100)])
+        self.assertEqual(formatColumn(np.array([3, 1, 2])).tolist(), ['3', '1', '2'])
+        self.assertEqual(formatColumn(np.array(['Yes', 'No'])).tolist(), ['Yes', 'No'])
+
+    def testFishAndTrialCsv(self):
+        config = SimulationConfig(populationType=POPULATION_OPEN, populationSize=40, numTrials=6, seed=18,
+                                  fishRetention=RETENTION_FULL, mortalityRate=0.1, migrationDistance=0.4)
+        resultStore = runTrials(config)[1]
+        for extension in ('.csv', '.csv.gz'):
+            with self.subTest(extension=extension):
+                fishPath = os.path.join(self.directory, 'fish' + extension)
+                exportFishData(fishPath, resultStore.GetFishData(2))
+                rows, crlf = readCsv(fishPath)
+                self.assertTrue(crlf)
+                self.assertEqual(rows, [list(FISH_TABLE_HEADERS)] + fishTableRows(resultStore.GetFishData(2)))
+
+                allFishPath = os.path.join(self.directory, 'allFish' + extension)
+                exportAllFish(allFishPath, resultStore)
+                self.assertEqual(readCsv(allFishPath)[0][1:], [row for trial in range(len(resultStore))
+                                                               for row in fishTableRows(resultStore.GetFishData(trial))])
+
+                trialsPath = os.path.join(self.directory, 'trials' + extension)
+                exportTrials(trialsPath, resultStore)
+                self.assertEqual(readCsv(trialsPath)[0],
+                                 [list(TRIAL_TABLE_HEADERS)]
+                                 + [[str('{number:.{digits}f}'.format(number=resultStore.estimate[trial], digits=0)),
+                                     str(resultStore.firstPassCaught[trial]), str(resultStore.secondPassCaught[trial]),
+                                     str(resultStore.secondPassRecaught[trial])] for trial in range(len(resultStore))])
+
+    def testExportJob(self):
+        config = SimulationConfig(populationSize=30, numTrials=4, seed=19, fishRetention=RETENTION_LAZY)
+        resultStore = runTrials(config)[1]
+        paths = [os.path.join(self.directory, 'trial' + str(row) + '.csv') for row in range(3)]
+
+        def exportJob():
+            job = ExportJob()
+            for row, path in enumerate(paths):
+                job.AddTrialFishData(path, resultStore, row)
+            job.AddTrials(os.path.join(self.directory, 'trials.csv.gz'), resultStore)
+            return job
+
+        reports = []
+        progress = exportJob().Run(progressCallback=reports.append)
+        self.assertFalse(progress.cancelled)
+        self.assertEqual((progress.filesWritten, progress.rowsWritten), (4, 3 * 30 + 4))
+        self.assertEqual(progress.GetPercent(), 100)
+        self.assertEqual(readCsv(paths[1])[0][1:], fishTableRows(resultStore.GetFishData(1)))
+        for path in paths:
+            os.remove(path)
+
+        # Cancelled while the second file is written: it is deleted and no more files are written
+        reports = []
+        progress = exportJob().Run(progressCallback=reports.append,
+                                   shouldStop=lambda: reports[-1].rowsWritten > 30)
+        self.assertTrue(progress.cancelled)
+        self.assertEqual(progress.filesWritten, 1)
+        self.assertEqual([os.path.exists(path) for path in paths], [True, False, False])
+
+    def testLongFormatRoundTrip(self):
+        config = SimulationConfig(populationSize=50, numTrials=9, seed=17, fishRetention=RETENTION_FULL)
+        resultStore = runTrials(config)[1]
+        for name in ('fish.csv', 'fish.csv.gz'):
+            with self.subTest(name=name):
+                path = os.path.join(self.directory, name)
+                indexPath = os.path.join(self.directory, name + '.index.csv')
+                exportLongFormat(path, resultStore, indexPath)
+                for row in (0, 4, 8):
+                    expected = [[str(row + 1)] + fishRow for fishRow in fishTableRows(resultStore.GetFishData(row))]
+                    self.assertEqual(readLongFormatTrial(path, indexPath, row + 1), expected)
+                with self.assertRaises(KeyError):
+                    readLongFormatTrial(path, indexPath, 10)
+
+
+#################################################################################
+# FISH COLUMN HISTOGRAMS, COUNTED ON DEMAND
+#################################################################################
+class TestFishHistograms(unittest.TestCase):
+
+    def testHistogramsMatchNumpy(self):
+        for config in (SimulationConfig(populationSize=70, numTrials=30, seed=21, tagLoss=True, tagLossRate=0.3),
+                       SimulationConfig(populationType=POPULATION_OPEN, populationSize=50, numTrials=10, seed=21,
+                                        mortalityRate=0.2, migrationDistance=0.6, migrationRate=0.3)):
+            fullStore = runTrials(config.Replace(fishRetention=RETENTION_FULL))[1]
+            lazyStore = runTrials(config.Replace(fishRetention=RETENTION_LAZY))[1]
+            self.assertIsNone(fullStore.fishHistograms)
+            fishData = fullStore.GetAllFishData()
+            for store in (fullStore, lazyStore):
+                fishHistograms = store.GetFishHistograms(config)
+                self.assertIs(store.GetFishHistograms(config), fishHistograms)
+                self.assertEqual(fishHistograms.GetCount(), len(fishData))
+                for column, bins in enumerate(fishHistogramBins(config)):
+                    with self.subTest(config=config, store=store, column=FISH_TABLE_COLUMNS[column]):
+                        statistics = fishHistograms.GetColumn(column)
+                        # Every value falls in the bins derived from the config, which never widen
+                        self.assertEqual((statistics.GetUnderflow(), statistics.GetOverflow()), (0, 0))
+                        np.testing.assert_allclose(statistics.GetBinEdges(), np.linspace(*bins[:2], bins[2] + 1))
+                        values = histogramValues(fishData, column)
+                        np.testing.assert_array_equal(statistics.GetHistogram(),
+                                                      np.histogram(values, statistics.GetBinEdges())[0])
+
+    def testArchiveKeepsCountedHistograms(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        config = SimulationConfig(populationSize=40, numTrials=8, seed=5, fishRetention=RETENTION_FULL)
+        estimates, resultStore, statistics = runTrials(config)
+        simulation = SimulationParameters(statistics.GetCount(), statistics.GetMean(), config.populationSize,
+                                          resultStore)
+        simulation.SetStatistics(statistics)
+        simulation.SetConfig(config)
+        fishHistograms = resultStore.GetFishHistograms(config)
+
+        loadedStore = readArchive(writeArchive(os.path.join(directory, 'run.awri'), simulation)).GetTestData()
+        self.assertIsNotNone(loadedStore.fishHistograms)
+        for loadedColumn, column in zip(loadedStore.GetFishHistograms(config).columns, fishHistograms.columns):
+            np.testing.assert_array_equal(loadedColumn.GetHistogram(), column.GetHistogram())
+            np.testing.assert_array_equal(loadedColumn.GetBinEdges(), column.GetBinEdges())
+
+
+#################################################################################
+# PROGRESS REPORTS: THROUGHPUT, TIME LEFT AND THROTTLING
+#################################################################################
+class TestProgress(unittest.TestCase):
+
+    def testRunProgress(self):
+        progress = RunProgress(trialsCompleted=250, trials=1000, fishPerTrial=4000, seconds=2.0)
+        self.assertEqual(progress.GetPercent(), 25)
+        self.assertEqual(progress.GetTrialsPerSecond(), 125)
+        self.assertEqual(progress.GetFishPerSecond(), 500000)
+        self.assertEqual(progress.GetSecondsRemaining(), 6)
+        self.assertEqual(progress.GetText(), "Trials: 250/1000   125.0 trials/s   0.50 M fish/s   ETA: 6 s")
+        self.assertIsNone(RunProgress(0, 1000, 4000, 0.0).GetSecondsRemaining())
+        self.assertEqual(RunProgress(1000, 1000, 4000, 8.0).GetText(),
+                         "Trials: 1000/1000   125.0 trials/s   0.50 M fish/s")
+
+    def testReportsAreThrottled(self):
+        reports = []
+        meter = ProgressMeter(SimulationConfig(populationType=POPULATION_OPEN, populationSize=10, numTrials=100),
+                              lambda progress, statistics: reports.append(progress))
+        for trialsCompleted in range(1, 100):
+            meter.Report(trialsCompleted, None)
+        meter.Report(100, None, final=True)
+        # The first report, then none within PROGRESS_INTERVAL, and always the final one
+        self.assertEqual([progress.trialsCompleted for progress in reports], [1, 100])
+        self.assertEqual(reports[-1].fishPerTrial, 30)
+
+    def testRunsReportTheirProgress(self):
+        config = SimulationConfig(populationSize=100, numTrials=3000, seed=23)
+        for run in (runTrials, lambda config, **kwargs: runTrialsParallel(config, workers=2, **kwargs)):
+            with self.subTest(run=run):
+                reports = []
+                run(config, progressCallback=lambda progress, statistics: reports.append(
+                    (progress.trialsCompleted, statistics.GetCount())))
+                self.assertEqual(reports[-1], (config.numTrials, config.numTrials))
+                self.assertTrue(all(completed == count for completed, count in reports))
+                self.assertEqual(sorted(reports), reports)
+
+
+#################################################################################
+# STOPPED RUNS KEEP THE TRIALS COMPLETED FROM TRIAL 0 ON
+#################################################################################
+class TestStoppedRuns(unittest.TestCase):
+
+    def testStoppedRunKeepsPrefix(self):
+        config = SimulationConfig(populationSize=200, numTrials=2000, seed=4)
+        estimates, resultStore, statistics = runTrialsParallel(config, workers=2, shouldStop=lambda: True)
+        self.assertEqual(len(estimates), statistics.GetCount())
+        np.testing.assert_array_equal(resultStore.GetTrialIndex(), np.arange(len(resultStore)))
+        np.testing.assert_array_equal(estimates, runTrials(config)[0][:len(estimates)])
+
+    def testStopEndsRunningChunks(self):
+        # Chunks of a million fish per batch: a stop ends them after their current batch
+        config = SimulationConfig(populationSize=5000, numTrials=8000, seed=24)
+        started = time.time()
+        fullEstimates = runTrials(config)[0]
+        fullSeconds = time.time() - started
+        for run in (runTrials, lambda config, **kwargs: runTrialsParallel(config, workers=2, **kwargs)):
+            with self.subTest(run=run):
+                reports = []
+                started = time.time()
+                estimates, resultStore, statistics = run(
+                    config, progressCallback=lambda progress, statistics: reports.append(progress),
+                    shouldStop=lambda: any(progress.trialsCompleted for progress in reports))
+                self.assertLess(time.time() - started, fullSeconds / 2)
+                self.assertGreater(len(estimates), 0)
+                self.assertLess(len(estimates), config.numTrials)
+                self.assertEqual(statistics.GetCount(), len(estimates))
+                np.testing.assert_array_equal(estimates, fullEstimates[:len(estimates)])
+
+
+if __name__ == "__main__":
+    unittest.main()